@@ -0,0 +1,16 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Offline micro-benchmarks for the portal's parsing and rendering hot paths."""
+import os
+
+# Read by wikidp.config, the benchmarks time the request path only
+os.environ.setdefault('WIKIDP_BACKGROUND_REFRESH', 'false')
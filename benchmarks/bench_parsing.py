@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Benchmarks for item and SPARQL result parsing."""
+import pytest
+
+from benchmarks.data import synthetic_bindings
+from wikidp.config import APP
+from wikidp.utils import (
+    _add_claim_data_item_context,
+    ClaimView,
+    build_property_loader,
+    item_detail_parse,
+    iter_item_snaks,
+    parse_snak,
+    parse_snaks,
+)
+from wikidp.utils.wd_int_utils import _format_wikidata_bindings
+
+
+def _parse_all_snaks(item):
+    # A new request every round, so the per request snak memo starts empty
+    with APP.test_request_context():
+        properties = build_property_loader()
+        return [parse_snak(pid, snak, properties)
+                for pid, snak in iter_item_snaks(item)]
+
+
+def _parse_snaks(item):
+    with APP.test_request_context():
+        return parse_snaks(iter_item_snaks(item), build_property_loader())
+
+
+def _add_claims(item):
+    with APP.test_request_context():
+        return _add_claim_data_item_context({}, item)
+
+
+def _claims_page(item):
+    with APP.test_request_context():
+        return ClaimView(item).page(offset=100, limit=50, qualifiers=True,
+                                    references=True)
+
+
+def _item_detail_parse(qid):
+    with APP.test_request_context():
+        return item_detail_parse(qid)
+
+
+@pytest.fixture(params=['synthetic', 'recorded'])
+def items(request, fixtures):
+    """Every item of a source, so a round covers all of them."""
+    items = fixtures.items_of(request.param)
+    if not items:
+        pytest.skip('no items recorded, see benchmarks/data.py')
+    return items
+
+
+def test_parse_snak(benchmark, items):
+    benchmark(lambda: [_parse_all_snaks(item) for item in items.values()])
+
+
+def test_parse_snaks(benchmark, items):
+    benchmark(lambda: [_parse_snaks(item) for item in items.values()])
+
+
+def test_add_claim_data_item_context(benchmark, items):
+    benchmark(lambda: [_add_claims(item) for item in items.values()])
+
+
+def test_claim_view_page(benchmark, items):
+    benchmark(lambda: [_claims_page(item) for item in items.values()])
+
+
+def test_item_detail_parse(benchmark, items):
+    benchmark(lambda: [_item_detail_parse(qid) for qid in items])
+
+
+def test_format_wikidata_bindings(benchmark):
+    bindings = synthetic_bindings()
+    benchmark(_format_wikidata_bindings, bindings)
@@ -0,0 +1,47 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Benchmarks for reading the property checklist schemas."""
+import json
+import os
+
+import pytest
+
+from wikidp.config import APP
+from wikidp.const import ConfKey
+from wikidp.controllers.api import (
+    get_schema_properties,
+    parse_expressions,
+    SCHEMA_REGISTRY,
+)
+
+SCHEMA_ROOT = APP.config[ConfKey.SCHEMA_DIR]
+SCHEMA_NAMES = sorted(
+    os.path.relpath(os.path.join(directory, filename), SCHEMA_ROOT)
+    for directory, _, filenames in os.walk(SCHEMA_ROOT)
+    for filename in filenames if filename.endswith('.json'))
+
+
+@pytest.mark.parametrize('schema_name', SCHEMA_NAMES)
+def test_parse_expressions(benchmark, schema_name):
+    with open(os.path.join(SCHEMA_ROOT, schema_name)) as schema_file:
+        schema = json.load(schema_file)
+    benchmark(parse_expressions, schema)
+
+
+@pytest.mark.parametrize('schema_name', SCHEMA_NAMES)
+def test_get_schema_properties(benchmark, schema_name):
+    assert benchmark(get_schema_properties, schema_name) is not None
+
+
+def test_schema_registry_reload(benchmark):
+    """Modification check with no schema changed."""
+    assert benchmark(SCHEMA_REGISTRY.reload) == []
@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Benchmarks for page rendering."""
+from flask import render_template
+
+from wikidp.config import APP
+from wikidp.const import DEFAULT_UI_LANGUAGES
+from wikidp.controllers.pages import get_schema_list
+from wikidp.utils import item_detail_parse
+
+
+def test_render_item_preview(benchmark, fixtures):
+    schemas = get_schema_list()
+    with APP.test_request_context():
+        contexts = [item_detail_parse(qid) for qid in fixtures.items]
+
+    def render():
+        with APP.test_request_context():
+            return [render_template('item_preview.html', item=item,
+                                    options=[item['qid']], schemas=schemas,
+                                    languages=DEFAULT_UI_LANGUAGES,
+                                    page='preview')
+                    for item in contexts]
+    benchmark(render)
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""
+Benchmarks for reading items, WDItemEngine against WikibaseReadClient.
+
+Both read from a local keep-alive server, so the rounds time connection
+setup and per item CPU but not the network. The "missing" rounds read an
+id with no item, leaving mostly the cost of each request. Compare the
+groups with:
+
+    $ python -m pytest benchmarks/bench_wikibase.py --benchmark-group-by=group
+"""
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+import json
+import threading
+from urllib.parse import (
+    parse_qs,
+    urlparse,
+)
+
+import pytest
+import requests
+
+from wikidp.utils.wikibase import WikibaseReadClient
+
+EMPTY_SPARQL_RESULT = json.dumps(
+    {'head': {'vars': []}, 'results': {'bindings': []}}).encode('utf-8')
+
+
+class _EntityHandler(BaseHTTPRequestHandler):
+    """Answer wbgetentities from the fixture items, SPARQL with no rows."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written apart, do not wait on delayed ACKs
+    disable_nagle_algorithm = True
+    items = {}
+    # Encoded responses by ids requested, so rounds do not time the server
+    bodies = {}
+
+    def do_GET(self):  # pylint: disable=C0103
+        """Serve a wbgetentities or SPARQL GET request."""
+        url = urlparse(self.path)
+        if not url.path.endswith('api.php'):
+            self._send(EMPTY_SPARQL_RESULT)
+            return
+        ids = parse_qs(url.query).get('ids', [''])[0]
+        if ids not in self.bodies:
+            self.bodies[ids] = json.dumps({'entities': {
+                qid: self.items.get(qid, {'id': qid, 'missing': ''})
+                for qid in ids.split('|')}}).encode('utf-8')
+        self._send(self.bodies[ids])
+
+    def do_POST(self):  # pylint: disable=C0103
+        """Serve a SPARQL POST request."""
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._send(EMPTY_SPARQL_RESULT)
+
+    def _send(self, data):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=W0221
+        """Keep the benchmark output quiet."""
+
+
+@pytest.fixture(params=['items', 'missing'])
+def qids(request, fixtures):
+    """The fixture item ids, or one id the server reports missing."""
+    if request.param == 'missing':
+        return ['Q0']
+    return list(fixtures.items)
+
+
+@pytest.fixture(scope='module')
+def server(fixtures):
+    """Base url of a local server holding the fixture items."""
+    handler = type('Handler', (_EntityHandler,), {'items': fixtures.items})
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _read_new_connection(api_url, qids):
+    # What WDItemEngine.get_wd_entity does: a new connection per item
+    return [requests.get(api_url, params={'action': 'wbgetentities',
+                                          'ids': qid, 'format': 'json'}).json()
+            for qid in qids]
+
+
+@pytest.mark.benchmark(group='entity-read')
+def test_entity_read__new_connection(benchmark, server, qids):
+    benchmark(_read_new_connection, f"{server}/w/api.php", qids)
+
+
+@pytest.mark.benchmark(group='entity-read')
+def test_entity_read__read_client(benchmark, server, qids):
+    with requests.Session() as session:
+        client = WikibaseReadClient(f"{server}/w/api.php", session=session)
+        benchmark(lambda: [client.get_entity(qid) for qid in qids])
+
+
+@pytest.mark.benchmark(group='entity-read')
+def test_entity_read__wditemengine(benchmark, server, fixtures):
+    wdi_core = pytest.importorskip('wikidataintegrator.wdi_core')
+    # WDItemEngine raises for missing items, only the items round applies
+    qids = list(fixtures.items)
+
+    def read():
+        return [wdi_core.WDItemEngine(
+            wd_item_id=qid, mediawiki_api_url=f"{server}/w/api.php",
+            sparql_endpoint_url=f"{server}/sparql", core_props=set())
+                for qid in qids]
+    benchmark(read)
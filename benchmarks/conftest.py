@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Keep the benchmarks offline and hand them their fixtures."""
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.data import load_fixtures
+from wikidp import utils
+from wikidp.utils import (
+    background,
+    commons,
+    http,
+    replay,
+    wd_int_utils,
+)
+
+
+@pytest.fixture(scope='session')
+def fixtures():
+    """Recorded or synthetic items and the data needed to parse them."""
+    return load_fixtures()
+
+
+@pytest.fixture(scope='session', autouse=True)
+def offline(fixtures):  # pylint: disable=W0621
+    """
+    Serve every upstream read from the fixtures.
+
+    Notes:
+        - Requests that still reach the shared session are replayed from an
+        empty directory, so they fail at once instead of timing the network.
+    """
+    for refresher in background.REFRESHERS:
+        refresher.stop()
+    with tempfile.TemporaryDirectory() as empty_dir, \
+            patch.object(utils, 'get_property_details_by_pid',
+                         fixtures.get_property_details_by_pid), \
+            patch.object(commons, 'resolve_image_urls',
+                         fixtures.resolve_image_urls), \
+            patch.object(wd_int_utils, 'get_item_json', fixtures.get_item_json), \
+            patch.object(wd_int_utils, 'get_items_json', fixtures.get_items_json), \
+            patch.object(utils.FORMATTER_URL_INDEX, '_loader',
+                         lambda: fixtures.formatter_urls):
+        replay.install(http.SESSION, replay.REPLAY, empty_dir)
+        utils.FORMATTER_URL_INDEX.refresh()
+        yield
@@ -0,0 +1,316 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""
+Benchmark fixtures: recorded Wikidata data and a deterministic synthetic set.
+
+Recording needs network access once, replaying never does:
+
+    $ python -m benchmarks.data [QID...]
+
+writes the items, RECORDED_QIDS by default, the details and formatter urls
+of every property they use and the urls of their images to
+benchmarks/fixtures/. The synthetic item covers every datatype parse_snak
+handles, benchmarks over items run on both sets and skip the recorded one
+until it has been recorded.
+"""
+import json
+import os
+import random
+import sys
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+ITEM_DIR = os.path.join(FIXTURE_DIR, 'items')
+PROPERTIES_FILE = os.path.join(FIXTURE_DIR, 'properties.json')
+FORMATTER_URLS_FILE = os.path.join(FIXTURE_DIR, 'formatter_urls.json')
+IMAGE_URLS_FILE = os.path.join(FIXTURE_DIR, 'image_urls.json')
+# Debian, PDF and PNG: a software item and two file formats of differing size
+RECORDED_QIDS = ['Q7715973', 'Q42332', 'Q178051']
+
+SYNTHETIC_SEED = 20210301
+SYNTHETIC_CLAIMS = 250
+SYNTHETIC_BINDINGS = 50000
+# (datatype, value type) of the synthetic main snaks, weighted like real items
+SYNTHETIC_DATATYPES = [
+    ('wikibase-item', 'wikibase-entityid'),
+    ('wikibase-item', 'wikibase-entityid'),
+    ('external-id', 'string'),
+    ('external-id', 'string'),
+    ('string', 'string'),
+    ('url', 'string'),
+    ('time', 'time'),
+    ('quantity', 'quantity'),
+    ('monolingualtext', 'monolingualtext'),
+    ('wikibase-property', 'wikibase-entityid'),
+]
+
+
+class Fixtures:
+    """Items plus everything parsing them would otherwise fetch."""
+
+    # pylint: disable=R0913
+    def __init__(self, items, properties, formatter_urls, image_urls,
+                 recorded=()):
+        """
+        Constructor for a Fixtures instance.
+
+        Args:
+            items (Dict[str, Dict]): raw entity JSON by qid
+            properties (Dict[str, Dict]): see get_property_details_by_pid
+            formatter_urls (Dict[str, List[str]]): see
+                get_external_id_formatter_urls
+            image_urls (Dict[str, str]): Commons file title to url
+            recorded (Iterable[str]): qids of the items read from Wikidata
+        """
+        self.items = items
+        self.recorded = list(recorded)
+        self.properties = properties
+        self.formatter_urls = formatter_urls
+        self.image_urls = image_urls
+
+    def get_property_details_by_pid(self, pid_list):
+        """Offline replacement of wikidp.utils.get_property_details_by_pid."""
+        return {pid: self.properties[pid] for pid in pid_list
+                if pid in self.properties}
+
+    def resolve_image_urls(self, titles):
+        """Offline replacement of wikidp.utils.commons.resolve_image_urls."""
+        return {title: self.image_urls.get(title, '') for title in titles}
+
+    def get_item_json(self, qid):
+        """Offline replacement of wikidp.utils.wd_int_utils.get_item_json."""
+        return self.items.get(qid)
+
+    def get_items_json(self, qids):
+        """Offline replacement of wikidp.utils.wd_int_utils.get_items_json."""
+        return {qid: self.items[qid] for qid in qids if qid in self.items}
+
+    def items_of(self, source):
+        """
+        Get the items of one source.
+
+        Args:
+            source (str): "recorded" or "synthetic"
+
+        Returns (Dict[str, Dict]): raw entity JSON by qid
+
+        """
+        recorded = set(self.recorded)
+        return {qid: item for qid, item in self.items.items()
+                if (qid in recorded) == (source == 'recorded')}
+
+
+def load_fixtures():
+    """
+    Load the synthetic fixtures together with any recorded ones.
+
+    Returns (Fixtures):
+
+    """
+    fixtures = synthetic_fixtures()
+    recorded = load_recorded_fixtures()
+    if recorded is None:
+        return fixtures
+    return Fixtures(
+        {**fixtures.items, **recorded.items},
+        {**fixtures.properties, **recorded.properties},
+        {**fixtures.formatter_urls, **recorded.formatter_urls},
+        {**fixtures.image_urls, **recorded.image_urls},
+        recorded=recorded.recorded)
+
+
+def load_recorded_fixtures():
+    """
+    Load the fixtures written by record.
+
+    Returns (Optional[Fixtures]): None if nothing was recorded
+
+    """
+    if not os.path.isdir(ITEM_DIR):
+        return None
+    items = {}
+    for filename in sorted(os.listdir(ITEM_DIR)):
+        if filename.endswith('.json'):
+            items[filename[:-len('.json')]] = _read_json(
+                os.path.join(ITEM_DIR, filename))
+    if not items:
+        return None
+    return Fixtures(items, _read_json(PROPERTIES_FILE),
+                    _read_json(FORMATTER_URLS_FILE), _read_json(IMAGE_URLS_FILE),
+                    recorded=items)
+
+
+def synthetic_fixtures(claim_count=SYNTHETIC_CLAIMS, seed=SYNTHETIC_SEED):
+    """
+    Build one large item with qualifiers and references on every statement.
+
+    Args:
+        claim_count (int): number of properties with statements
+        seed (int): the same seed always gives the same item
+
+    Returns (Fixtures):
+
+    """
+    rng = random.Random(seed)
+    claims = {}
+    properties = {}
+    formatter_urls = {}
+    image_urls = {}
+    for number in range(1, claim_count + 1):
+        pid = f"P{number}"
+        datatype, value_type = SYNTHETIC_DATATYPES[number % len(SYNTHETIC_DATATYPES)]
+        if number in (18, 154):
+            datatype, value_type = 'commonsMedia', 'string'
+        properties[pid] = {
+            'id': pid, 'propertyLabel': f"property {number}",
+            'propertyDescription': '', 'value_type': datatype,
+        }
+        if datatype == 'external-id':
+            properties[pid]['formatter_url'] = f"https://example.org/{pid}/$1"
+            formatter_urls[pid] = [properties[pid]['formatter_url']]
+        statements = []
+        for _ in range(rng.randint(1, 4)):
+            mainsnak = _synthetic_snak(rng, pid, datatype, value_type)
+            if datatype == 'commonsMedia':
+                title = mainsnak['datavalue']['value']
+                image_urls[title] = f"https://upload.example.org/{title}"
+            statements.append({
+                'mainsnak': mainsnak,
+                'type': 'statement',
+                'rank': 'normal',
+                'qualifiers': {
+                    'P580': [_synthetic_snak(rng, 'P580', 'time', 'time')],
+                    'P1545': [_synthetic_snak(rng, 'P1545', 'string', 'string')],
+                },
+                'references': [{'snaks': {
+                    'P854': [_synthetic_snak(rng, 'P854', 'url', 'string')],
+                    'P813': [_synthetic_snak(rng, 'P813', 'time', 'time')],
+                }}],
+            })
+        claims[pid] = statements
+    item = {
+        'type': 'item', 'id': 'Q1', 'lastrevid': 1,
+        'labels': {'en': {'language': 'en', 'value': 'Synthetic format'}},
+        'descriptions': {'en': {'language': 'en', 'value': 'benchmark item'}},
+        'aliases': {'en': [{'language': 'en', 'value': 'synthetic'}]},
+        'claims': claims,
+    }
+    return Fixtures({'Q1': item}, properties, formatter_urls, image_urls)
+
+
+def synthetic_bindings(count=SYNTHETIC_BINDINGS, seed=SYNTHETIC_SEED):
+    """
+    Build raw SPARQL JSON bindings shaped like a property details result.
+
+    Args:
+        count (int): number of rows
+        seed (int):
+
+    Returns (List[Dict]):
+
+    """
+    rng = random.Random(seed)
+    bindings = []
+    for number in range(count):
+        binding = {
+            'id': {'type': 'literal', 'value': f"P{number}"},
+            'property': {'type': 'uri',
+                         'value': f"http://www.wikidata.org/entity/P{number}"},
+            'propertyLabel': {'type': 'literal', 'xml:lang': 'en',
+                              'value': f"property {number}"},
+            'value_type': {'type': 'literal', 'value': rng.choice(
+                ['WikibaseItem', 'ExternalId', 'String', 'Time'])},
+        }
+        if rng.random() < 0.3:
+            binding['formatter_url'] = {
+                'type': 'literal', 'value': f"https://example.org/{number}/$1"}
+        bindings.append(binding)
+    return bindings
+
+
+def _synthetic_snak(rng, pid, datatype, value_type):
+    if value_type == 'wikibase-entityid':
+        entity_type = 'property' if datatype == 'wikibase-property' else 'item'
+        numeric_id = rng.randint(1, 10 ** 7)
+        prefix = 'P' if entity_type == 'property' else 'Q'
+        value = {'entity-type': entity_type, 'numeric-id': numeric_id,
+                 'id': f"{prefix}{numeric_id}"}
+    elif value_type == 'time':
+        value = {'time': f"+{rng.randint(1950, 2020)}-{rng.randint(1, 12):02d}"
+                         f"-{rng.randint(1, 28):02d}T00:00:00Z",
+                 'timezone': 0, 'before': 0, 'after': 0, 'precision': 11,
+                 'calendarmodel': 'http://www.wikidata.org/entity/Q1985727'}
+    elif value_type == 'quantity':
+        value = {'amount': f"+{rng.randint(1, 10 ** 6)}", 'unit': '1'}
+    elif value_type == 'monolingualtext':
+        value = {'text': f"text {rng.randint(1, 10 ** 6)}", 'language': 'en'}
+    elif datatype == 'url':
+        value = f"https://www.example.org/{rng.randint(1, 10 ** 6)}/spec.html"
+    elif datatype == 'commonsMedia':
+        value = f"Example {rng.randint(1, 10 ** 6)}.png"
+    else:
+        value = f"value-{rng.randint(1, 10 ** 6)}"
+    return {
+        'snaktype': 'value',
+        'property': pid,
+        'hash': f"{rng.getrandbits(160):040x}",
+        'datavalue': {'value': value, 'type': value_type},
+        'datatype': datatype,
+    }
+
+
+def _read_json(path):
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+def _write_json(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as json_file:
+        json.dump(value, json_file, indent=1, sort_keys=True)
+
+
+def record(qids):
+    """
+    Fetch items and their dependencies from Wikidata into FIXTURE_DIR.
+
+    Args:
+        qids (List[str]):
+
+    """
+    # pylint: disable=C0415
+    from wikidp.utils import (
+        build_property_loader,
+        get_external_id_formatter_urls,
+        iter_item_snaks,
+    )
+    from wikidp.utils import commons
+    from wikidp.utils.wd_int_utils import WIKIBASE_CLIENT
+    from wikidp.const import WIKIMEDIA_IMAGE_PIDS
+
+    items = WIKIBASE_CLIENT.get_entities(qids)
+    pids = set()
+    titles = set()
+    for qid, item in items.items():
+        _write_json(os.path.join(ITEM_DIR, f"{qid}.json"), item)
+        for pid, snak in iter_item_snaks(item):
+            pids.add(pid)
+            if pid in WIKIMEDIA_IMAGE_PIDS:
+                titles.add(snak.get('datavalue', {}).get('value'))
+    properties = build_property_loader().load_many(sorted(pids))
+    _write_json(PROPERTIES_FILE, {pid: prop for pid, prop in properties.items()
+                                  if prop})
+    _write_json(FORMATTER_URLS_FILE, get_external_id_formatter_urls())
+    _write_json(IMAGE_URLS_FILE, commons.resolve_image_urls(filter(None, titles)))
+
+
+if __name__ == '__main__':
+    record(sys.argv[1:] or RECORDED_QIDS)
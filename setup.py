@@ -21,6 +21,7 @@ INSTALL_REQUIRES = [
     'numpy==1.18.2',
     'pandas==1.0.3',
     'python-dateutil==2.8.1',
+    'requests>=2.22.0',
     'flask-mwoauth>=0.4.81',
     'tqdm==4.45.0',
     'validators==0.14.3'
@@ -30,6 +31,7 @@ PYTHON_REQUIRES = '>=3.6, <4'
 TEST_DEPS = [
     'pre-commit',
     'pytest',
+    'pytest-benchmark',
     'pylint',
     'pytest-coverage'
 ]
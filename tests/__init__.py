@@ -0,0 +1,27 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests, run without the background refresh threads."""
+import os
+import tempfile
+
+# Read by wikidp.config, so set before any test imports the app
+os.environ.setdefault('WIKIDP_BACKGROUND_REFRESH', 'false')
+# Replay recorded responses when there are any, see README "Running offline"
+_FIXTURE_DIR = os.getenv('WIKIDP_HTTP_FIXTURES', os.path.join(
+    os.path.dirname(__file__), 'fixtures', 'http'))
+if os.path.isdir(_FIXTURE_DIR) and any(not name.startswith('.')
+                                      for name in os.listdir(_FIXTURE_DIR)):
+    os.environ.setdefault('WIKIDP_HTTP_REPLAY', 'replay')
+# Recording or replaying, start from empty caches so every request the
+# tests make reaches the transport
+if os.getenv('WIKIDP_HTTP_REPLAY'):
+    os.environ.setdefault('WIKIDP_CACHE_DIR', tempfile.mkdtemp(prefix='wikidp-'))
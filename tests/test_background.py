@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for periodically refreshed values."""
+import threading
+from unittest import TestCase
+
+from wikidp.config import APP
+from wikidp.const import ConfKey
+from wikidp.utils import background
+from wikidp.utils.background import PeriodicRefresh
+
+
+class PeriodicRefreshTests(TestCase):
+    def setUp(self):
+        self.results = []
+        self.calls = 0
+        self.called = threading.Event()
+        self.refresher = PeriodicRefresh('test', self._load, interval=60,
+                                         retry_delay=0.01)
+
+    def tearDown(self):
+        self.refresher.stop()
+        background.REFRESHERS.remove(self.refresher)
+
+    def _load(self):
+        self.calls += 1
+        if not self.results:
+            self.called.set()
+            return 'done'
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def test_refresh__builds_value(self):
+        self.assertIsNone(self.refresher.value)
+        self.assertIsNone(self.refresher.age)
+        self.results = ['first']
+        self.assertTrue(self.refresher.refresh())
+        self.assertEqual(self.refresher.value, 'first')
+        self.assertGreaterEqual(self.refresher.age, 0)
+
+    def test_refresh__failure_keeps_previous_value(self):
+        self.results = ['first', ValueError('upstream')]
+        self.refresher.refresh()
+        built_at = self.refresher.built_at
+        self.assertFalse(self.refresher.refresh())
+        self.assertEqual(self.refresher.value, 'first')
+        self.assertEqual(self.refresher.built_at, built_at)
+
+    def test_get__concurrent_callers_share_first_build(self):
+        release = threading.Event()
+        builds = []
+
+        def slow():
+            builds.append(1)
+            release.wait(5)
+            raise ValueError('upstream')
+        self.refresher._loader = slow
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(self.refresher.get()))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        threading.Timer(0.1, release.set).start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [None] * 5)
+        self.assertEqual(len(builds), 1)
+        self.refresher._loader = self._load
+        self.assertEqual(self.refresher.get(), 'done')
+        self.assertEqual(self.refresher.get(), 'done')
+        self.assertEqual(self.calls, 1)
+
+    def test_start__retries_failures_before_interval(self):
+        self.results = [ValueError('upstream'), ValueError('upstream')]
+        self.refresher.start()
+        self.assertTrue(self.called.wait(5))
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(self.refresher.value, 'done')
+
+    def test_background_refresh__disabled_under_tests(self):
+        self.assertFalse(APP.config[ConfKey.BACKGROUND_REFRESH])
+        names = {f"refresh-{refresher.name}"
+                 for refresher in background.REFRESHERS
+                 if refresher is not self.refresher}
+        self.assertFalse(names.intersection(
+            thread.name for thread in threading.enumerate()))
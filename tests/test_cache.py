@@ -0,0 +1,295 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for WikiDP result caches."""
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from wikidp.utils.cache import (
+    EntityCache,
+    make_cache_key,
+    ResultCache,
+)
+from wikidp.utils.entity_store import EntityStore
+from wikidp.utils.errors import WikibaseReadError
+from wikidp.utils.singleflight import SingleFlight
+
+
+class FakeClient:
+    def __init__(self):
+        self.revisions = {'Q1': 10, 'Q2': 20}
+        self.requests = []
+        self.failing = False
+
+    def read_entities(self, entity_ids, props=None):
+        entity_ids = list(entity_ids)
+        self.requests.append((entity_ids, props))
+        if self.failing:
+            raise WikibaseReadError('upstream')
+        found = {
+            entity_id: {'id': entity_id, 'lastrevid': self.revisions[entity_id]}
+            for entity_id in entity_ids if entity_id in self.revisions
+        }
+        return found, set(entity_ids) - set(found)
+
+
+class ResultCacheTests(TestCase):
+    def test_make_cache_key__normalizes_whitespace(self):
+        key = make_cache_key('endpoint', 'SELECT ?a\n  WHERE { ?a ?b ?c }')
+        self.assertEqual(key, make_cache_key('endpoint', 'SELECT ?a WHERE { ?a ?b ?c }'))
+        self.assertNotEqual(key, make_cache_key('other', 'SELECT ?a WHERE { ?a ?b ?c }'))
+
+    def test_get__returns_copy(self):
+        cache = ResultCache(max_bytes=1024, default_ttl=60)
+        cache.set('key', [{'id': 'P31'}])
+        cache.get('key')[0]['id'] = 'changed'
+        self.assertEqual(cache.get('key'), [{'id': 'P31'}])
+
+    def test_get__expired(self):
+        cache = ResultCache(max_bytes=1024, default_ttl=60)
+        cache.set('key', 'value', ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+
+    def test_set__evicts_least_recently_used_by_size(self):
+        cache = ResultCache(max_bytes=20, default_ttl=60)
+        cache.set('a', 'aaaaaa')
+        cache.set('b', 'bbbbbb')
+        cache.get('a')
+        cache.set('c', 'cccccc')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'aaaaaa')
+        self.assertLessEqual(cache.size, 20)
+
+    def test_get_or_set__calls_loader_once(self):
+        cache = ResultCache(max_bytes=1024, default_ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {'results': {'bindings': []}}
+        cache.get_or_set('key', loader)
+        cache.get_or_set('key', loader)
+        self.assertEqual(len(calls), 1)
+
+    def test_disk_tier__survives_new_instance(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ResultCache(max_bytes=1024, default_ttl=60,
+                        directory=directory).set('key', {'a': 1})
+            cache = ResultCache(max_bytes=1024, default_ttl=60,
+                                directory=directory)
+            self.assertEqual(cache.get('key'), {'a': 1})
+            cache.delete('key')
+            self.assertIsNone(cache.get('key'))
+
+    def test_disk_tier__pruned_to_budget(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(max_bytes=1024, default_ttl=60,
+                                directory=directory, max_disk_bytes=300)
+            cache.set('expired', 'x' * 50, ttl=0.01)
+            time.sleep(0.02)
+            for index in range(10):
+                cache.set(f"key{index}", 'x' * 50)
+            cache.clear()
+            sizes = [os.path.getsize(os.path.join(path, filename))
+                     for path, _, filenames in os.walk(directory)
+                     for filename in filenames]
+            self.assertLessEqual(sum(sizes), 300)
+            self.assertIsNone(cache.get('expired'))
+            self.assertEqual(cache.get('key9'), 'x' * 50)
+
+
+class EntityCacheTests(TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+
+    def test_get_many__fresh_entries_served_locally(self):
+        cache = EntityCache(self.client, fresh_for=60, max_entries=10)
+        cache.get_many(['Q1', 'Q2', 'Q3'])
+        self.assertEqual(cache.get_many(['Q1', 'Q2']),
+                         {'Q1': {'id': 'Q1', 'lastrevid': 10},
+                          'Q2': {'id': 'Q2', 'lastrevid': 20}})
+        self.assertEqual(self.client.requests, [(['Q1', 'Q2', 'Q3'], None)])
+
+    def test_get_many__stale_entries_refetched_only_if_revision_moved(self):
+        cache = EntityCache(self.client, fresh_for=0, max_entries=10)
+        cache.get_many(['Q1', 'Q2'])
+        self.client.revisions['Q2'] = 21
+        self.assertEqual(cache.get('Q2')['lastrevid'], 21)
+        cache.get_many(['Q1', 'Q2'])
+        self.assertEqual(self.client.requests[1:], [
+            (['Q2'], 'info'),
+            (['Q2'], None),
+            (['Q1', 'Q2'], 'info'),
+        ])
+
+    def test_get__drops_deleted_entities(self):
+        cache = EntityCache(self.client, fresh_for=0, max_entries=10)
+        cache.get('Q1')
+        del self.client.revisions['Q1']
+        self.assertIsNone(cache.get('Q1'))
+        self.assertEqual(len(cache), 0)
+
+    def test_get_many__upstream_error_serves_stale_entries(self):
+        cache = EntityCache(self.client, fresh_for=0, max_entries=10)
+        cache.get_many(['Q1', 'Q2'])
+        self.client.failing = True
+        self.assertEqual(cache.get_many(['Q1', 'Q2']),
+                         {'Q1': {'id': 'Q1', 'lastrevid': 10},
+                          'Q2': {'id': 'Q2', 'lastrevid': 20}})
+        self.assertEqual(len(cache), 2)
+        with self.assertRaises(WikibaseReadError):
+            cache.get_many(['Q1', 'Q3'])
+        self.client.failing = False
+        self.client.revisions['Q2'] = 21
+        original = self.client.read_entities
+
+        def fail_full_reads(entity_ids, props=None):
+            if props is None:
+                raise WikibaseReadError('upstream')
+            return original(entity_ids, props)
+        self.client.read_entities = fail_full_reads
+        self.assertEqual(cache.get('Q2'), {'id': 'Q2', 'lastrevid': 20})
+
+    def test_get_many__bounded_entries(self):
+        cache = EntityCache(self.client, fresh_for=60, max_entries=1)
+        cache.get_many(['Q1', 'Q2'])
+        self.assertEqual(len(cache), 1)
+
+    def test_get_many__store_read_through(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = EntityStore(os.path.join(directory, 'entities.sqlite3'))
+            EntityCache(self.client, fresh_for=60, max_entries=10,
+                        store=store).get_many(['Q1', 'Q2'])
+            self.assertEqual(len(store), 2)
+            cache = EntityCache(self.client, fresh_for=60, max_entries=10,
+                                store=store)
+            self.assertEqual(cache.get('Q1'), {'id': 'Q1', 'lastrevid': 10})
+            self.assertEqual(len(self.client.requests), 1)
+            cache = EntityCache(self.client, fresh_for=0, max_entries=10,
+                                store=store)
+            self.assertEqual(cache.get('Q2'), {'id': 'Q2', 'lastrevid': 20})
+            self.assertEqual(self.client.requests[1:], [(['Q2'], 'info')])
+
+    def test_get_many__deleted_entities_removed_from_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = EntityStore(os.path.join(directory, 'entities.sqlite3'))
+            cache = EntityCache(self.client, fresh_for=0, max_entries=10,
+                                store=store)
+            cache.get_many(['Q1', 'Q2'])
+            del self.client.revisions['Q1']
+            self.assertEqual(list(cache.get_many(['Q1', 'Q2'])), ['Q2'])
+            self.assertIsNone(store.get('Q1'))
+            self.assertEqual(len(store), 1)
+
+
+class EntityStoreTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = EntityStore(os.path.join(self.directory.name, 'e.sqlite3'))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def _entity(qid, revision, *classes):
+        claims = [{'mainsnak': {'datavalue': {'value': {'id': class_id}}}}
+                  for class_id in classes]
+        return {'id': qid, 'lastrevid': revision, 'claims': {'P31': claims}}
+
+    def test_put_many__get_many(self):
+        entity = self._entity('Q1', 10, 'Q235557')
+        self.store.put_many({'Q1': entity}, checked_at=5.0)
+        self.assertEqual(self.store.get_many(['Q1', 'Q2']),
+                         {'Q1': (entity, 10, 5.0)})
+        self.store.touch(['Q1'], checked_at=6.0)
+        self.assertEqual(self.store.get('Q1')[2], 6.0)
+
+    def test_ids_by_class__follows_updates(self):
+        self.store.put_many({'Q2': self._entity('Q2', 1, 'Q235557'),
+                             'Q1': self._entity('Q1', 1, 'Q235557', 'Q7397')},
+                            checked_at=0)
+        self.assertEqual(self.store.ids_by_class('Q235557'), ['Q1', 'Q2'])
+        self.assertEqual(self.store.ids_by_class('Q235557', limit=1, offset=1),
+                         ['Q2'])
+        self.store.put_many({'Q1': self._entity('Q1', 2, 'Q7397')}, checked_at=0)
+        self.assertEqual(self.store.ids_by_class('Q235557'), ['Q2'])
+        self.assertEqual(self.store.count_by_class('Q7397'), 1)
+        self.store.delete(['Q1'])
+        self.assertEqual(self.store.count_by_class('Q7397'), 0)
+        self.assertEqual(len(self.store), 1)
+
+
+class SingleFlightTests(TestCase):
+    def _run_concurrently(self, func, count=5):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(func()))
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_do__concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(1)
+            return 'value'
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results = self._run_concurrently(lambda: flight.do('key', slow))
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.shared, 4)
+
+    def test_do__error_shared_and_not_remembered(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError('upstream')
+        self.assertRaises(ValueError, flight.do, 'key', fail)
+        self.assertEqual(flight.do('key', lambda: 'value'), 'value')
+
+    def test_do__lock_dir_rechecks_shared_storage(self):
+        with tempfile.TemporaryDirectory() as directory:
+            flight = SingleFlight(lock_dir=directory)
+            self.assertEqual(flight.do('key', lambda: 'value',
+                                       recheck=lambda: (True, 'cached')), 'value')
+
+    def test_do__lock_files_striped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            flight = SingleFlight(lock_dir=directory, lock_stripes=4)
+            for index in range(50):
+                self.assertEqual(flight.do(f"key/{index}", lambda: index), index)
+            self.assertLessEqual(len(os.listdir(directory)), 4)
+
+    def test_result_cache__get_or_set_copies_shared_result(self):
+        cache = ResultCache(max_bytes=1024, default_ttl=60,
+                            single_flight=SingleFlight())
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'results': {'bindings': []}}
+        results = self._run_concurrently(lambda: cache.get_or_set('key', loader))
+        self.assertEqual(len(calls), 1)
+        results[0]['results'] = None
+        self.assertEqual(cache.get('key'), {'results': {'bindings': []}})
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the in memory file format catalog."""
+from unittest import TestCase
+
+from wikidp.models import (
+    FileFormatCatalog,
+    FileFormatExtSearchResult,
+    PuidSearchResult,
+)
+
+
+class FileFormatCatalogTests(TestCase):
+    def setUp(self):
+        self.catalog = FileFormatCatalog('en')
+        self.catalog.add('Q178051', 'Portable Network Graphics', 'image format',
+                         puids=['fmt/11', 'fmt/12'], mimes=['image/png'],
+                         extensions=['png'])
+        self.catalog.add('Q215106', 'Tagged Image File Format', 'image format',
+                         puids=['fmt/353'], extensions=['tif', 'TIFF'])
+        self.catalog.add('Q1', 'Extension only', '', extensions=['tiffx'])
+
+    def test_search_puid(self):
+        results = self.catalog.search_puid('fmt/353')
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], PuidSearchResult)
+        self.assertEqual(results[0].format, 'Q215106')
+        self.assertEqual(results[0].mime, 'unknown')
+        self.assertEqual(self.catalog.search_puid('fmt/0'), [])
+
+    def test_search_mime__one_result_per_puid(self):
+        results = self.catalog.search_mime('image/png')
+        self.assertEqual([res.puid for res in results], ['fmt/11', 'fmt/12'])
+        self.assertEqual({res.label for res in results},
+                         {'Portable Network Graphics'})
+
+    def test_search_extension__substring_once_per_format(self):
+        results = self.catalog.search_extension('.TIF')
+        self.assertEqual([res.format for res in results], ['Q215106', 'Q1'])
+        self.assertIsInstance(results[0], FileFormatExtSearchResult)
+        self.assertEqual(self.catalog.search_extension('jpg'), [])
+
+    def test_search_extension__ranked(self):
+        self.catalog.add('Q2', 'Contains tif', '', extensions=['gtif'])
+        results = self.catalog.search_extension('tif')
+        self.assertEqual([res.format for res in results], ['Q215106', 'Q1', 'Q2'])
+        results = self.catalog.search_extension('tif', prefix=True, limit=1)
+        self.assertEqual([res.format for res in results], ['Q215106'])
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for Wikimedia Commons url resolution."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from wikidp.utils import commons
+
+SAMPLE_RESPONSE = {
+    'query': {
+        'normalized': [
+            {'from': 'File:Скриншот sublime text 2.png',
+             'to': 'File:Скриншот sublime text 2.png'},
+            {'from': 'File:debian-OpenLogo.svg', 'to': 'File:Debian-OpenLogo.svg'},
+        ],
+        'pages': {
+            '-1': {'title': 'File:Missing.png', 'missing': ''},
+            '1': {'title': 'File:Debian-OpenLogo.svg',
+                  'imageinfo': [{'url': 'https://upload.wikimedia.org/debian.svg'}]},
+            '2': {'title': 'File:Скриншот sublime text 2.png',
+                  'imageinfo': [{'url': 'https://upload.wikimedia.org/sublime.png'}]},
+        },
+    },
+}
+
+
+class CommonsTests(TestCase):
+    def setUp(self):
+        commons.IMAGE_URL_CACHE.clear()
+
+    @patch('wikidp.utils.http.get_json', return_value=SAMPLE_RESPONSE)
+    def test_resolve_image_urls__single_batched_query(self, get_json):
+        titles = ['debian-OpenLogo.svg', 'Скриншот sublime text 2.png', 'Missing.png']
+        urls = commons.resolve_image_urls(titles)
+        self.assertEqual(get_json.call_count, 1)
+        self.assertEqual(urls['debian-OpenLogo.svg'],
+                         'https://upload.wikimedia.org/debian.svg')
+        self.assertEqual(urls['Скриншот sublime text 2.png'],
+                         'https://upload.wikimedia.org/sublime.png')
+        self.assertEqual(urls['Missing.png'],
+                         'https://commons.wikimedia.org/wiki/File:Missing.png')
+
+    @patch('wikidp.utils.http.get_json', return_value=SAMPLE_RESPONSE)
+    def test_resolve_image_urls__cached_including_missing(self, get_json):
+        commons.resolve_image_urls(['debian-OpenLogo.svg', 'Missing.png'])
+        commons.resolve_image_urls(['debian-OpenLogo.svg', 'Missing.png'])
+        self.assertEqual(get_json.call_count, 1)
+
+    @patch('wikidp.utils.http.get_json', return_value={'query': {}})
+    def test_resolve_image_urls__chunked(self, get_json):
+        titles = [f"Image {index}.png" for index in range(120)]
+        commons.resolve_image_urls(titles)
+        self.assertEqual(get_json.call_count, 3)
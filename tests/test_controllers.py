@@ -10,10 +10,26 @@
 # about the terms of this license.
 #
 """Unit tests for WikiDP Controllers."""
+import json
+import os
+import tempfile
+import time
 from unittest import TestCase
+from unittest.mock import (
+    MagicMock,
+    patch,
+)
+
+import requests
 
 from tests import settings
+from wikidp.const import DEFAULT_PID_LIST
+from wikidp.controllers import api as api_controller
 from wikidp.controllers import pages as pages_controller
+from wikidp.controllers import search as search_controller
+from wikidp.utils import http
+from wikidp.utils.errors import WikibaseReadError
+from wikidp.utils.schemas import SchemaRegistry
 
 
 class ControllerTests(TestCase):
@@ -21,3 +37,203 @@ class ControllerTests(TestCase):
     def test_controller_pages_get_checklist_context__no_schema(self):
         output = pages_controller.get_property_checklist_from_schema(settings.SAMPLE_QID)
         self.assertEqual(output, [])
+
+
+class ChecklistControllerTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'format.json')
+        self._write_schema(['P31', 'P1163'])
+        registry = SchemaRegistry(self.temp_dir.name, api_controller.parse_expressions,
+                                  check_interval=None)
+        self.loader = MagicMock()
+        self.loader.load_many.side_effect = lambda pids: {
+            pid: {'id': pid, 'propertyLabel': pid} for pid in pids}
+        self.patches = [
+            patch.object(api_controller, 'SCHEMA_REGISTRY', registry),
+            patch.object(api_controller, 'build_property_loader',
+                         return_value=self.loader),
+            patch.object(api_controller.PROPERTY_CHECKLISTS, '_value', None),
+            patch.dict(api_controller._REQUEST_CHECKLISTS, clear=True),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+        self.registry = registry
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        self.temp_dir.cleanup()
+
+    def _write_schema(self, pids, mtime=None):
+        expressions = [{'predicate': f"http://www.wikidata.org/prop/direct/{pid}"}
+                       for pid in pids]
+        with open(self.path, 'w') as schema_file:
+            json.dump({'shapes': [{'expression': {'expressions': expressions}}]},
+                      schema_file)
+        if mtime:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_get_property_checklist_from_schema__materialized_once(self):
+        checklist = api_controller.get_property_checklist_from_schema('format.json')
+        self.assertEqual(sorted(prop['id'] for prop in checklist[:2]),
+                         ['P1163', 'P31'])
+        self.assertEqual(len(checklist), 2 + len([
+            pid for pid in DEFAULT_PID_LIST if pid not in ('P31', 'P1163')]))
+        self.assertTrue(all(prop['hidden'] for prop in checklist[2:]))
+        self.assertEqual(api_controller.get_property_checklist_from_schema(
+            'format.json', include_default=False), checklist[:2])
+        self.assertEqual(self.loader.load_many.call_count, 1)
+
+    def test_get_materialized_checklist__rebuilt_when_schema_changes(self):
+        first = api_controller.get_materialized_checklist('format.json')
+        self._write_schema(['P18'], mtime=1)
+        self.registry.reload()
+        second = api_controller.get_materialized_checklist('format.json')
+        self.assertEqual(second.properties[0]['id'], 'P18')
+        self.assertNotEqual(first.snapshot.etag, second.snapshot.etag)
+        self.assertIs(api_controller.get_materialized_checklist('format.json'),
+                      second)
+        self.assertIsNone(api_controller.get_materialized_checklist('missing.json'))
+
+    def test_get_materialized_checklist__only_requested_schema_built(self):
+        with patch.object(api_controller.PROPERTY_CHECKLISTS, 'refresh') as refresh:
+            api_controller.get_materialized_checklist('format.json')
+            api_controller.get_materialized_checklist('format.json')
+        refresh.assert_not_called()
+        self.assertEqual(self.loader.load_many.call_count, 1)
+
+    def test_get_materialized_checklist__refreshed_checklist_served(self):
+        built = api_controller.get_materialized_checklist('format.json')
+        self.loader.load_many.side_effect = lambda pids: {
+            pid: {'id': pid, 'propertyLabel': f"{pid} refreshed"} for pid in pids}
+        api_controller.PROPERTY_CHECKLISTS.refresh()
+        refreshed = api_controller.get_materialized_checklist('format.json')
+        self.assertIsNot(refreshed, built)
+        self.assertEqual(refreshed.properties[0]['propertyLabel'],
+                         f"{refreshed.properties[0]['id']} refreshed")
+        self.assertNotIn(('format.json', api_controller.CHECKLIST_LANGUAGE),
+                         api_controller._REQUEST_CHECKLISTS)
+
+    def test_get_materialized_checklist__build_error_serves_last_checklist(self):
+        self.loader.load_many.side_effect = lambda pids: {}
+        self.assertIsNone(api_controller.get_materialized_checklist('format.json'))
+        self.assertEqual(api_controller.get_property_checklist_from_schema(
+            'format.json'), [])
+        self.loader.load_many.side_effect = lambda pids: {
+            pid: {'id': pid, 'propertyLabel': pid} for pid in pids}
+        first = api_controller.get_materialized_checklist('format.json')
+        self._write_schema(['P18'], mtime=1)
+        self.registry.reload()
+        self.loader.load_many.side_effect = requests.ConnectionError('down')
+        self.assertIs(api_controller.get_materialized_checklist('format.json'),
+                      first)
+
+
+class FileFormatSnapshotTests(TestCase):
+    def test_get_file_format_snapshot__falls_back_to_stored_formats(self):
+        items = {
+            'Q2': {'id': 'Q2', 'labels': {'en': {'value': 'TIFF'}},
+                   'claims': {'P1163': [{'mainsnak': {'datavalue': {
+                       'value': 'image/tiff'}}}]}},
+            'Q1': {'id': 'Q1', 'labels': {}, 'claims': {}},
+        }
+        with patch.object(api_controller.FILE_FORMAT_SNAPSHOT, 'get',
+                          return_value=None), \
+                patch.object(api_controller.wd_int_utils,
+                             'get_stored_item_ids_by_class',
+                             return_value=['Q1', 'Q2', 'Q3']) as stored, \
+                patch.object(api_controller.wd_int_utils, 'get_items_json',
+                             return_value=items):
+            snapshot = api_controller.get_file_format_snapshot()
+        stored.assert_called_once_with('Q235557')
+        self.assertEqual(json.loads(snapshot.body), [
+            {'qid': 'Q1', 'name': 'Q1', 'media_types': []},
+            {'qid': 'Q2', 'name': 'TIFF', 'media_types': ['image/tiff']},
+        ])
+
+
+class SearchControllerTests(TestCase):
+    def test_get_search_result_context__merges_sources_in_order(self):
+        with patch.object(search_controller, '_search_extension',
+                          return_value=[{'qid': 'Q1'}, {'qid': 'Q2'}]), \
+                patch.object(search_controller, 'search_result_list',
+                             return_value=[{'qid': 'Q2'}, {'qid': 'Q3'}]):
+            context, partial = search_controller.get_search_result_context('tif')
+        self.assertEqual([x['qid'] for x in context], ['Q1', 'Q2', 'Q3'])
+        self.assertFalse(partial)
+
+    def test_get_search_result_context__deadline(self):
+        def slow_search(_):
+            time.sleep(0.5)
+            return [{'qid': 'Q2'}]
+        with patch.object(search_controller, '_search_extension',
+                          return_value=[{'qid': 'Q1'}]), \
+                patch.object(search_controller, 'search_result_list',
+                             side_effect=slow_search):
+            context, partial = search_controller.get_search_result_context(
+                'tif', deadline=0.05)
+        self.assertEqual(context, [{'qid': 'Q1'}])
+        self.assertTrue(partial)
+
+    def test_get_search_result_context__requests_bounded_by_deadline(self):
+        timeouts = []
+
+        def search(_):
+            timeouts.append(http.request_timeout((5, 30)))
+            return []
+        with patch.object(search_controller, '_search_extension',
+                          side_effect=search), \
+                patch.object(search_controller, 'search_result_list',
+                             side_effect=search):
+            search_controller.get_search_result_context('tif', deadline=1)
+        self.assertEqual(len(timeouts), 2)
+        for connect, read in timeouts:
+            self.assertLessEqual(connect, 1)
+            self.assertLessEqual(read, 1)
+        self.assertEqual(http.request_timeout((5, 30)), (5, 30))
+
+    def test_search_items__keeps_hit_match(self):
+        match = {'type': 'alias', 'language': 'en', 'text': 'PNG'}
+        hits = [
+            {'id': 'Q1', 'label': 'Portable Network Graphics',
+             'description': 'format', 'aliases': ['PNG'], 'match': match},
+            {'id': 'Q2', 'match': {'type': 'label', 'language': 'de',
+                                   'text': 'Bild'}},
+        ]
+        loaded = {'qid': 'Q2', 'label': 'Image', 'description': ''}
+        with patch.object(search_controller.wd_int_utils, 'search_items',
+                          return_value=hits), \
+                patch.object(search_controller.wd_int_utils, 'get_items_terms',
+                             return_value={}), \
+                patch.object(search_controller, '_summarize_items',
+                             return_value=[loaded]):
+            summaries = search_controller._search_items('png', 10)
+        self.assertEqual(summaries[0]['match'], match)
+        self.assertEqual(summaries[0]['label'], 'Portable Network Graphics')
+        self.assertEqual(summaries[1]['label'], 'Image')
+        self.assertEqual(summaries[1]['match']['text'], 'Bild')
+        self.assertNotIn('match', loaded)
+
+    def test_search_items__all_aliases_read_in_one_call(self):
+        hits = [
+            {'id': 'Q1', 'label': 'Portable Network Graphics',
+             'description': 'format', 'aliases': ['PNG']},
+            {'id': 'Q2', 'label': 'Portable Pixmap', 'description': 'format'},
+        ]
+        terms = {'Q1': {'aliases': {'en': [{'language': 'en', 'value': 'PNG'},
+                                           {'language': 'en', 'value': '.png'}]}}}
+        with patch.object(search_controller.wd_int_utils, 'search_items',
+                          return_value=hits), \
+                patch.object(search_controller.wd_int_utils, 'get_items_terms',
+                             return_value=terms) as get_terms:
+            summaries = search_controller._search_items('portable', 10)
+        get_terms.assert_called_once_with(['Q1', 'Q2'], props='aliases')
+        self.assertEqual(summaries[0]['aliases'], ['PNG', '.png'])
+        self.assertEqual(summaries[1]['aliases'], [])
+        with patch.object(search_controller.wd_int_utils, 'search_items',
+                          return_value=hits), \
+                patch.object(search_controller.wd_int_utils, 'get_items_terms',
+                             side_effect=WikibaseReadError('down')):
+            summaries = search_controller._search_items('portable', 10)
+        self.assertEqual(summaries[0]['aliases'], ['PNG'])
@@ -0,0 +1,36 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the shared HTTP session."""
+from unittest import TestCase
+
+from urllib3.response import HTTPResponse
+
+from wikidp.utils import http
+
+
+class RetryTests(TestCase):
+    def test_build_session__retries_mounted(self):
+        session = http.build_session(pool_size=1, retries=3)
+        retry = session.get_adapter('https://').max_retries
+        self.assertEqual(retry.total, 3)
+        self.assertTrue(retry.is_retry('POST', 503))
+        self.assertTrue(retry.is_retry('GET', 429, has_retry_after=True))
+        self.assertFalse(retry.is_retry('GET', 404))
+        self.assertFalse(retry.raise_on_status)
+
+    def test_get_retry_after__capped(self):
+        retry = http.CappedRetry(total=2, retry_after_max=5)
+        response = HTTPResponse(status=429, headers={'Retry-After': '3600'})
+        self.assertEqual(retry.get_retry_after(response), 5)
+        response = HTTPResponse(status=429, headers={'Retry-After': '1'})
+        self.assertEqual(retry.new(total=1).get_retry_after(response), 1)
+        self.assertIsNone(retry.get_retry_after(HTTPResponse(status=503)))
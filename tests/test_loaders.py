@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for WikiDP batch loaders."""
+from unittest import TestCase
+
+from wikidp.utils.loaders import BatchLoader
+
+
+class BatchLoaderTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def batch_fn(keys):
+            self.calls.append(list(keys))
+            return {key: key.lower() for key in keys if key != 'P0'}
+        self.loader = BatchLoader(batch_fn, max_batch_size=2)
+
+    def test_load__primed_keys_resolved_in_chunks(self):
+        self.loader.prime(['P1', 'P2', 'P3'])
+        self.assertEqual(self.loader.load('P1'), 'p1')
+        self.assertEqual(self.loader.load('P3'), 'p3')
+        self.assertEqual(self.calls, [['P1', 'P2'], ['P3']])
+
+    def test_load__missing_key_not_requested_twice(self):
+        self.assertIsNone(self.loader.load('P0'))
+        self.assertIsNone(self.loader.load('P0'))
+        self.assertEqual(self.loader.batch_count, 1)
+
+    def test_load_many(self):
+        self.loader.load('P1')
+        self.assertEqual(self.loader.load_many(['P1', 'P2']),
+                         {'P1': 'p1', 'P2': 'p2'})
+        self.assertEqual(self.calls, [['P1'], ['P2']])
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for request scoped memoization."""
+from unittest import (
+    TestCase,
+    mock,
+)
+
+from flask import Flask
+
+from wikidp.utils import wd_int_utils
+from wikidp.utils.memo import (
+    get_memo_stats,
+    request_memo,
+)
+
+APP = Flask(__name__)
+
+
+class RequestMemoTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        @request_memo('item', copy=dict)
+        def load(qid):
+            self.calls.append(qid)
+            return {'qid': qid}
+        self.load = load
+
+    def test_request_memo__once_per_request(self):
+        with APP.test_request_context():
+            self.load('Q1')['label'] = 'changed'
+            self.assertEqual(self.load('Q1'), {'qid': 'Q1'})
+            self.load('Q2')
+            self.assertEqual(get_memo_stats(), {'item': {'hits': 1, 'misses': 2}})
+        with APP.test_request_context():
+            self.load('Q1')
+        self.assertEqual(self.calls, ['Q1', 'Q2', 'Q1'])
+
+    def test_request_memo__outside_request(self):
+        self.load('Q1')
+        self.load('Q1')
+        self.assertEqual(self.calls, ['Q1', 'Q1'])
+        self.assertEqual(get_memo_stats(), {})
+
+    def test_get_items_json__generator_with_memo(self):
+        def get_many(qids):
+            return {qid: {'id': qid} for qid in qids}
+        with mock.patch.object(wd_int_utils.ENTITY_CACHE, 'get_many',
+                               side_effect=get_many), \
+                APP.test_request_context():
+            wd_int_utils.get_items_json(['Q1'])
+            items = wd_int_utils.get_items_json(qid for qid in ('Q1', 'Q2'))
+            self.assertEqual(get_memo_stats(),
+                             {'item_json': {'hits': 1, 'misses': 2}})
+        self.assertEqual(items, {'Q1': {'id': 'Q1'}, 'Q2': {'id': 'Q2'}})
@@ -0,0 +1,43 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the n-gram substring index."""
+from unittest import TestCase
+
+from wikidp.utils.ngram import NgramIndex
+
+EXTENSIONS = ['tif', 'tiff', 'gtiff', 'jpg', 'jpeg', 'mpeg', 'png', 'tar.gz']
+
+
+class NgramIndexTests(TestCase):
+    def setUp(self):
+        self.index = NgramIndex(keys=EXTENSIONS)
+
+    def test_search__matches_plain_substring_test(self):
+        for query in ['', 't', 'ti', 'if', 'tiff', 'peg', 'jpeg', 'ar.g', 'x',
+                      'tiffs', 'giff']:
+            self.assertEqual(set(self.index.search(query)),
+                             {key for key in EXTENSIONS if query in key},
+                             query)
+
+    def test_search__ranked(self):
+        self.assertEqual(self.index.search('tiff'), ['tiff', 'gtiff'])
+        self.assertEqual(self.index.search('tif'), ['tif', 'tiff', 'gtiff'])
+        self.assertEqual(self.index.search('peg'), ['jpeg', 'mpeg'])
+
+    def test_search__prefix_and_limit(self):
+        self.assertEqual(self.index.search('tif', prefix=True), ['tif', 'tiff'])
+        self.assertEqual(self.index.search('p', limit=2), ['png', 'jpg'])
+
+    def test_add__idempotent(self):
+        self.index.add('tif')
+        self.assertEqual(len(self.index), len(EXTENSIONS))
+        self.assertIn('png', self.index)
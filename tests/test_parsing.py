@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for snak parsing."""
+from unittest import (
+    TestCase,
+    mock,
+)
+
+from wikidp.config import APP
+from wikidp import utils
+from wikidp.utils import ClaimView
+from wikidp.utils.memo import get_memo_stats
+
+
+def _snak(pid, value, value_type, datatype, snak_hash=None):
+    snak = {'snaktype': 'value', 'property': pid, 'datatype': datatype,
+            'datavalue': {'value': value, 'type': value_type}}
+    if snak_hash:
+        snak['hash'] = snak_hash
+    return snak
+
+
+class SnakParserTests(TestCase):
+    def test_parse_snak__datatypes(self):
+        cases = [
+            (_snak('P1', 'value-1', 'string', 'string'),
+             {'value': 'value-1', 'parse_type': 'string', 'type': 'string'}),
+            (_snak('P1', 'https://example.org/a', 'string', 'string'),
+             {'value': 'https://example.org/a', 'parse_type': 'url',
+              'type': 'string'}),
+            (_snak('P1', 'not a url', 'string', 'url'),
+             {'value': 'not a url', 'parse_type': 'url', 'type': 'string'}),
+            (_snak('P1', {'entity-type': 'item', 'numeric-id': 5, 'id': 'Q5'},
+                   'wikibase-entityid', 'wikibase-item'),
+             {'value': 'Q5', 'parse_type': 'item', 'type': 'wikibase-entityid'}),
+            (_snak('P1', {'entity-type': 'property', 'numeric-id': 31},
+                   'wikibase-entityid', 'wikibase-property'),
+             {'value': 'P31', 'parse_type': 'property',
+              'type': 'wikibase-entityid'}),
+            (_snak('P1', {'time': '+2021-03-01T00:00:00Z'}, 'time', 'time'),
+             {'value': 'Monday, March 1, 2021', 'parse_type': 'time',
+              'type': 'time'}),
+            (_snak('P1', {'amount': '+12'}, 'quantity', 'quantity'),
+             {'value': 12, 'parse_type': 'quantity', 'type': 'quantity'}),
+            (_snak('P1', {'amount': '+1.5'}, 'quantity', 'quantity'),
+             {'value': 1.5, 'parse_type': 'quantity', 'type': 'quantity'}),
+            (_snak('P1', {'unit': '1'}, 'quantity', 'quantity'),
+             {'value': 'Unable To Parse Value quantity',
+              'parse_type': 'quantity', 'type': 'quantity'}),
+            (_snak('P1', {'text': 'PNG', 'language': 'en'}, 'monolingualtext',
+                   'monolingualtext'),
+             {'value': '"PNG" (language: en)', 'parse_type': 'monolingualtext',
+              'type': 'monolingualtext'}),
+            (_snak('P1', {'latitude': 0}, 'globecoordinate', 'globe-coordinate'),
+             {'value': 'Unable To Parse Value globecoordinate',
+              'parse_type': 'globe-coordinate', 'type': 'globecoordinate'}),
+        ]
+        for snak, expected in cases:
+            self.assertEqual(utils.parse_snak('P1', snak), expected)
+            self.assertEqual(utils.parse_snaks([('P1', snak)]), [expected])
+
+    def test_parse_snak__no_value(self):
+        self.assertIsNone(utils.parse_snak('P1', {'snaktype': 'novalue'}))
+        self.assertIsNone(utils.parse_snak('P1', {'snaktype': 'somevalue'}))
+        self.assertIsNone(utils.parse_snak('P1', {}))
+
+    def test_is_url__skips_validation_without_scheme(self):
+        with mock.patch.object(utils.validators, 'url',
+                               return_value=True) as url:
+            self.assertFalse(utils.is_url('fmt/13'))
+            self.assertFalse(utils.is_url('www.example.org'))
+            url.assert_not_called()
+            self.assertTrue(utils.is_url('https://example.org'))
+            url.assert_called_once_with('https://example.org')
+
+    def test_parse_snaks__memo_shared_with_request(self):
+        snak = _snak('P1', 'value-1', 'string', 'string', snak_hash='abc')
+        with APP.test_request_context():
+            first, second = utils.parse_snaks([('P1', snak), ('P1', snak)])
+            self.assertIs(first, second)
+            self.assertEqual(utils.parse_snak('P1', snak), first)
+            self.assertEqual(get_memo_stats(), {'snak': {'hits': 2,
+                                                         'misses': 1}})
+
+    def test_add_claim_data_item_context__memo_not_modified(self):
+        qualifier = _snak('P580', {'time': '+2021-03-01T00:00:00Z'}, 'time',
+                          'time', snak_hash='q')
+        item = {'claims': {'P1': [{
+            'mainsnak': _snak('P1', 'value-1', 'string', 'string',
+                              snak_hash='m'),
+            'qualifiers': {'P580': [qualifier]},
+        }]}}
+        with APP.test_request_context():
+            first = utils._add_claim_data_item_context({}, item)
+            second = utils._add_claim_data_item_context({}, item)
+            self.assertEqual(first, second)
+            self.assertEqual(utils.parse_snak('P1', item['claims']['P1'][0]
+                                              ['mainsnak']),
+                             {'value': 'value-1', 'parse_type': 'string',
+                              'type': 'string'})
+        value = first['claims'][0]['values'][0]
+        self.assertEqual(value['qualifiers'], [{'pid': 'P580', 'values': [
+            {'value': 'Monday, March 1, 2021', 'parse_type': 'time',
+             'type': 'time'}]}])
+        self.assertEqual(value['references'], [])
+
+
+class ClaimViewTests(TestCase):
+    def setUp(self):
+        self.item = {'claims': {
+            pid: [{
+                'mainsnak': _snak(pid, f"{pid}-{number}", 'string', 'string',
+                                  snak_hash=f"{pid}-{number}"),
+                'qualifiers': {'P1545': [_snak('P1545', str(number), 'string',
+                                               'string')]},
+            } for number in range(count)]
+            for pid, count in (('P10', 3), ('P2', 2), ('P100', 4))
+        }}
+        self.item['claims']['P2'].append({
+            'mainsnak': {'snaktype': 'novalue', 'property': 'P2'}})
+        self.view = ClaimView(self.item)
+
+    def _values(self, claims):
+        return [(claim['pid'], [val['value'] for val in claim['values']])
+                for claim in claims]
+
+    def test_claim_view__pages(self):
+        self.assertEqual(self.view.pids, ['P2', 'P10', 'P100'])
+        self.assertEqual(self.view.count(), 10)
+        self.assertEqual(self._values(self.view.page(offset=0, limit=4)), [
+            ('P2', ['P2-0', 'P2-1']), ('P10', ['P10-0'])])
+        self.assertEqual(self._values(self.view.page(offset=4, limit=4)), [
+            ('P10', ['P10-1', 'P10-2']), ('P100', ['P100-0', 'P100-1'])])
+        self.assertEqual(self._values(self.view.page(offset=8)), [
+            ('P100', ['P100-2', 'P100-3'])])
+        self.assertEqual(self.view.page(offset=10, limit=4), [])
+
+    def test_claim_view__pids(self):
+        self.assertEqual(self.view.count(['P100', 'P7']), 4)
+        self.assertEqual(self._values(self.view.page(['P100'], offset=1,
+                                                     limit=2)),
+                         [('P100', ['P100-1', 'P100-2'])])
+
+    def test_claim_view__parses_only_requested(self):
+        with mock.patch.object(utils, '_parse_snak',
+                               wraps=utils._parse_snak) as parse:
+            claims = self.view.page(['P10'], limit=1)
+            self.assertEqual(parse.call_count, 1)
+            self.assertNotIn('qualifiers', claims[0]['values'][0])
+            claims = self.view.page(['P10'], limit=1, qualifiers=True)
+        self.assertEqual(claims[0]['values'][0]['qualifiers'], [
+            {'pid': 'P1545', 'values': [
+                {'value': '0', 'parse_type': 'string', 'type': 'string'}]}])
+        self.assertEqual(claims[0]['values'][0].get('references'), None)
+
+    def test_get_item_claims(self):
+        with mock.patch.object(utils.wd_int_utils, 'get_item_json',
+                               side_effect=[self.item, {}]):
+            output = utils.get_item_claims('Q1', offset=9, limit=5,
+                                           include=['references'])
+            self.assertFalse(utils.get_item_claims('Q2'))
+        self.assertEqual(output['total'], 10)
+        self.assertEqual(output['claims'], [{'pid': 'P100', 'values': [
+            {'value': 'P100-3', 'parse_type': 'string', 'type': 'string',
+             'references': []}]}])
+        self.assertEqual(output['external_links'], [])
+
+    def test_get_item_claims__external_links_split(self):
+        self.item['claims']['P356'] = [{'mainsnak': _snak(
+            'P356', '10.1000/1', 'string', 'external-id')}]
+        with mock.patch.object(utils.wd_int_utils, 'get_item_json',
+                               return_value=self.item), \
+                mock.patch.object(utils, 'get_property_details_by_pid',
+                                  return_value={}), \
+                mock.patch.object(utils, 'format_url_from_property',
+                                  return_value='https://doi.org/10.1000/1'):
+            output = utils.get_item_claims('Q1', pids=['P100', 'P356'])
+        self.assertEqual(output['total'], 5)
+        self.assertEqual([claim['pid'] for claim in output['claims']], ['P100'])
+        self.assertEqual([claim['pid'] for claim in output['external_links']],
+                         ['P356'])
+
+
+class ItemStreamTests(TestCase):
+    def test_iter_item_detail_parse__batches(self):
+        qids = [f"Q{number}" for number in range(1, 121)]
+        requested = []
+
+        def get_many(chunk):
+            requested.append(chunk)
+            return {qid: {'labels': {'en': {'value': qid}}} for qid in chunk
+                    if qid != 'Q7'}
+
+        with mock.patch.object(utils.wd_int_utils.ENTITY_CACHE, 'get_many',
+                               side_effect=get_many):
+            output = dict(utils.iter_item_detail_parse(qids + ['Q1']))
+        self.assertEqual(sorted(len(chunk) for chunk in requested), [20, 50, 50])
+        self.assertEqual(set(output), set(qids))
+        self.assertFalse(output['Q7'])
+        self.assertEqual(output['Q8']['label'], 'Q8')
@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the record/replay HTTP transport."""
+import tempfile
+import time
+from unittest import TestCase
+
+import requests
+from requests.adapters import BaseAdapter
+
+from wikidp.utils import replay
+from wikidp.utils.replay import RecordReplayAdapter
+
+SPARQL_URL = 'https://query.example.org/sparql'
+
+
+class FakeTransport(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    # pylint: disable=R0913
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        self.sent.append(request)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        response.headers['Content-Encoding'] = 'gzip'
+        response._content = f'{{"body": "{request.body}"}}'.encode('utf-8')
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordReplayTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.transport = FakeTransport()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _session(self, mode, latency=0.0):
+        session = requests.Session()
+        adapter = RecordReplayAdapter(mode, self.directory.name,
+                                      latency=latency, transport=self.transport)
+        session.mount('https://', adapter)
+        return session
+
+    def test_replay__serves_recorded_response(self):
+        recorded = self._session(replay.RECORD).post(SPARQL_URL,
+                                                     data={'query': 'ASK {}'})
+        response = self._session(replay.REPLAY).post(SPARQL_URL,
+                                                     data={'query': 'ASK {}'})
+        self.assertEqual(len(self.transport.sent), 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), recorded.json())
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(b''.join(response.iter_content(4)), recorded.content)
+
+    def test_replay__requests_told_apart_by_body(self):
+        self._session(replay.RECORD).post(SPARQL_URL, data={'query': 'ASK {}'})
+        session = self._session(replay.REPLAY)
+        self.assertRaises(requests.ConnectionError, session.post, SPARQL_URL,
+                          data={'query': 'ASK { ?s ?p ?o }'})
+        self.assertRaises(requests.ConnectionError, session.get, SPARQL_URL)
+
+    def test_replay__injected_latency(self):
+        self._session(replay.RECORD).get(SPARQL_URL, params={'q': 1})
+        start = time.monotonic()
+        self._session(replay.REPLAY, latency=0.05).get(SPARQL_URL,
+                                                       params={'q': 1})
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_mode__validated(self):
+        self.assertRaises(ValueError, RecordReplayAdapter, 'live',
+                          self.directory.name)
+
+    def test_install__records_through_session_adapter(self):
+        session = requests.Session()
+        session.mount('https://', self.transport)
+        adapter = replay.install(session, replay.RECORD, self.directory.name)
+        session.get(SPARQL_URL, params={'q': 1})
+        self.assertIs(adapter.transport, self.transport)
+        self.assertEqual(len(self.transport.sent), 1)
@@ -10,11 +10,16 @@
 # about the terms of this license.
 #
 """Client tests for WikiDP Routes."""
+from unittest import mock
+
 import pytest
 from flask import json
 
 from tests import settings
 from wikidp import APP
+from wikidp.controllers import search as search_controller
+from wikidp.utils import wd_int_utils
+from wikidp.utils.wikibase import WikibaseReadError
 
 
 @pytest.fixture
@@ -171,6 +176,24 @@ def test_route_site_search__by_puid(client):
     assert b'Q26543628' in response.data
 
 
+def test_route_site_search__lists_every_alias(client):
+    hits = [{'id': f"Q{number}", 'label': f"Portable {number}",
+             'description': 'format', 'aliases': ['Portable']}
+            for number in (1, 2)]
+    terms = {'Q1': {'aliases': {'en': [{'language': 'en', 'value': 'Portable'},
+                                       {'language': 'en', 'value': 'P1 Format'}]}}}
+    search_controller.TYPEAHEAD_CACHE.clear()
+    with mock.patch.object(search_controller, '_search_extension',
+                           return_value=[]), \
+            mock.patch.object(wd_int_utils, 'search_items', return_value=hits), \
+            mock.patch.object(wd_int_utils, 'get_items_terms',
+                              return_value=terms):
+        response = client.get('/search?q=portable-aliases')
+    search_controller.TYPEAHEAD_CACHE.clear()
+    assert response.status_code == 200
+    assert b'P1 Format' in response.data
+
+
 def test_route_search_by_puid(client):
     """Test the client loads the contribute of sample item  """
     response = client.get('/search/puid/fmt_354', follow_redirects=True)
@@ -192,12 +215,39 @@ def test_route_api_search_item_by_string(client):
     assert len(json_response(response)) > 0
 
 
+def test_route_api_search_item_by_string__upstream_error(client):
+    with mock.patch.object(wd_int_utils.WIKIBASE_CLIENT, 'search_entities',
+                           side_effect=WikibaseReadError('down')):
+        response = client.get('/api/search/upstream-error')
+    assert response.status_code == 503
+    assert json_response(response) == []
+
+
 def test_route_api_get_item(client):
     response = client.get('/api/Q7715973')
     assert response.status_code == 200
     assert json_response(response)['qid'] == 'Q7715973'
 
 
+def test_route_api_get_item_claims(client):
+    response = client.get('/api/Q7715973/claims?pids=P31,P1163&limit=1'
+                          '&include=qualifiers')
+    assert response.status_code == 200
+    output = json_response(response)
+    assert output['limit'] == 1
+    assert output['total'] >= 1
+    assert [claim['pid'] for claim in output['claims']] in (['P31'], ['P1163'])
+    assert 'qualifiers' in output['claims'][0]['values'][0]
+    assert 'references' not in output['claims'][0]['values'][0]
+
+
+def test_route_api_get_item_claims__upstream_error(client):
+    with mock.patch.object(wd_int_utils.ENTITY_CACHE, 'get_many',
+                           side_effect=WikibaseReadError('down')):
+        response = client.get('/api/Q7715973/claims')
+    assert response.status_code == 503
+
+
 def test_route_api_get_property(client):
     response = client.get('/api/'+settings.SAMPLE_PID_STRING)
     assert response.status_code == 200
@@ -239,6 +289,37 @@ def test_route_api_browse_file_format(client):
     assert 'qid' in first_data
     assert 'media_types' in first_data
 
+
+def test_route_api_browse_file_format__not_modified(client):
+    """Test the catalog is revalidated by ETag and served compressed"""
+    response = client.get('/api/browse/file_format',
+                          headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] in ('gzip', 'br')
+    etag = response.headers['ETag']
+    response = client.get('/api/browse/file_format',
+                          headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_route_api_browse_file_format__ndjson(client):
+    response = client.get('/api/browse/file_format',
+                          headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.data.decode('utf8').splitlines()
+    assert lines and all(json.loads(line)['qid'] for line in lines)
+
+
+def test_route_api_get_item_summary_list__stream(client):
+    response = client.get('/api/items?qids=Q7715973,Q0&stream=1')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    items = [json.loads(line) for line in response.data.decode('utf8').splitlines()]
+    assert {item['qid'] for item in items} == {'Q7715973', 'Q0'}
+    assert [item for item in items if item['qid'] == 'Q0'][0]['missing']
+
 # TODO: MOCK Wikidata Requests/Responses
 # def test_route_api_write_claims_to_item(client):
 #     """
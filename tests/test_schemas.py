@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the compiled schema registry."""
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from wikidp.utils.schemas import SchemaRegistry
+
+
+def _compile(schema):
+    return {pid: schema['qualifiers'] for pid in schema['properties']}
+
+
+class SchemaRegistryTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        self.compiled = []
+        self._write('format.json', ['P31', 'P279'], ['P580'])
+        self._write('software/os.json', ['P31'], [])
+        self.registry = SchemaRegistry(self.directory, self._compile,
+                                       check_interval=None)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _compile(self, schema):
+        self.compiled.append(schema['properties'])
+        return _compile(schema)
+
+    def _write(self, name, properties, qualifiers, mtime=None):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as schema_file:
+            json.dump({'properties': properties, 'qualifiers': qualifiers},
+                      schema_file)
+        if mtime:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_get__compiled_at_startup(self):
+        schema = self.registry.get('format.json')
+        self.assertEqual(dict(schema.prop_map), {
+            'P31': frozenset({'P580'}), 'P279': frozenset({'P580'})})
+        self.assertEqual(schema.prop_ids, {'P31', 'P279', 'P580'})
+        self.assertEqual(self.registry.names(), ['format.json',
+                                                 'software/os.json'])
+        self.assertIsNone(self.registry.get('missing.json'))
+        with self.assertRaises(TypeError):
+            schema.prop_map['P18'] = frozenset()
+
+    def test_reload__only_changed_files(self):
+        self.assertEqual(len(self.compiled), 2)
+        self.assertEqual(self.registry.reload(), [])
+        self._write('software/os.json', ['P31', 'P306'], [], mtime=1)
+        self._write('new.json', ['P18'], [])
+        self.assertEqual(sorted(self.registry.reload()),
+                         ['new.json', 'software/os.json'])
+        self.assertEqual(len(self.compiled), 4)
+        self.assertEqual(self.registry.get('software/os.json').prop_ids,
+                         {'P31', 'P306'})
+        os.remove(os.path.join(self.directory, 'new.json'))
+        self.registry.reload()
+        self.assertIsNone(self.registry.get('new.json'))
+
+    def test_reload__invalid_file_keeps_last_version(self):
+        path = os.path.join(self.directory, 'format.json')
+        with open(path, 'w') as schema_file:
+            schema_file.write('{')
+        os.utime(path, (1, 1))
+        self.assertEqual(self.registry.reload(), [])
+        self.assertEqual(self.registry.get('format.json').prop_ids,
+                         {'P31', 'P279', 'P580'})
+
+    def test_reload__wrong_shape_keeps_last_version(self):
+        for name in ('format.json', 'new.json'):
+            path = os.path.join(self.directory, name)
+            with open(path, 'w') as schema_file:
+                json.dump([], schema_file)
+            os.utime(path, (1, 1))
+        self.assertEqual(self.registry.reload(), [])
+        self.assertEqual(self.registry.get('format.json').prop_ids,
+                         {'P31', 'P279', 'P580'})
+        self.assertIsNone(self.registry.get('new.json'))
+        registry = SchemaRegistry(self.directory, self._compile,
+                                  check_interval=0)
+        self.assertIsNone(registry.get('format.json'))
+        self.assertEqual(registry.names(), ['software/os.json'])
+
+    def test_get__checks_after_interval(self):
+        self.registry.check_interval = 0
+        self._write('format.json', ['P18'], [], mtime=1)
+        self.assertEqual(self.registry.get('format.json').prop_ids, {'P18'})
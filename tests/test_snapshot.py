@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for pre-serialized JSON snapshots."""
+import gzip
+import json
+from unittest import TestCase
+
+from wikidp.utils.snapshot import JsonSnapshot
+
+CATALOG = [{'qid': 'Q1', 'name': 'Portable Network Graphics'},
+           {'qid': 'Q2', 'name': 'Ogg'}]
+
+
+class JsonSnapshotTests(TestCase):
+    def setUp(self):
+        self.snapshot = JsonSnapshot(CATALOG)
+
+    def test_body__round_trips(self):
+        self.assertEqual(json.loads(self.snapshot.body), CATALOG)
+        self.assertEqual(gzip.decompress(self.snapshot.encoded['gzip']),
+                         self.snapshot.body)
+        self.assertEqual(self.snapshot.count, 2)
+
+    def test_etag__follows_content(self):
+        self.assertEqual(JsonSnapshot(list(CATALOG)).etag, self.snapshot.etag)
+        self.assertNotEqual(JsonSnapshot(CATALOG[:1]).etag, self.snapshot.etag)
+
+    def test_get_body__by_accepted_encoding(self):
+        accepted = {'gzip': 1}
+        body, encoding = self.snapshot.get_body(lambda x: accepted.get(x, 0))
+        self.assertEqual(encoding, 'gzip')
+        self.assertEqual(body, self.snapshot.encoded['gzip'])
+        body, encoding = self.snapshot.get_body(lambda x: 0)
+        self.assertIsNone(encoding)
+        self.assertEqual(body, self.snapshot.body)
+
+    def test_as_ndjson__one_element_per_line(self):
+        ndjson = self.snapshot.as_ndjson()
+        self.assertEqual([json.loads(line) for line in
+                          ndjson.body.decode('utf-8').splitlines()], CATALOG)
+        self.assertTrue(ndjson.body.endswith(b'\n'))
+        self.assertNotEqual(ndjson.etag, self.snapshot.etag)
+        self.assertEqual(ndjson.built_at, self.snapshot.built_at)
+        self.assertIs(self.snapshot.as_ndjson(), ndjson)
+        self.assertIs(ndjson.as_ndjson(), ndjson)
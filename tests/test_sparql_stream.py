@@ -0,0 +1,58 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for SPARQL result readers."""
+import json
+from unittest import TestCase
+
+from wikidp.utils import sparql_stream
+from wikidp.utils.sparql_stream import iter_sparql_bindings
+
+BINDINGS = [
+    {'code': {'type': 'literal', 'value': 'en'},
+     'label': {'type': 'literal', 'xml:lang': 'en', 'value': 'English'}},
+    {'code': {'type': 'literal', 'value': 'zh'},
+     'label': {'type': 'literal', 'value': '汉语 [bindings], "quoted"'}},
+    {'code': {'type': 'literal', 'value': 'ar'}},
+]
+RESULT = json.dumps({
+    'head': {'vars': ['code', 'label']},
+    'results': {'bindings': BINDINGS},
+}, ensure_ascii=False, indent=1).encode('utf-8')
+
+
+def _chunked(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+
+class SparqlStreamTests(TestCase):
+    def test_iter_sparql_bindings__any_chunk_size(self):
+        for size in (1, 2, 3, 7, 64, len(RESULT)):
+            self.assertEqual(list(iter_sparql_bindings(_chunked(RESULT, size))),
+                             BINDINGS)
+
+    def test_iter_sparql_bindings__empty(self):
+        data = b'{"head": {"vars": []}, "results": {"bindings": []}}'
+        self.assertEqual(list(iter_sparql_bindings([data])), [])
+
+    def test_iter_sparql_bindings__compacts_buffer(self):
+        original = sparql_stream.COMPACT_AFTER
+        sparql_stream.COMPACT_AFTER = 10
+        try:
+            self.assertEqual(list(iter_sparql_bindings(_chunked(RESULT, 5))),
+                             BINDINGS)
+        finally:
+            sparql_stream.COMPACT_AFTER = original
+
+    def test_iter_sparql_bindings__truncated(self):
+        rows = iter_sparql_bindings([RESULT[:len(RESULT) // 2]])
+        self.assertRaises(ValueError, list, rows)
+
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the typeahead search cache."""
+from unittest import TestCase
+
+from wikidp.utils.typeahead import (
+    normalize_query,
+    TypeaheadCache,
+)
+
+ITEMS = {
+    'Q1': {'qid': 'Q1', 'label': 'Portable Network Graphics', 'aliases': ['PNG']},
+    'Q2': {'qid': 'Q2', 'label': 'Portable Document Format', 'aliases': ['PDF']},
+    'Q3': {'qid': 'Q3', 'label': 'Portable Pixmap', 'aliases': []},
+    # Found by its German label, the UI language label differs
+    'Q4': {'qid': 'Q4', 'label': 'Bitmap', 'aliases': [], 'match': {
+        'type': 'label', 'language': 'de', 'text': 'Portables Bitmap'}},
+}
+
+
+class TypeaheadCacheTests(TestCase):
+    def setUp(self):
+        self.searches = []
+        self.summarized = []
+        self.cache = TypeaheadCache(self._search, self._summarize, ttl=60,
+                                    limit=10)
+
+    def _search(self, query, limit):
+        self.searches.append(query)
+        key = normalize_query(query)
+        hits = []
+        for item in ITEMS.values():
+            match = item.get('match', {'type': 'label', 'language': 'en',
+                                       'text': item['label']})
+            if normalize_query(match['text']).startswith(key):
+                hits.append(dict(item, match=match))
+        return hits[:limit]
+
+    def _summarize(self, qids):
+        # Rebuilt summaries do not know which term the search matched
+        self.summarized.extend(qids)
+        return [{key: value for key, value in ITEMS[qid].items() if key != 'match'}
+                if qid in ITEMS else False for qid in qids]
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  Portable   NETWORK '), 'portable network')
+
+    def test_search__normalized_hit(self):
+        self.cache.search('Portable')
+        self.assertEqual(len(self.cache.search(' portable ')), 4)
+        self.assertEqual(self.searches, ['Portable'])
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_search__filters_complete_prefix_locally(self):
+        self.cache.search('port')
+        results = self.cache.search('portable n')
+        self.assertEqual([x['qid'] for x in results], ['Q1'])
+        self.assertEqual(self.searches, ['port'])
+        self.assertEqual(self.summarized, [])
+        self.assertEqual(self.cache.local_hits, 1)
+
+    def test_search__keeps_hits_matched_in_other_languages(self):
+        self.cache.search('port')
+        results = self.cache.search('portables')
+        self.assertEqual([x['qid'] for x in results], ['Q4'])
+        self.assertEqual(results[0]['match']['language'], 'de')
+        self.assertEqual(self.searches, ['port'])
+
+    def test_search__unknown_match_goes_upstream(self):
+        self.cache.search('port')
+        self.cache._summaries.clear()  # pylint: disable=W0212
+        self.assertEqual(len(self.cache.search('portables')), 1)
+        self.assertEqual(self.searches, ['port', 'portables'])
+
+    def test_search__rebuilds_expired_summaries(self):
+        self.cache.search('port')
+        self.cache._summaries.clear()  # pylint: disable=W0212
+        self.assertEqual(len(self.cache.search('port')), 4)
+        self.assertEqual(self.summarized, ['Q1', 'Q2', 'Q3', 'Q4'])
+
+    def test_search__incomplete_prefix_goes_upstream(self):
+        self.cache.limit = 2
+        self.cache.search('port')
+        self.cache.search('portable p')
+        self.assertEqual(self.searches, ['port', 'portable p'])
+
+    def test_search__expired(self):
+        self.cache.ttl = -1
+        self.cache.search('port')
+        self.cache.search('port')
+        self.assertEqual(len(self.searches), 2)
+
+    def test_search__returns_copies(self):
+        self.cache.search('port')[0]['label'] = 'changed'
+        self.assertEqual(self.cache.search('port')[0]['label'],
+                         'Portable Network Graphics')
+
+    def test_search__error_not_cached(self):
+        def failing_search(query, limit):
+            self.searches.append(query)
+            raise ConnectionError('upstream')
+        self.cache._search = failing_search  # pylint: disable=W0212
+        self.assertRaises(ConnectionError, self.cache.search, 'port')
+        self.cache._search = self._search  # pylint: disable=W0212
+        self.assertEqual(len(self.cache.search('portable')), 4)
+        self.assertEqual(len(self.cache.search('port')), 4)
+        self.assertEqual(self.searches, ['port', 'portable', 'port'])
@@ -0,0 +1,79 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Unit tests for the read only Wikibase client."""
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import requests
+
+from wikidp.utils.wikibase import (
+    WikibaseReadClient,
+    WikibaseReadError,
+)
+
+API_URL = 'https://www.wikidata.org/w/api.php'
+
+
+def _session(*payloads):
+    session = MagicMock()
+    session.get.return_value.json.side_effect = list(payloads)
+    return session
+
+
+class WikibaseReadClientTests(TestCase):
+    def test_get_entities__skips_missing_and_keys_redirects(self):
+        session = _session({'entities': {
+            'Q1': {'id': 'Q1', 'missing': ''},
+            'Q7715973': {'id': 'Q7715973', 'claims': {}},
+            'Q42': {'id': 'Q42', 'redirects': {'from': 'Q43', 'to': 'Q42'}},
+        }})
+        client = WikibaseReadClient(API_URL, session=session)
+        entities, missing = client.read_entities(['Q1', 'Q7715973', 'Q43'])
+        self.assertEqual(set(entities), {'Q7715973', 'Q43'})
+        self.assertEqual(missing, {'Q1'})
+        params = session.get.call_args[1]['params']
+        self.assertEqual(params['ids'], 'Q1|Q7715973|Q43')
+        self.assertEqual(params['format'], 'json')
+
+    def test_get_entities__batches_of_fifty(self):
+        session = _session({'entities': {}}, {'entities': {}}, {'entities': {}})
+        client = WikibaseReadClient(API_URL, session=session)
+        client.get_entities([f"Q{index}" for index in range(1, 121)])
+        self.assertEqual(session.get.call_count, 3)
+
+    def test_get_entities__error_retries_one_by_one(self):
+        session = _session({'error': {'code': 'no-such-entity'}},
+                           {'entities': {'Q2': {'id': 'Q2'}}},
+                           {'error': {'code': 'no-such-entity'}})
+        client = WikibaseReadClient(API_URL, session=session)
+        self.assertEqual(client.read_entities(['Q2', 'Qx']),
+                         ({'Q2': {'id': 'Q2'}}, {'Qx'}))
+
+    def test_get_entities__connection_error_raises(self):
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectionError('down')
+        client = WikibaseReadClient(API_URL, session=session)
+        with self.assertRaises(WikibaseReadError):
+            client.get_entities(['Q1'])
+
+    def test_get_entities__api_error_raises(self):
+        session = _session({'error': {'code': 'maxlag'}})
+        client = WikibaseReadClient(API_URL, session=session)
+        with self.assertRaises(WikibaseReadError):
+            client.get_entities(['Q1', 'Q2'])
+        self.assertEqual(session.get.call_count, 1)
+
+    def test_search_entities__error_raises(self):
+        session = _session({'error': {'code': 'ratelimited'}})
+        client = WikibaseReadClient(API_URL, session=session)
+        with self.assertRaises(WikibaseReadError):
+            client.search_entities('debian', 'en')
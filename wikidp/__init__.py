@@ -15,9 +15,13 @@
 import logging
 
 from wikidp.config import APP
+from wikidp.const import ConfKey
+from wikidp.utils import background
 from . import (
     routes,
 )
+if APP.config[ConfKey.BACKGROUND_REFRESH]:
+    background.start_all()
 if __name__ == "__main__":
     logging.debug("Importing %s", routes.__name__)
     logging.debug("Running Flask App on Port %s", APP.config.get('PORT'))
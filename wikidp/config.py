@@ -28,18 +28,73 @@ TEMP = tempfile.gettempdir()
 class BaseConfig:
     """Base / default config, no debug logging and short log format."""
 
-    CACHE_DIR = os.path.join(TEMP, 'caches')
+    # Rebuild in-memory indexes on background threads
+    BACKGROUND_REFRESH = os.getenv('WIKIDP_BACKGROUND_REFRESH', 'true') == 'true'
+    CACHE_DIR = os.getenv('WIKIDP_CACHE_DIR', os.path.join(TEMP, 'caches'))
+    CHECKLIST_REFRESH_INTERVAL = 6 * 60 * 60
+    # Statements per page of /api/<qid>/claims by default and at most
+    CLAIMS_PAGE_MAX = 500
+    CLAIMS_PAGE_SIZE = 50
+    COMMONS_IMAGE_CACHE_MAX_BYTES = 4 * 1024 * 1024
+    COMMONS_IMAGE_CACHE_TTL = 24 * 60 * 60
+    COMMONS_MISSING_IMAGE_CACHE_TTL = 60 * 60
     DEBUG = False
     HOST = HOST
+    HTTP_POOL_SIZE = 10
+    # Seconds to wait for a connection and for a response respectively
+    HTTP_TIMEOUT = (5, 30)
+    # "record" saves every outbound response to HTTP_FIXTURE_DIR, "replay"
+    # serves them back without network access, see wikidp.utils.replay
+    HTTP_REPLAY_MODE = os.getenv('WIKIDP_HTTP_REPLAY', '')
+    HTTP_REPLAY_LATENCY = float(os.getenv('WIKIDP_HTTP_REPLAY_LATENCY', '0'))
+    # Retries of failed or overloaded requests, and the longest Retry-After
+    # honoured in seconds
+    HTTP_RETRIES = 2
+    HTTP_RETRY_AFTER_MAX = 5
+    # Seconds an item is served before its revision is checked
+    ENTITY_CACHE_FRESH_FOR = 60
+    ENTITY_CACHE_MAX_ENTRIES = 2000
+    ENTITY_FETCH_WORKERS = 4
+    # SQLite file keeping every entity read, empty to keep entities in memory only
+    ENTITY_STORE_PATH = os.getenv('WIKIDP_ENTITY_STORE',
+                                  os.path.join(CACHE_DIR, 'entities.sqlite3'))
+    FILE_FORMAT_SNAPSHOT_INTERVAL = 60 * 60
+    FORMAT_CATALOG_REFRESH_INTERVAL = 6 * 60 * 60
+    FORMATTER_URL_REFRESH_INTERVAL = 4 * 60 * 60
     ITEM_REGEX = r'(Q|q)\d+'
     MEDIAWIKI_API_URL = "https://www.wikidata.org/w/api.php"
     OAUTH_MEDIAWIKI_URL = "https://www.wikidata.org/w/index.php"
     SPARQL_ENDPOINT_URL = "https://query.wikidata.org/sparql"
+    SPARQL_CACHE_DIR = os.path.join(CACHE_DIR, 'sparql')
+    # Lock files coalescing identical SPARQL queries across worker processes,
+    # None keeps coalescing within each process
+    SINGLE_FLIGHT_LOCK_DIR = os.path.join(CACHE_DIR, 'locks')
+    SPARQL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    SPARQL_CACHE_MAX_DISK_BYTES = 512 * 1024 * 1024
+    SPARQL_CACHE_TTL = 60 * 60
+    # Seconds to keep results per query template, 0 disables caching
+    SPARQL_CACHE_TTLS = {
+        'all_languages': 24 * 60 * 60,
+        'all_qualifier_properties': 24 * 60 * 60,
+        'all_reference_properties': 24 * 60 * 60,
+        'file_formats': 6 * 60 * 60,
+        'format_search': 6 * 60 * 60,
+        'property': 6 * 60 * 60,
+        'property_allowed_qualifiers': 6 * 60 * 60,
+    }
     # Bind to PORT if defined, otherwise default to 5000.
     PORT = int(os.environ.get('PORT', 5000))
     PROPERTY_REGEX = r'(P|p)\d+'
     LOG_FILE = os.path.join(TEMP, 'wikidp.log')
     LOG_FORMAT = '[%(filename)-15s:%(lineno)-5d] %(message)s'
+    # Seconds between checks of the schema files for changes
+    SCHEMA_CHECK_INTERVAL = 2
+    # Typeahead search results and item summaries, see TypeaheadCache
+    SEARCH_CACHE_MAX_ENTRIES = 2000
+    SEARCH_CACHE_TTL = 5 * 60
+    # Seconds a site search waits for its slowest source
+    SEARCH_DEADLINE = 5
+    SEARCH_WORKERS = 6
     SECRET_KEY = '7d441f27d441f27567d441f2b6176a'
     WIKIBASE_LANGUAGE = os.getenv('WIKIBASE_LANGUAGE', 'en')
     WIKIDATA_FB_LANG = os.getenv('WIKIDP_FB_LANG', 'en')
@@ -76,6 +131,10 @@ def configure_app(app):
     config_name = os.getenv('WIKIDP_CONFIG', 'default')
     app.config.from_object(CONFIGS[config_name])
     app.config[ConfKey.STATIC_DIR] = os.path.join(app.root_path, 'static')
+    app.config[ConfKey.SCHEMA_DIR] = os.path.join(app.root_path, 'schemas')
+    app.config[ConfKey.HTTP_FIXTURE_DIR] = os.getenv(
+        'WIKIDP_HTTP_FIXTURES',
+        os.path.join(os.path.dirname(app.root_path), 'tests', 'fixtures', 'http'))
     if os.getenv('WIKIDP_CONFIG_FILE'):
         app.config.from_envvar('WIKIDP_CONFIG_FILE')
     app.config['WIKIDATA_SIGN_UP_URL'] = \
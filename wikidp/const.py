@@ -42,6 +42,11 @@ DEFAULT_UI_LANGUAGES = [
 WIKIDATA_ENTITY_BASE_URL = "https://wikidata.org/entity"
 WIKIMEDIA_COMMONS_BASE_URL = "https://commons.wikimedia.org"
 WIKIMEDIA_COMMONS_API_URL = f"{WIKIMEDIA_COMMONS_BASE_URL}/w/api.php"
+# Properties whose values are Commons file titles: image and logo image
+WIKIMEDIA_IMAGE_PIDS = ("P18", "P154")
+# Class of file format items and their media type property
+FILE_FORMAT_QID = "Q235557"
+MEDIA_TYPE_PID = "P1163"
 WIKIDATA_DATETIME_FORMAT = '+%Y-%m-%dT%H:%M:%SZ'
 
 
@@ -49,15 +54,49 @@ WIKIDATA_DATETIME_FORMAT = '+%Y-%m-%dT%H:%M:%SZ'
 class ConfKey:
     """Config key string constants."""
 
+    BACKGROUND_REFRESH = 'BACKGROUND_REFRESH'
+    CACHE_DIR = 'CACHE_DIR'
+    CHECKLIST_REFRESH_INTERVAL = 'CHECKLIST_REFRESH_INTERVAL'
+    CLAIMS_PAGE_MAX = 'CLAIMS_PAGE_MAX'
+    CLAIMS_PAGE_SIZE = 'CLAIMS_PAGE_SIZE'
+    COMMONS_IMAGE_CACHE_MAX_BYTES = 'COMMONS_IMAGE_CACHE_MAX_BYTES'
+    COMMONS_IMAGE_CACHE_TTL = 'COMMONS_IMAGE_CACHE_TTL'
+    COMMONS_MISSING_IMAGE_CACHE_TTL = 'COMMONS_MISSING_IMAGE_CACHE_TTL'
+    ENTITY_CACHE_FRESH_FOR = 'ENTITY_CACHE_FRESH_FOR'
+    ENTITY_CACHE_MAX_ENTRIES = 'ENTITY_CACHE_MAX_ENTRIES'
+    ENTITY_FETCH_WORKERS = 'ENTITY_FETCH_WORKERS'
+    ENTITY_STORE_PATH = 'ENTITY_STORE_PATH'
+    FILE_FORMAT_SNAPSHOT_INTERVAL = 'FILE_FORMAT_SNAPSHOT_INTERVAL'
+    FORMAT_CATALOG_REFRESH_INTERVAL = 'FORMAT_CATALOG_REFRESH_INTERVAL'
+    FORMATTER_URL_REFRESH_INTERVAL = 'FORMATTER_URL_REFRESH_INTERVAL'
+    HTTP_FIXTURE_DIR = 'HTTP_FIXTURE_DIR'
+    HTTP_POOL_SIZE = 'HTTP_POOL_SIZE'
+    HTTP_REPLAY_LATENCY = 'HTTP_REPLAY_LATENCY'
+    HTTP_REPLAY_MODE = 'HTTP_REPLAY_MODE'
+    HTTP_RETRIES = 'HTTP_RETRIES'
+    HTTP_RETRY_AFTER_MAX = 'HTTP_RETRY_AFTER_MAX'
+    HTTP_TIMEOUT = 'HTTP_TIMEOUT'
     ITEM_REGEX = 'ITEM_REGEX'
     LOG_FILE = 'LOG_FILE'
     LOG_FORMAT = 'LOG_FORMAT'
     PORT = "PORT"
     PROPERTY_REGEX = 'PROPERTY_REGEX'
+    SCHEMA_CHECK_INTERVAL = 'SCHEMA_CHECK_INTERVAL'
+    SCHEMA_DIR = 'SCHEMA_DIR'
+    SEARCH_CACHE_MAX_ENTRIES = 'SEARCH_CACHE_MAX_ENTRIES'
+    SEARCH_CACHE_TTL = 'SEARCH_CACHE_TTL'
+    SEARCH_DEADLINE = 'SEARCH_DEADLINE'
+    SEARCH_WORKERS = 'SEARCH_WORKERS'
     STATIC_DIR = "STATIC_DIR"
     MEDIAWIKI_API_URL = 'MEDIAWIKI_API_URL'
     OAUTH_MEDIAWIKI_URL = 'OAUTH_MEDIAWIKI_URL'
     SPARQL_ENDPOINT_URL = 'SPARQL_ENDPOINT_URL'
+    SINGLE_FLIGHT_LOCK_DIR = 'SINGLE_FLIGHT_LOCK_DIR'
+    SPARQL_CACHE_DIR = 'SPARQL_CACHE_DIR'
+    SPARQL_CACHE_MAX_BYTES = 'SPARQL_CACHE_MAX_BYTES'
+    SPARQL_CACHE_MAX_DISK_BYTES = 'SPARQL_CACHE_MAX_DISK_BYTES'
+    SPARQL_CACHE_TTL = 'SPARQL_CACHE_TTL'
+    SPARQL_CACHE_TTLS = 'SPARQL_CACHE_TTLS'
     USER_AGENT = 'USER_AGENT'
     WIKIBASE_LANGUAGE = 'WIKIBASE_LANGUAGE'
     WIKIDATA_FB_LANG = 'WIKIDATA_FB_LANG'
@@ -81,6 +120,7 @@ class WDEntityField:
     REFERENCES = 'references'
     QUALIFIERS = 'qualifiers'
     URL = 'url'
+    MATCH = 'match'
 
 
 DEFAULT_PID_LIST = [
@@ -10,11 +10,14 @@
 # about the terms of this license.
 #
 """Flask application routes for Wikidata portal."""
-from collections import defaultdict
-from flask import (
-    json,
-    jsonify,
+from collections import (
+    defaultdict,
+    namedtuple,
 )
+import logging
+
+from flask import jsonify
+import requests
 from wikidataintegrator.wdi_core import (
     WDCommonsMedia,
     WDExternalID,
@@ -31,12 +34,18 @@ from wikidp.config import APP
 from wikidp.const import (
     ConfKey,
     DEFAULT_PID_LIST,
+    FILE_FORMAT_QID,
 )
 from wikidp.models import FileFormat
 from wikidp.utils import (
+    build_property_loader,
     get_pid_from_string,
-    get_property_details_by_pid_list,
+    wd_int_utils,
 )
+from wikidp.utils.background import PeriodicRefresh
+from wikidp.utils.schemas import SchemaRegistry
+from wikidp.utils.errors import WikibaseReadError
+from wikidp.utils.snapshot import JsonSnapshot
 from wikidp.utils.wd_int_utils import format_date
 
 WD_DATATYPE_MAP = {
@@ -50,16 +59,14 @@ WD_DATATYPE_MAP = {
     "WikibaseItem": WDItemID,
 }
 MEDIAWIKI_API_URL = APP.config[ConfKey.MEDIAWIKI_API_URL]
-SCHEMA_DIRECTORY_PATH = 'wikidp/schemas/'
-
+SCHEMA_DIR = APP.config[ConfKey.SCHEMA_DIR]
+# Checklists are materialized for the portal language, labels come from
+# the property query's label service
+CHECKLIST_LANGUAGE = APP.config[ConfKey.WIKIDATA_LANG]
 
-def load_schema(schema_name):
-    """Load a schema file by name."""
-    try:
-        with open(SCHEMA_DIRECTORY_PATH+schema_name) as data_file:
-            return json.load(data_file)
-    except FileNotFoundError:
-        return None
+MaterializedChecklist = namedtuple(
+    "MaterializedChecklist",
+    ['schema_name', 'language', 'schema_mtime', 'properties', 'snapshot'])
 
 
 def parse_predicate(expression):
@@ -117,33 +124,15 @@ def get_schema_properties(schema_name):
         schema_name (str): Relative file name of schema.
 
     Examples:
-        >>> get_schema_properties('file_format_id_pattern')
-        { "P31": {"P123"}, "P279": {}, ... }
+        >>> get_schema_properties('file_format/file_format_id_pattern.json')
+        { "P31": frozenset({"P123"}), "P279": frozenset(), ... }
 
-    Returns (Optional[defaultdict[str, set]]):
+    Returns (Optional[Mapping[str, FrozenSet[str]]]): read only, see
+        SCHEMA_REGISTRY
 
     """
-    data = load_schema(schema_name)
-    if not data:
-        return None
-    return parse_expressions(data)
-
-
-def flatten_prop_map(prop_map):
-    """
-    Extract all Ids from a property map.
-
-    Args:
-        prop_map (defaultdict[str, set]):
-
-    Returns:
-
-    """
-    prop_ids = set()
-    for prop, qualifiers in prop_map.items():
-        prop_ids.add(prop)
-        prop_ids.update(qualifiers)
-    return prop_ids
+    schema = SCHEMA_REGISTRY.get(schema_name)
+    return schema.prop_map if schema else None
 
 
 def get_property_checklist_from_schema(schema_name, include_default=True):
@@ -159,34 +148,115 @@ def get_property_checklist_from_schema(schema_name, include_default=True):
         schema_name (str):
         include_default (Optional[bool]): If True, include the default PID list
 
-    Returns (List[Dict]):
+    Returns (List[Dict]): shared with other requests, not to be modified
 
     """
-    prop_map = get_schema_properties(schema_name)
-    if not prop_map:
+    checklist = get_materialized_checklist(schema_name)
+    if not checklist:
         return []
-    all_prop_ids = flatten_prop_map(prop_map)
     if include_default:
-        all_prop_ids.update(DEFAULT_PID_LIST)
-    all_prop_data = {
-        prop.get("id"): prop
-        for prop in get_property_details_by_pid_list(all_prop_ids)
-    }
+        return list(checklist.properties)
+    return [prop for prop in checklist.properties if not prop.get("hidden")]
+
+
+def build_property_checklist(schema, properties):
+    """
+    Combine a compiled schema with property details into a checklist.
+
+    Args:
+        schema (CompiledSchema):
+        properties (Dict[str, Dict]): details by property id, covering the
+            schema's properties and DEFAULT_PID_LIST
+
+    Returns (Tuple[Dict, ...]): schema properties, then the default ones
+
+    """
+    missing = [pid for pid in schema.prop_ids.union(DEFAULT_PID_LIST)
+               if not properties.get(pid)]
+    if missing:
+        raise LookupError(f"No details for properties {sorted(missing)}")
     checklist = []
-    for pid, qualifiers in prop_map.items():
-        data = all_prop_data[pid]
-        data["qualifiers"] = [
-            all_prop_data[qualifier]
-            for qualifier in qualifiers
-        ]
-        checklist.append(data)
-    if include_default:
-        for pid in DEFAULT_PID_LIST:
-            if pid not in prop_map:
-                data = all_prop_data[pid]
-                data["qualifiers"] = []
-                data["hidden"] = True  # hide in checklist UI
-                checklist.append(data)
+    for pid, qualifiers in schema.prop_map.items():
+        checklist.append(dict(
+            properties[pid],
+            qualifiers=[properties[qualifier] for qualifier in qualifiers]))
+    for pid in DEFAULT_PID_LIST:
+        if pid not in schema.prop_map:
+            # hide in checklist UI
+            checklist.append(dict(properties[pid], qualifiers=[], hidden=True))
+    return tuple(checklist)
+
+
+def _materialize_checklist(schema, properties):
+    checklist = build_property_checklist(schema, properties)
+    return MaterializedChecklist(schema.name, CHECKLIST_LANGUAGE, schema.mtime,
+                                 checklist, JsonSnapshot(list(checklist)))
+
+
+def build_property_checklists():
+    """
+    Build the checklist of every schema from one batched property lookup.
+
+    Returns (Dict[Tuple[str, str], MaterializedChecklist]): keyed by schema
+        name and language
+
+    """
+    schemas = [SCHEMA_REGISTRY.get(name) for name in SCHEMA_REGISTRY.names()]
+    schemas = [schema for schema in schemas if schema and schema.prop_map]
+    pids = set(DEFAULT_PID_LIST).union(*(schema.prop_ids for schema in schemas))
+    properties = build_property_loader().load_many(sorted(pids))
+    output = {}
+    for schema in schemas:
+        try:
+            output[(schema.name, CHECKLIST_LANGUAGE)] = _materialize_checklist(
+                schema, properties)
+        except LookupError:
+            logging.exception("Unable to build the checklist of %s", schema.name)
+    # Keep the previous checklists when the property lookup failed outright
+    if schemas and not output:
+        raise LookupError("No property checklist could be built")
+    return output
+
+
+def get_materialized_checklist(schema_name):
+    """
+    Get the ready to serve checklist of a schema.
+
+    Notes:
+        - Checklists are rebuilt on a schedule by PROPERTY_CHECKLISTS. Only
+        the checklist asked for is built on the calling thread, if it is
+        older than its schema file or not scheduled yet, and kept until
+        the schedule has a checklist of the same schema file.
+        - If that build fails the last checklist of the schema is served.
+
+    Args:
+        schema_name (str): ex. "file_format/file_format_minimal.json"
+
+    Returns (Optional[MaterializedChecklist]): None for unknown or empty
+        schemas, and if no checklist of the schema could be built
+
+    """
+    schema = SCHEMA_REGISTRY.get(schema_name)
+    if not schema or not schema.prop_map:
+        return None
+    key = (schema_name, CHECKLIST_LANGUAGE)
+    scheduled = (PROPERTY_CHECKLISTS.value or {}).get(key)
+    if scheduled is not None and scheduled.schema_mtime == schema.mtime:
+        # The schedule caught up, its checklists are the newer ones
+        _REQUEST_CHECKLISTS.pop(key, None)
+        return scheduled
+    built = _REQUEST_CHECKLISTS.get(key)
+    if built is not None and built.schema_mtime == schema.mtime:
+        return built
+    candidates = [checklist for checklist in (built, scheduled) if checklist]
+    pids = sorted(schema.prop_ids.union(DEFAULT_PID_LIST))
+    try:
+        checklist = _materialize_checklist(
+            schema, build_property_loader().load_many(pids))
+    except (LookupError, requests.RequestException):
+        logging.exception("Unable to build the checklist of %s", schema_name)
+        return candidates[0] if candidates else None
+    _REQUEST_CHECKLISTS[key] = checklist
     return checklist
 
 
@@ -271,12 +341,68 @@ def wd_datatype(data_type, value, *args, **kwargs):
     return wd_datatype_class(value=value, *args, **kwargs)
 
 
-def get_all_file_formats():
+def build_file_format_snapshot():
     """
-    Get all File Formats.
+    Serialize the catalog of all File Formats.
+
+    Returns (JsonSnapshot):
+
+    """
+    return JsonSnapshot([x.api_dict() for x in FileFormat.iter_formats()])
+
+
+def build_stored_file_format_snapshot():
+    """
+    Serialize the File Formats whose items the portal has read before.
+
+    Notes:
+        - Stands in for the catalog while it cannot be queried, items come
+        from the entity store and are revalidated when Wikidata answers.
+
+    Returns (Optional[JsonSnapshot]): None if no format was stored
+
+    """
+    qids = wd_int_utils.get_stored_item_ids_by_class(FILE_FORMAT_QID)
+    if not qids:
+        return None
+    try:
+        items = wd_int_utils.get_items_json(qids)
+    except WikibaseReadError:
+        logging.exception("Unable to read the stored file formats")
+        return None
+    formats = sorted((FileFormat.from_entity(items[qid]) for qid in qids
+                      if qid in items), key=lambda x: x.name)
+    return JsonSnapshot([x.api_dict() for x in formats])
+
+
+def get_file_format_snapshot():
+    """
+    Get the latest serialized catalog of all File Formats.
+
+    Notes:
+        - Built on the request thread only until the background refresh
+        has produced a first snapshot, concurrent requests share that build.
+        - If it cannot be built the formats in the entity store are served,
+        see build_stored_file_format_snapshot.
 
-    Returns (List[FileFormat]):
+    Returns (Optional[JsonSnapshot]): None if neither could be built
 
     """
-    formats = FileFormat.list_formats()
-    return formats
+    snapshot = FILE_FORMAT_SNAPSHOT.get()
+    if snapshot is None:
+        logging.warning("No file format catalog, serving stored formats")
+        snapshot = build_stored_file_format_snapshot()
+    return snapshot
+
+
+SCHEMA_REGISTRY = SchemaRegistry(
+    SCHEMA_DIR, parse_expressions,
+    check_interval=APP.config[ConfKey.SCHEMA_CHECK_INTERVAL])
+# Checklists built by get_materialized_checklist ahead of the schedule
+_REQUEST_CHECKLISTS = {}
+PROPERTY_CHECKLISTS = PeriodicRefresh(
+    'property checklists', build_property_checklists,
+    interval=APP.config[ConfKey.CHECKLIST_REFRESH_INTERVAL])
+FILE_FORMAT_SNAPSHOT = PeriodicRefresh(
+    'file format catalog', build_file_format_snapshot,
+    interval=APP.config[ConfKey.FILE_FORMAT_SNAPSHOT_INTERVAL])
@@ -14,6 +14,8 @@
 """Module for WikiDP pages."""
 from flask import request
 
+from wikidp.config import APP
+from wikidp.const import ConfKey
 from wikidp.controllers.api import get_property_checklist_from_schema
 from wikidp.utils import (
     get_directory_filenames_with_subdirectories,
@@ -21,7 +23,7 @@ from wikidp.utils import (
     item_detail_parse,
 )
 
-SCHEMA_DIRECTORY_PATH = 'wikidp/schemas/'
+SCHEMA_DIRECTORY_PATH = APP.config[ConfKey.SCHEMA_DIR]
 
 
 def get_item_context(qid, with_claims=True):
@@ -13,10 +13,19 @@
 # main package contents
 """Search Controller Functions and Helpers for WikiDP."""
 
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
 import logging
 import re
+import time
 
-from wikidataintegrator.wdi_core import WDItemEngine
+from flask import (
+    copy_current_request_context,
+    has_request_context,
+)
 
 from wikidp.config import APP
 from wikidp.const import (
@@ -30,64 +39,166 @@ from wikidp.models import (
 )
 from wikidp.utils import (
     dedupe_by_key,
-    item_detail_parse,
+    http,
+    item_detail_parse_list,
+    parse_wd_response_by_key,
+    search_hit_summary,
+    wd_int_utils,
 )
+from wikidp.utils.errors import WikibaseReadError
+from wikidp.utils.typeahead import TypeaheadCache
 
-MEDIAWIKI_API_URL = APP.config[ConfKey.MEDIAWIKI_API_URL]
+SEARCH_DEADLINE = APP.config[ConfKey.SEARCH_DEADLINE]
+SEARCH_POOL = ThreadPoolExecutor(max_workers=APP.config[ConfKey.SEARCH_WORKERS],
+                                 thread_name_prefix='search')
+WIKIDATA_FB_LANG = APP.config[ConfKey.WIKIDATA_FB_LANG]
 WIKIDATA_LANG = APP.config[ConfKey.WIKIDATA_LANG]
 
 
-def get_search_result_context(search_string):
+def get_search_result_context(search_string, deadline=SEARCH_DEADLINE):
     """
     Get search results from a substring.
 
+    Notes:
+        - The extension, PUID and native Wikidata searches run concurrently,
+        a source that has not answered by the deadline is left out.
+        - Upstream requests of the sources time out at the deadline too, so
+        late sources free their SEARCH_POOL thread instead of running on.
+
     Args:
         search_string (str):
+        deadline (float): seconds to wait for all sources
 
-    Returns (List[Optional[Dict]]):
+    Returns (Tuple[List[Dict], bool]): results deduplicated by QID, in
+        source order, and True if a source timed out or failed
 
     """
-    # Check if searching by file extension
-    context = [
-        {
-            WDEntityField.QID: res.format,
-            WDEntityField.LABEL: res.label,
-            WDEntityField.DESCRIPTION: res.description,
-        }
-        for res in FileFormatExtSearchResult.search(search_string)
-    ]
+    sources = [_search_extension]
     # Check if searching with PUID
     if re.search(PUID_REGEX, search_string):
-        context.extend([
-            {
-                WDEntityField.QID: res.format,
-                WDEntityField.LABEL: res.label,
-                WDEntityField.DESCRIPTION: res.description,
-            }
-            for res in PuidSearchResult.search_puid(search_string,
-                                                    lang=WIKIDATA_LANG)
-        ])
+        sources.append(_search_puid)
     # Search Wikidata natively
-    context.extend(search_result_list(search_string))
-    return dedupe_by_key(context, WDEntityField.QID)
+    sources.append(search_result_list)
+    if has_request_context():
+        sources = [copy_current_request_context(source) for source in sources]
+    expires = time.time() + deadline
+    futures = [SEARCH_POOL.submit(_call_before, expires, source, search_string)
+               for source in sources]
+    wait(futures, timeout=deadline)
+    context = []
+    partial = False
+    for future in futures:
+        try:
+            context.extend(future.result(timeout=0))
+        except FutureTimeoutError:
+            future.cancel()
+            logging.warning("Search source timed out for: %s", search_string)
+            partial = True
+        except Exception:  # pylint: disable=W0703
+            logging.exception("Search source failed for: %s", search_string)
+            partial = True
+    return dedupe_by_key(context, WDEntityField.QID), partial
+
+
+def _call_before(expires, source, search_string):
+    with http.deadline(expires - time.time()):
+        return source(search_string)
+
+
+def _search_extension(search_string):
+    return [_search_result_dict(res)
+            for res in FileFormatExtSearchResult.search(search_string)]
+
+
+def _search_puid(search_string):
+    return [_search_result_dict(res)
+            for res in PuidSearchResult.search_puid(search_string,
+                                                    lang=WIKIDATA_LANG)]
+
+
+def _search_result_dict(res):
+    return {
+        WDEntityField.QID: res.format,
+        WDEntityField.LABEL: res.label,
+        WDEntityField.DESCRIPTION: res.description,
+    }
 
 
 def search_result_list(search_string):
     """
-    Use wikidataintegrator to generate a list of similar items.
+    Generate a list of similar items, see TYPEAHEAD_CACHE.
 
     This is based on a text search and returns a list of
     (qid, Label, description, aliases) dictionaries.
     """
-    result_qid_list = WDItemEngine.get_wd_search_results(
-        search_string=search_string, language=WIKIDATA_LANG,
-        mediawiki_api_url=MEDIAWIKI_API_URL)
-    output = []
-    for qid in result_qid_list[:10]:
-        item = item_detail_parse(qid, with_claims=False)
+    return TYPEAHEAD_CACHE.search(search_string)
+
+
+def _search_items(search_string, limit):
+    """
+    Search items and summarize them from the search hits.
+
+    Notes:
+        - Items are only loaded to fill a missing label, or a missing
+        description when a fallback language could provide one. They keep
+        the match of their search hit.
+        - Hits only list the aliases that matched, the aliases of the other
+        items are read in one batched call. If it fails the matched aliases
+        are kept.
+
+    Args:
+        search_string (str):
+        limit (int):
+
+    Returns (List[Dict]):
+
+    """
+    hits = wd_int_utils.search_items(search_string, WIKIDATA_LANG, limit=limit)
+    summaries = [search_hit_summary(hit) for hit in hits]
+    required = [WDEntityField.LABEL]
+    if WIKIDATA_FB_LANG != WIKIDATA_LANG:
+        required.append(WDEntityField.DESCRIPTION)
+    incomplete = [summary[WDEntityField.QID] for summary in summaries
+                  if any(field not in summary for field in required)]
+    if incomplete:
+        loaded = dict(zip(incomplete, _summarize_items(incomplete)))
+        summaries = [_with_match(loaded.get(summary[WDEntityField.QID]), summary)
+                     for summary in summaries]
+    _add_all_aliases([summary for summary in summaries
+                      if summary[WDEntityField.QID] not in incomplete])
+    for summary in summaries:
+        summary.setdefault(WDEntityField.LABEL, f"Item {summary[WDEntityField.QID]}")
+        summary.setdefault(WDEntityField.DESCRIPTION, '')
+    return summaries
+
+
+def _add_all_aliases(summaries):
+    if not summaries:
+        return
+    try:
+        items = wd_int_utils.get_items_terms(
+            [summary[WDEntityField.QID] for summary in summaries],
+            props='aliases')
+    except WikibaseReadError:
+        logging.exception("Unable to read the aliases of search results")
+        return
+    for summary in summaries:
+        item = items.get(summary[WDEntityField.QID])
         if item:
-            output.append(item)
-    return output
+            summary[WDEntityField.ALIASES] = parse_wd_response_by_key(
+                item, WDEntityField.ALIASES, default=[])
+
+
+def _with_match(loaded, summary):
+    if not loaded:
+        return summary
+    if WDEntityField.MATCH in summary:
+        return {**loaded, WDEntityField.MATCH: summary[WDEntityField.MATCH]}
+    return loaded
+
+
+def _summarize_items(qids):
+    return item_detail_parse_list(qids, with_claims=False)
 
 
 def get_search_by_puid_context(puid):
@@ -96,3 +207,9 @@ def get_search_by_puid_context(puid):
     logging.debug("Searching for PUID: %s", new_puid)
     results = PuidSearchResult.search_puid(new_puid, lang=WIKIDATA_LANG)
     return new_puid, results
+
+
+TYPEAHEAD_CACHE = TypeaheadCache(
+    _search_items, _summarize_items,
+    ttl=APP.config[ConfKey.SEARCH_CACHE_TTL],
+    max_entries=APP.config[ConfKey.SEARCH_CACHE_MAX_ENTRIES])
@@ -12,15 +12,27 @@
 """Model classes to glue queries to return types."""
 import logging
 
-from wikidataintegrator import wdi_core
-
-from wikidp.const import LANG
+from wikidp.config import APP
+from wikidp.const import (
+    ConfKey,
+    LANG,
+    MEDIA_TYPE_PID,
+)
 from wikidp.utils import get_value
+from wikidp.utils.background import PeriodicRefresh
+from wikidp.utils.ngram import NgramIndex
+from wikidp.utils.wd_int_utils import (
+    execute_sparql_query,
+    iter_query_string,
+    SPARQL_ENDPOINT_URL,
+)
 
 
 class FileFormat():
     """Encapsulates a file format plus wikidata query magic for formats."""
 
+    __slots__ = ('_qid', '_name', '_media_types')
+
     def __init__(self, qid, name, media_types=None):
         """Constructor for a FileFormat instance."""
         self._qid = qid
@@ -56,6 +68,48 @@ class FileFormat():
     @classmethod
     def list_formats(cls, lang=None):
         """Query Wikidata for formats and returns a list of FileFormat instances."""
+        results_json = execute_sparql_query(cls._list_query(lang),
+                                            endpoint=SPARQL_ENDPOINT_URL,
+                                            template='file_formats')
+        results = [cls(x['idFileFormat']['value'].replace('http://www.wikidata.org/entity/', ''),
+                       x['idFileFormatLabel']['value'],
+                       x['mediaTypes']['value'].split('|') if x['mediaTypes']['value'] else [])
+                   for x in results_json['results']['bindings']]
+        return results
+
+    @classmethod
+    def from_entity(cls, entity, lang=None):
+        """
+        Build a FileFormat from the raw JSON of its item.
+
+        Args:
+            entity (Dict): ex. from wd_int_utils.get_item_json
+            lang (Optional[str]): label language, LANG if None
+
+        Returns (FileFormat): named after the qid without a label in lang
+
+        """
+        qid = entity['id']
+        label = entity.get('labels', {}).get(lang or LANG, {}).get('value', qid)
+        media_types = []
+        for claim in entity.get('claims', {}).get(MEDIA_TYPE_PID, []):
+            value = claim.get('mainsnak', {}).get('datavalue', {}).get('value')
+            if isinstance(value, str):
+                media_types.append(value)
+        return cls(qid, label, media_types)
+
+    @classmethod
+    def iter_formats(cls, lang=None):
+        """Stream FileFormat instances from Wikidata as the query result arrives."""
+        rows = iter_query_string(cls._list_query(lang),
+                                 endpoint=SPARQL_ENDPOINT_URL)
+        for row in rows:
+            yield cls(row['idFileFormat'].replace('http://www.wikidata.org/entity/', ''),
+                      row['idFileFormatLabel'],
+                      row['mediaTypes'].split('|') if row['mediaTypes'] else [])
+
+    @staticmethod
+    def _list_query(lang=None):
         if not lang:
             lang = LANG
         query = [
@@ -69,16 +123,13 @@ class FileFormat():
             "GROUP BY ?idFileFormat ?idFileFormatLabel",
             "ORDER BY ?idFileFormatLabel"
             ]
-        results_json = wdi_core.WDItemEngine.execute_sparql_query(" ".join(query))
-        results = [cls(x['idFileFormat']['value'].replace('http://www.wikidata.org/entity/', ''),
-                       x['idFileFormatLabel']['value'],
-                       x['mediaTypes']['value'].split('|') if x['mediaTypes']['value'] else [])
-                   for x in results_json['results']['bindings']]
-        return results
+        return " ".join(query)
 
 class PuidSearchResult():
     """Encapsulates a file format plus wikidata query magic for formats."""
 
+    __slots__ = ('_format', '_label', '_description', '_mime', '_puid')
+
     # pylint: disable=R0913
     def __init__(self, wd_format, label, description, mime, puid):
         """Constructor for a PUID search result instance."""
@@ -121,16 +172,26 @@ class PuidSearchResult():
     @classmethod
     def search_puid(cls, puid, lang="en"):
         """Query Wikidata for formats and returns a list of FileFormat instances."""
+        catalog = FileFormatCatalog.get(lang)
+        if catalog is not None:
+            return catalog.search_puid(puid)
         query = cls._concat_query("VALUES ?puid {{ '{}' }}".format(puid), lang)
-        results_json = wdi_core.WDItemEngine.execute_sparql_query(query)
+        results_json = execute_sparql_query(query,
+                                            endpoint=SPARQL_ENDPOINT_URL,
+                                            template='format_search')
         logging.debug(str(results_json))
         return cls._assemble_results(results_json)
 
     @classmethod
     def search_mime(cls, mime, lang="en"):
         """Query Wikidata for formats and returns a list of FileFormat instances."""
+        catalog = FileFormatCatalog.get(lang)
+        if catalog is not None:
+            return catalog.search_mime(mime)
         query = cls._concat_query("VALUES ?mime {{ '{}' }}".format(mime), lang)
-        results_json = wdi_core.WDItemEngine.execute_sparql_query(query)
+        results_json = execute_sparql_query(query,
+                                            endpoint=SPARQL_ENDPOINT_URL,
+                                            template='format_search')
         logging.debug(str(results_json))
         return cls._assemble_results(results_json)
 
@@ -162,6 +223,8 @@ class PuidSearchResult():
 class FileFormatExtSearchResult(PuidSearchResult):
     """File Format Extension Search Result Model."""
 
+    __slots__ = ()
+
     def __init__(self, wd_id, label, description):
         """Constructor for a File Format Extension search result instance."""
         super().__init__(wd_id, label, description, None, None)
@@ -203,7 +266,216 @@ class FileFormatExtSearchResult(PuidSearchResult):
         Returns (List[FileFormatExtSearchResult]):
 
         """
+        catalog = FileFormatCatalog.get(lang)
+        if catalog is not None:
+            return catalog.search_extension(search_string)
         query = cls._build_query(search_string.replace('.', "").lower(), lang)
-        results_json = wdi_core.WDItemEngine.execute_sparql_query(query)
+        results_json = execute_sparql_query(query,
+                                            endpoint=SPARQL_ENDPOINT_URL,
+                                            template='format_search')
         objects = cls._assemble_results(results_json)
         return objects
+
+
+class FileFormatCatalog():
+    """
+    In memory index of the identifiers of every format on Wikidata.
+
+    Notes:
+        - Loaded from a single bulk query and kept current by FORMAT_CATALOG,
+        so PUID, MIME type and extension searches are dictionary lookups.
+        - Only holds labels in one language, searches in another language
+        still go to Wikidata.
+    """
+
+    __slots__ = ('_lang', '_formats', '_by_puid', '_by_mime', '_by_extension',
+                 '_extension_index')
+
+    def __init__(self, lang):
+        """
+        Constructor for an empty FileFormatCatalog instance.
+
+        Args:
+            lang (str): language of the labels and descriptions
+        """
+        self._lang = lang
+        self._formats = {}
+        self._by_puid = {}
+        self._by_mime = {}
+        self._by_extension = {}
+        self._extension_index = NgramIndex()
+
+    @property
+    def lang(self):
+        """The language of the labels and descriptions."""
+        return self._lang
+
+    def __len__(self):
+        """Return the number of formats in the catalog."""
+        return len(self._formats)
+
+    @classmethod
+    def get(cls, lang):
+        """
+        Get the current catalog if it can answer searches in a language.
+
+        Args:
+            lang (str):
+
+        Returns (Optional[FileFormatCatalog]): None until the first load, or
+            for another language
+
+        """
+        catalog = FORMAT_CATALOG.value
+        if catalog is None or catalog.lang != lang:
+            return None
+        return catalog
+
+    @classmethod
+    def load(cls, lang=None):
+        """
+        Stream every format with a PUID or an extension from Wikidata.
+
+        Args:
+            lang (Optional[str]): defaults to the portal language
+
+        Returns (FileFormatCatalog):
+
+        """
+        catalog = cls(lang or APP.config[ConfKey.WIKIDATA_LANG])
+        rows = iter_query_string(cls._bulk_query(catalog.lang),
+                                 endpoint=SPARQL_ENDPOINT_URL)
+        for row in rows:
+            catalog.add(row['format'].replace('http://www.wikidata.org/entity/', ''),
+                        row.get('formatLabel', ''),
+                        row.get('formatDescription', ''),
+                        puids=_split(row.get('puids')),
+                        mimes=_split(row.get('mimes')),
+                        extensions=_split(row.get('extensions')))
+        logging.debug("Loaded %d formats into the catalog", len(catalog))
+        return catalog
+
+    # pylint: disable=R0913
+    def add(self, qid, label, description, puids=(), mimes=(), extensions=()):
+        """
+        Add a format and index its identifiers.
+
+        Args:
+            qid (str):
+            label (str):
+            description (str):
+            puids (Iterable[str]):
+            mimes (Iterable[str]):
+            extensions (Iterable[str]):
+
+        """
+        entry = _CatalogEntry(label, description, puids, mimes, extensions)
+        self._formats[qid] = entry
+        for puid in entry.puids:
+            self._by_puid.setdefault(puid, []).append(qid)
+        for mime in entry.mimes:
+            self._by_mime.setdefault(mime, []).append(qid)
+        for extension in entry.extensions:
+            self._by_extension.setdefault(extension.lower(), []).append(qid)
+            self._extension_index.add(extension.lower())
+
+    def search_puid(self, puid):
+        """
+        Find the formats with a PUID.
+
+        Args:
+            puid (str): ex. "fmt/11"
+
+        Returns (List[PuidSearchResult]): one per MIME type of each format
+
+        """
+        results = []
+        for qid in self._by_puid.get(puid, []):
+            entry = self._formats[qid]
+            results.extend(PuidSearchResult(qid, entry.label, entry.description,
+                                            mime, puid)
+                           for mime in entry.mimes or ('unknown',))
+        return results
+
+    def search_mime(self, mime):
+        """
+        Find the formats with a PUID and a MIME type.
+
+        Args:
+            mime (str): ex. "image/png"
+
+        Returns (List[PuidSearchResult]): one per PUID of each format
+
+        """
+        results = []
+        for qid in self._by_mime.get(mime, []):
+            entry = self._formats[qid]
+            results.extend(PuidSearchResult(qid, entry.label, entry.description,
+                                            mime, puid)
+                           for puid in entry.puids)
+        return results
+
+    def search_extension(self, search_string, prefix=False, limit=None):
+        """
+        Find the formats with an extension containing a string.
+
+        Args:
+            search_string (str): ex. ".tif"
+            prefix (bool): only match the start of extensions
+            limit (Optional[int]): most formats returned
+
+        Returns (List[FileFormatExtSearchResult]): one per format, exact
+            extension matches first, then prefixes, then other substrings
+
+        """
+        value = search_string.replace('.', "").lower()
+        qids = {}
+        for extension in self._extension_index.search(value, prefix=prefix):
+            qids.update(dict.fromkeys(self._by_extension[extension]))
+            if limit is not None and len(qids) >= limit:
+                break
+        qids = list(qids)[:limit]
+        return [FileFormatExtSearchResult(qid, self._formats[qid].label,
+                                          self._formats[qid].description)
+                for qid in qids]
+
+    @staticmethod
+    def _bulk_query(lang):
+        query = [
+            "SELECT ?format ?formatLabel ?formatDescription",
+            "(GROUP_CONCAT(DISTINCT ?puid; SEPARATOR='|') AS ?puids)",
+            "(GROUP_CONCAT(DISTINCT ?mime; SEPARATOR='|') AS ?mimes)",
+            "(GROUP_CONCAT(DISTINCT ?extension; SEPARATOR='|') AS ?extensions)",
+            "WHERE {",
+            "{ ?format wdt:P2748 [] } UNION { ?format wdt:P1195 [] }",
+            "OPTIONAL { ?format wdt:P2748 ?puid }",
+            "OPTIONAL { ?format wdt:P1163 ?mime }",
+            "OPTIONAL { ?format wdt:P1195 ?extension }",
+            "SERVICE wikibase:label {{ bd:serviceParam wikibase:language '{}' }}".format(lang),
+            "}",
+            "GROUP BY ?format ?formatLabel ?formatDescription",
+            ]
+        return " ".join(query)
+
+
+class _CatalogEntry():
+    """Labels and identifiers of one format in the FileFormatCatalog."""
+
+    __slots__ = ('label', 'description', 'puids', 'mimes', 'extensions')
+
+    # pylint: disable=R0913
+    def __init__(self, label, description, puids, mimes, extensions):
+        self.label = label
+        self.description = description
+        self.puids = tuple(puids)
+        self.mimes = tuple(mimes)
+        self.extensions = tuple(extensions)
+
+
+def _split(value):
+    return value.split('|') if value else []
+
+
+FORMAT_CATALOG = PeriodicRefresh(
+    'file format identifiers', FileFormatCatalog.load,
+    interval=APP.config[ConfKey.FORMAT_CATALOG_REFRESH_INTERVAL])
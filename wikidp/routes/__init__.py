@@ -15,6 +15,7 @@
 from . import (
     _converters,
     _filters,
+    _hooks,
     api,
     forms,
     oauth,
@@ -0,0 +1,30 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Flask application request hooks for Wikidata portal."""
+import logging
+
+from wikidp.config import APP
+from wikidp.utils.memo import get_memo_stats
+
+
+@APP.after_request
+def after_request_memo_stats(response):
+    """Report request memo hits and misses when debugging."""
+    stats = get_memo_stats()
+    if stats and APP.debug:
+        summary = ", ".join(
+            f"{namespace}={counts['hits']}/{counts['hits'] + counts['misses']}"
+            for namespace, counts in sorted(stats.items())
+        )
+        logging.debug("Request memo hits: %s", summary)
+        response.headers['X-WikiDP-Memo'] = summary
+    return response
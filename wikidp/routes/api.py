@@ -13,14 +13,21 @@
 import logging
 
 from flask import (
+    json,
     jsonify,
     request,
+    Response,
+    stream_with_context,
 )
 
 from wikidp.config import APP
+from wikidp.const import (
+    ConfKey,
+    WDEntityField,
+)
 from wikidp.controllers.api import (
-    get_all_file_formats,
-    get_property_checklist_from_schema,
+    get_file_format_snapshot,
+    get_materialized_checklist,
     write_claims_to_item,
 )
 from wikidp.controllers.auth import get_wdi_login
@@ -30,9 +37,16 @@ from wikidp.utils import (
     get_all_qualifier_properties,
     get_all_reference_properties,
     get_allowed_qualifiers_by_pid,
+    get_item_claims,
     get_property,
     item_detail_parse,
+    item_detail_parse_list,
+    iter_item_detail_parse,
 )
+from wikidp.utils.wikibase import WikibaseReadError
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
 
 
 @APP.route("/api/")
@@ -60,6 +74,11 @@ def route_api_get_item_summary_list():
     """
     Get a list of Wikidata Item.
 
+    Notes:
+        - Streamed as newline delimited JSON when asked for, see
+        _wants_ndjson. Each item is written as soon as its batch is fetched,
+        missing items as {"qid": ..., "missing": true}.
+
     Returns (Response): JSON list with id, label, description, and aliases
 
     """
@@ -67,10 +86,47 @@ def route_api_get_item_summary_list():
         qids = request.args.get('qids').split(',')
     else:
         qids = request.get_json()
-    items = [item_detail_parse(qid, with_claims=False) for qid in qids]
+    if _wants_ndjson():
+        return _ndjson_response(
+            item or {WDEntityField.QID: qid, 'missing': True}
+            for qid, item in iter_item_detail_parse(qids, with_claims=False))
+    items = item_detail_parse_list(qids, with_claims=False)
     return jsonify(items)
 
 
+@APP.route("/api/<item:qid>/claims")
+def route_api_get_item_claims(qid):
+    """
+    Get a page of an item's claims, parsing only that page.
+
+    Query parameters are pids (comma separated, all properties if absent),
+    offset, limit and include (comma separated qualifiers and/or references).
+
+    Returns (Response): JSON with qid, offset, limit, total, claims and
+        external_links, 404 if the item does not exist and 503 if Wikidata
+        could not be read
+
+    """
+    pids = request.args.get('pids')
+    if pids is not None:
+        pids = [pid.strip().upper() for pid in pids.split(',') if pid.strip()]
+    offset = max(request.args.get('offset', default=0, type=int), 0)
+    limit = request.args.get('limit', default=APP.config[ConfKey.CLAIMS_PAGE_SIZE],
+                             type=int)
+    limit = min(max(limit, 0), APP.config[ConfKey.CLAIMS_PAGE_MAX])
+    include = {part.strip() for part in request.args.get('include', '').split(',')}
+    include &= {WDEntityField.QUALIFIERS, WDEntityField.REFERENCES}
+    try:
+        claims = get_item_claims(qid, pids=pids, offset=offset, limit=limit,
+                                 include=include)
+    except WikibaseReadError:
+        logging.exception("Unable to read the claims of %s", qid)
+        return jsonify(False), 503
+    if not claims:
+        return jsonify(claims), 404
+    return jsonify(claims)
+
+
 @APP.route("/api/<item:qid>/claims/write", methods=['POST'])
 def route_api_write_claims_to_item(qid):
     """User posts a JSON object of claims to contribute to an item."""
@@ -125,19 +181,82 @@ def route_api_get_all_languages():
 def route_api_search_item_by_string(search_string):
     """Post string, returns list of json of (id, label, desc, aliases)."""
     _string = search_string.strip()
-    output = search_result_list(_string)
+    try:
+        output = search_result_list(_string)
+    except WikibaseReadError:
+        logging.exception("Unable to search for %s", _string)
+        return jsonify([]), 503
     return jsonify(output)
 
 
 @APP.route("/api/schema/<path:schema_name>/properties")
 def route_api_get_properties_by_schema(schema_name):
     """Return a JSON representation of properties from a particular schema."""
-    prop_list = get_property_checklist_from_schema(schema_name)
-    return jsonify(prop_list)
+    checklist = get_materialized_checklist(schema_name)
+    if checklist is None:
+        return jsonify([])
+    return _snapshot_response(checklist.snapshot)
 
 
 @APP.route("/api/browse/file_format", methods=['GET', 'POST'])
 def route_api_browse_file_format():
     """Return a JSON representation of a list of all file formats."""
-    format_list = get_all_file_formats()
-    return jsonify([x.api_dict() for x in format_list])
+    snapshot = get_file_format_snapshot()
+    if snapshot is None:
+        return jsonify([]), 503
+    if _wants_ndjson():
+        return _snapshot_response(snapshot.as_ndjson(), NDJSON_MIMETYPE)
+    return _snapshot_response(snapshot)
+
+
+def _wants_ndjson():
+    """
+    Check whether the client asked for newline delimited JSON.
+
+    Returns (bool): True with ?stream=1 or when application/x-ndjson is
+        preferred over application/json in the Accept header
+
+    """
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best_match(
+        [JSON_MIMETYPE, NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _ndjson_response(values):
+    """
+    Stream JSON values, one per line, as they are produced.
+
+    Args:
+        values (Iterable[Any]): consumed within the request context
+
+    Returns (Response):
+
+    """
+    lines = (json.dumps(value) + '\n' for value in values)
+    return Response(stream_with_context(lines), mimetype=NDJSON_MIMETYPE)
+
+
+def _snapshot_response(snapshot, mimetype=JSON_MIMETYPE):
+    """
+    Serve a JsonSnapshot, honouring If-None-Match and Accept-Encoding.
+
+    Args:
+        snapshot (JsonSnapshot):
+        mimetype (str):
+
+    Returns (Response):
+
+    """
+    if request.if_none_match.contains_weak(snapshot.etag):
+        response = Response(status=304)
+    else:
+        body, encoding = snapshot.get_body(request.accept_encodings.quality)
+        response = Response(body, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(snapshot.etag, weak=True)
+    response.headers['Age'] = str(int(snapshot.age))
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    response.last_modified = snapshot.built_at
+    return response
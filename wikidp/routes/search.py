@@ -42,10 +42,11 @@ def route_site_search():
 
     """
     search_string = request.args.get('q', default='', type=str)
-    context = search_controller.get_search_result_context(search_string)
-    if len(context) == 1:
+    context, partial = search_controller.get_search_result_context(search_string)
+    if len(context) == 1 and not partial:
         return redirect(f'/{context[0]["qid"]}')
-    return render_template('search_results.html', options=context)
+    return render_template('search_results.html', options=context,
+                           partial=partial)
 
 
 @APP.route("/search/puid/<string:puid>")
@@ -31,6 +31,14 @@ PROPERTY_QUERY = """
     ORDER BY ASC(xsd:integer(STRAFTER(STR(?property), 'P')))
 """
 
+ALL_EXTERNAL_ID_FORMATTER_URLS = """
+    SELECT (STRAFTER(STR(?property), 'entity/') as ?id) ?formatter_url
+    WHERE {
+      ?property wikibase:propertyType wikibase:ExternalId .
+      ?property wdt:P1630 ?formatter_url .
+    }
+"""
+
 ALL_QUALIFIER_PROPERTIES = """
     SELECT (STRAFTER(STR(?property), 'entity/') as ?id) ?property ?propertyType ?propertyLabel
     ?propertyDescription ?propertyAltLabel (STRAFTER(STR(?propertyType), '#') as ?value_type)
@@ -14,7 +14,7 @@
 """General purpose utilities for wikidp."""
 from collections import namedtuple
 from datetime import datetime
-import json
+import functools
 import logging
 from os import listdir
 from os.path import (
@@ -24,7 +24,6 @@ from os.path import (
 )
 import re
 from string import Template
-from urllib import request as urllib_request
 
 import validators
 
@@ -33,10 +32,10 @@ from wikidp.const import (
     ConfKey,
     WDEntityField,
     WIKIDATA_ENTITY_BASE_URL,
-    WIKIMEDIA_COMMONS_BASE_URL,
-    WIKIMEDIA_COMMONS_API_URL,
+    WIKIMEDIA_IMAGE_PIDS,
 )
 from wikidp.sparql import (
+    ALL_EXTERNAL_ID_FORMATTER_URLS,
     ALL_LANGUAGES_QUERY,
     ALL_QUALIFIER_PROPERTIES,
     ALL_REFERENCE_PROPERTIES,
@@ -45,13 +44,27 @@ from wikidp.sparql import (
 )
 
 from . import (
+    commons,
     wd_int_utils,
 )
+from .background import PeriodicRefresh
+from .loaders import BatchLoader
+from .memo import (
+    get_request_memo,
+    record_memo_stats,
+    request_memo,
+)
 
 ITEM_REGEX = APP.config[ConfKey.ITEM_REGEX]
 PROPERTY_REGEX = APP.config[ConfKey.PROPERTY_REGEX]
 WIKIDATA_FB_LANG = APP.config[ConfKey.WIKIDATA_FB_LANG]
 WIKIDATA_LANG = APP.config[ConfKey.WIKIDATA_LANG]
+# Most property ids sent in a single PROPERTY_QUERY VALUES clause
+PROPERTY_BATCH_SIZE = 100
+# Distinct timestamps kept formatted, see time_formatter
+TIME_FORMAT_CACHE_SIZE = 4096
+# Strings that do not start with a scheme can never pass validators.url
+URL_SCHEME_PREFIX = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*:')
 
 RequestToken = namedtuple("RequestToken", ['key', 'secret'])
 
@@ -107,8 +120,7 @@ def _entity_id_to_int(entity):
 
 def get_property(pid):
     """Return the first value from a list of properties."""
-    prop_response = get_property_details_by_pid_list([pid])
-    return prop_response[0] if prop_response else None
+    return build_property_loader().load(pid)
 
 
 def convert_list_to_value_string(lst):
@@ -143,13 +155,27 @@ def get_all_languages():
 
     """
     query = _flatten_string(ALL_LANGUAGES_QUERY)
-    return wd_int_utils.process_query_string(query)
+    return wd_int_utils.process_query_string(query, template='all_languages')
+
+
+def get_external_id_formatter_urls():
+    """
+    Get the formatter urls (P1630) of every external identifier property.
+
+    Returns (Dict[str, List[str]]): keys are property id's
+
+    """
+    query = _flatten_string(ALL_EXTERNAL_ID_FORMATTER_URLS)
+    output = {}
+    for prop in wd_int_utils.iter_query_string(query):
+        output.setdefault(prop.get('id'), []).append(prop.get('formatter_url'))
+    return output
 
 
 def get_all_qualifier_properties():
     """Return all of the qualifiers for a particular property."""
     query = _flatten_string(ALL_QUALIFIER_PROPERTIES)
-    return wd_int_utils.process_query_string(query)
+    return wd_int_utils.process_query_string(query, template='all_qualifier_properties')
 
 
 def get_all_reference_properties():
@@ -160,21 +186,54 @@ def get_all_reference_properties():
 
     """
     query = _flatten_string(ALL_REFERENCE_PROPERTIES)
-    return wd_int_utils.process_query_string(query)
+    return wd_int_utils.process_query_string(query, template='all_reference_properties')
 
 
 def get_allowed_qualifiers_by_pid(pid):
     """Return all legal quailifiers for a partiular property."""
     value = convert_list_to_value_string([pid])
     query = PROPERTY_ALLOWED_QUALIFIERS_TEMPLATE.substitute(values=value)
-    return wd_int_utils.process_query_string(query)
+    return wd_int_utils.process_query_string(
+        query, template='property_allowed_qualifiers')
 
 
 def get_property_details_by_pid_list(pid_list):
     """Return property details from a property id list."""
     values = convert_list_to_value_string(pid_list)
     query = PROPERTY_QUERY_TEMPLATE.substitute(values=values)
-    return wd_int_utils.process_query_string(query)
+    return wd_int_utils.process_query_string(query, template='property')
+
+
+def get_property_details_by_pid(pid_list):
+    """
+    Get property details keyed by property id.
+
+    Args:
+        pid_list (List[str]):
+
+    Returns (Dict[str, Dict]): first result row of every property found
+
+    """
+    output = {}
+    for prop in get_property_details_by_pid_list(pid_list):
+        output.setdefault(prop.get('id'), prop)
+    return output
+
+
+@request_memo('property_loader')
+def build_property_loader():
+    """
+    Create a loader resolving property details in batched queries.
+
+    Notes:
+        - Within a request the same loader is returned every time, so each
+        property is looked up at most once per request.
+
+    Returns (BatchLoader):
+
+    """
+    return BatchLoader(get_property_details_by_pid,
+                       max_batch_size=PROPERTY_BATCH_SIZE)
 
 
 def get_directory_filenames_with_subdirectories(directory_path):
@@ -196,6 +255,7 @@ def _remove_extension_from_filename(filename_string):
     return splitext(filename_string)[0]
 
 
+@functools.lru_cache(maxsize=TIME_FORMAT_CACHE_SIZE)
 def time_formatter(time):
     """Convert wikidata's time json to a human readable string."""
     try:
@@ -207,22 +267,7 @@ def time_formatter(time):
 
 def get_wikimedia_image_url_from_title(title):
     """Convert image title to the url location of that file it describes."""
-    # TO DO: Url's do not work with non-ascii characters
-    #    For example, the title of the image for Q267193 [Sublime Text]
-    #    is "Скриншот sublime text 2.png"
-    title = title.replace(" ", "_")
-    url_params = "action=query&prop=imageinfo&iiprop=url&" \
-                 f"titles=File:{title}&format=json"
-    url = f"{WIKIMEDIA_COMMONS_API_URL}?{url_params}"
-    try:
-        url = urllib_request.urlopen(url)
-        base = json.loads(url.read().decode())["query"]["pages"]
-        # Return just the first item
-        for item in base:
-            return base[item]["imageinfo"][0]["url"]
-    except (UnicodeEncodeError, KeyError):
-        logging.warning("Unable to process Wikimedia image '%s'", title)
-    return f"{WIKIMEDIA_COMMONS_BASE_URL}/wiki/File:{title}"
+    return commons.resolve_image_urls([title])[title]
 
 
 def get_value(data, key, default=None):
@@ -291,14 +336,20 @@ def format_item_url(qid):
     return f"{WIKIDATA_ENTITY_BASE_URL}/{qid}"
 
 
-def item_detail_parse(qid, with_claims=True):
+def item_detail_parse(qid, with_claims=True, item=None):
     """
     Get Wikidata information by QID.
 
+    Args:
+        qid (str):
+        with_claims (bool):
+        item (Optional[dict]): prefetched item json, fetched by qid if None
+
     Returns (Dict): overview of key information
 
     """
-    item = wd_int_utils.get_item_json(qid)
+    if item is None:
+        item = wd_int_utils.get_item_json(qid)
     if not item:
         return False
     label = parse_wd_response_by_key(item, 'labels', default=f"Item {qid}")
@@ -316,68 +367,338 @@ def item_detail_parse(qid, with_claims=True):
     return context
 
 
+def search_hit_summary(hit):
+    """
+    Get an item overview from a wbsearchentities hit without loading it.
+
+    Notes:
+        - Only aliases that matched the search are part of a hit.
+        - Label and description are left out when the item has none in the
+        search language.
+        - The term the search matched is kept as "match", ex.
+        {"type": "alias", "language": "en", "text": "PNG"}.
+
+    Args:
+        hit (dict): ex. {"id": "Q42", "label": "...", "match": {...}}
+
+    Returns (Dict): same fields as item_detail_parse without claims, plus
+        match
+
+    """
+    qid = hit['id']
+    display = hit.get('display', {})
+    context = {
+        WDEntityField.ALIASES: hit.get(WDEntityField.ALIASES, []),
+        WDEntityField.QID: qid,
+        WDEntityField.URL: format_item_url(qid),
+    }
+    label = hit.get('label', display.get('label', {}).get('value'))
+    if label is not None:
+        context[WDEntityField.LABEL] = label
+    description = hit.get('description',
+                          display.get('description', {}).get('value'))
+    if description is not None:
+        context[WDEntityField.DESCRIPTION] = description
+    if 'match' in hit:
+        context[WDEntityField.MATCH] = dict(hit['match'])
+    return context
+
+
+def iter_item_snaks(item):
+    """
+    Iterate over every snak parsed for an item's claims.
+
+    Notes:
+        - Covers main snaks, qualifiers and the first reference block, the
+        same snaks that are parsed into the item context.
+
+    Args:
+        item (dict): see WDItemEngine.wd_json_representation
+
+    Yields (Tuple[str, dict]): property id and snak
+
+    """
+    for pid, claim_dict in get_claims_from_json(item).items():
+        for json_details in claim_dict:
+            yield from iter_statement_snaks(pid, json_details)
+
+
+def iter_statement_snaks(pid, statement, qualifiers=True, references=True):
+    """
+    Iterate over the snaks parsed for a single statement.
+
+    Args:
+        pid (str): property of the statement
+        statement (dict): one of an item's claims for the property
+        qualifiers (bool): include the qualifier snaks
+        references (bool): include the snaks of the first reference block
+
+    Yields (Tuple[str, dict]): property id and snak
+
+    """
+    yield pid, statement.get('mainsnak', {})
+    snak_sets = []
+    if qualifiers:
+        snak_sets.append(statement.get(WDEntityField.QUALIFIERS))
+    reference_list = statement.get(WDEntityField.REFERENCES)
+    if references and reference_list:
+        snak_sets.append(reference_list[0].get('snaks'))
+    for snak_set in filter(None, snak_sets):
+        for snak_pid, snak_list in snak_set.items():
+            for snak in snak_list:
+                yield snak_pid, snak
+
+
+def item_detail_parse_list(qids, with_claims=False):
+    """
+    Get Wikidata information for several QIDs from a single batched fetch.
+
+    Args:
+        qids (List[str]):
+        with_claims (bool):
+
+    Returns (List[Union[Dict, bool]]): in qid order, False for missing items
+
+    """
+    items = wd_int_utils.get_items_json(qids)
+    return [item_detail_parse(qid, with_claims=with_claims,
+                              item=items.get(qid, False))
+            for qid in qids]
+
+
+def _prefetch_snak_details(snaks, properties):
+    """Batch the lookups parsing the snaks needs, see _parse_snak."""
+    image_titles = set()
+    for pid, snak in snaks:
+        if pid in WIKIMEDIA_IMAGE_PIDS:
+            image_titles.add(snak.get('datavalue', {}).get('value'))
+        elif snak.get('datatype') == 'external-id':
+            properties.prime([pid])
+    # Warm the image url cache with a single batched Commons query
+    commons.resolve_image_urls(filter(None, image_titles))
+
+
+def _parse_statement(parser, pid, statement, qualifiers=True, references=True):
+    val = parser.parse(pid, statement.get('mainsnak'))
+    if not val:
+        return val
+    # Copied, the memoized value is shared by every claim using it
+    val = dict(val)
+    if references:
+        val[WDEntityField.REFERENCES] = _parse_references(statement, parser)
+    if qualifiers:
+        val[WDEntityField.QUALIFIERS] = _parse_qualifiers(statement, parser)
+    return val
+
+
+def iter_item_detail_parse(qids, with_claims=False):
+    """
+    Get Wikidata information for several QIDs as soon as each is fetched.
+
+    Notes:
+        - Items come in the order their batches complete, not in qid order,
+        and repeated qids are yielded once.
+
+    Args:
+        qids (Iterable[str]):
+        with_claims (bool):
+
+    Yields (Tuple[str, Union[Dict, bool]]): qid and overview, False for
+        missing items
+
+    """
+    for chunk, items in wd_int_utils.iter_items_json(qids):
+        for qid in chunk:
+            yield qid, item_detail_parse(qid, with_claims=with_claims,
+                                         item=items.get(qid, False))
+
+
 def _add_claim_data_item_context(context, item):
     claim_list = []
-    ex_list = []
     categories = []
     claims = get_claims_from_json(item)
+    properties = build_property_loader()
+    _prefetch_snak_details(iter_item_snaks(item), properties)
+    parser = SnakParser(properties, memo=get_request_memo('snak'))
     sorted_claims = sorted(claims.items(),
                            key=lambda x: _entity_id_to_int(x[0]))
     for pid, claim_dict in sorted_claims:
         value_list = []
-        add_to_ex_list = False
         for json_details in claim_dict:
-            val = parse_snak(pid, json_details.get('mainsnak'))
+            val = _parse_statement(parser, pid, json_details)
             if val:
-                val[WDEntityField.REFERENCES] = _parse_references(
-                    json_details
-                )
-                val[WDEntityField.QUALIFIERS] = _parse_qualifiers(
-                    json_details
-                )
                 value_list.append(val)
-                if val.get('parse_type') == 'external-id':
-                    add_to_ex_list = True
                 # Determining the 'category' of the item
                 # from the 'instance of' and 'subclass of' properties
-                elif pid in ['P31', 'P279']:
+                if val.get('parse_type') != 'external-id' and \
+                        pid in ['P31', 'P279']:
                     categories.append(val)
-        parsed_claim = {'pid': pid, 'values': value_list}
-        if add_to_ex_list:
-            ex_list.append(parsed_claim)
-        else:
-            claim_list.append(parsed_claim)
+        claim_list.append({'pid': pid, 'values': value_list})
+    parser.record_stats()
+    ex_list, claim_list = split_external_links(claim_list)
     context[WDEntityField.EXTERNAL_LINKS] = ex_list
     context[WDEntityField.CLAIMS] = claim_list
     context[WDEntityField.CATEGORIES] = categories
     return context
 
 
-def _parse_qualifiers(json_details):
-    qualifier_set = json_details.get(WDEntityField.QUALIFIERS)
-    return _parse_snak_set(qualifier_set)
+def _parse_qualifiers(json_details, parser):
+    return parser.parse_set(json_details.get(WDEntityField.QUALIFIERS))
 
 
-def _parse_references(json_details):
+def _parse_references(json_details, parser):
     reference_list = json_details.get(WDEntityField.REFERENCES)
     if reference_list:
-        reference_set = reference_list[0].get('snaks')
-        return _parse_snak_set(reference_set)
+        return parser.parse_set(reference_list[0].get('snaks'))
     return []
 
 
-def _parse_snak_set(snak_set):
-    parsed_snaks = []
-    if snak_set:
-        for pid, snak_list in snak_set.items():
-            values = []
-            for snak in snak_list:
-                val = parse_snak(pid, snak)
-                if val:
-                    values.append(val)
+class ClaimView:
+    """
+    Claims of an item, parsed a page at a time.
+
+    Notes:
+        - Statements are ordered by property id, then in item order. Paging
+        only counts statements, nothing outside the page is parsed.
+        - Statements without a value (novalue, somevalue) count towards
+        offset and total but are left out of the page, like in
+        item_detail_parse.
+        - External ids are paged together with the other claims, see
+        split_external_links to separate them like item_detail_parse.
+    """
+
+    def __init__(self, item):
+        """
+        Constructor for a ClaimView instance.
+
+        Args:
+            item (dict): raw entity JSON, ex. from wd_int_utils.get_item_json
+        """
+        self._claims = get_claims_from_json(item)
+        self.pids = sorted(self._claims, key=_entity_id_to_int)
+
+    def count(self, pids=None):
+        """
+        Count statements.
+
+        Args:
+            pids (Optional[Iterable[str]]): only these properties
+
+        Returns (int):
+
+        """
+        return sum(len(self._claims[pid]) for pid in self._select_pids(pids))
+
+    # pylint: disable=R0913
+    def page(self, pids=None, offset=0, limit=None, qualifiers=False,
+             references=False):
+        """
+        Parse a page of statements.
+
+        Args:
+            pids (Optional[Iterable[str]]): only these properties
+            offset (int): statements skipped
+            limit (Optional[int]): most statements parsed, None for all
+            qualifiers (bool): parse the qualifiers of each statement
+            references (bool): parse the first reference block of each
+                statement
+
+        Returns (List[Dict]): pid and parsed values, like the claims of
+            item_detail_parse
+
+        """
+        selected = []
+        remaining = limit
+        for pid in self._select_pids(pids):
+            if remaining is not None and remaining <= 0:
+                break
+            statements = self._claims[pid]
+            if offset >= len(statements):
+                offset -= len(statements)
+                continue
+            end = None if remaining is None else offset + remaining
+            chunk = statements[offset:end]
+            offset = 0
+            selected.append((pid, chunk))
+            if remaining is not None:
+                remaining -= len(chunk)
+        properties = build_property_loader()
+        _prefetch_snak_details(
+            (snak for pid, statements in selected for statement in statements
+             for snak in iter_statement_snaks(pid, statement, qualifiers,
+                                              references)),
+            properties)
+        parser = SnakParser(properties, memo=get_request_memo('snak'))
+        output = []
+        for pid, statements in selected:
+            values = [val for val in (
+                _parse_statement(parser, pid, statement, qualifiers, references)
+                for statement in statements) if val]
             if values:
-                parsed_snaks.append({'pid': pid, 'values': values})
-    return parsed_snaks
+                output.append({'pid': pid, 'values': values})
+        parser.record_stats()
+        return output
+
+    def _select_pids(self, pids):
+        if pids is None:
+            return self.pids
+        pids = set(pids)
+        return [pid for pid in self.pids if pid in pids]
+
+
+def get_item_claims(qid, pids=None, offset=0, limit=None, include=()):
+    """
+    Get a page of an item's parsed claims.
+
+    Args:
+        qid (str):
+        pids (Optional[Iterable[str]]): only these properties, ex. ["P31"]
+        offset (int):
+        limit (Optional[int]):
+        include (Iterable[str]): parts parsed with each statement, qualifiers
+            and/or references
+
+    Returns (Union[Dict, bool]): qid, paging and claims, False if the item
+        does not exist
+
+    """
+    item = wd_int_utils.get_item_json(qid)
+    if not item:
+        return False
+    view = ClaimView(item)
+    ex_list, claim_list = split_external_links(view.page(
+        pids, offset=offset, limit=limit,
+        qualifiers=WDEntityField.QUALIFIERS in include,
+        references=WDEntityField.REFERENCES in include))
+    return {
+        WDEntityField.QID: qid,
+        'offset': offset,
+        'limit': limit,
+        'total': view.count(pids),
+        WDEntityField.CLAIMS: claim_list,
+        WDEntityField.EXTERNAL_LINKS: ex_list,
+    }
+
+
+def split_external_links(claims):
+    """
+    Separate the external id claims from the others, like item_detail_parse.
+
+    Args:
+        claims (List[Dict]): pid and parsed values, ex. from ClaimView.page
+
+    Returns (Tuple[List[Dict], List[Dict]]): claims with an external id
+        value, then the other claims
+
+    """
+    ex_list = []
+    claim_list = []
+    for claim in claims:
+        if any(val.get('parse_type') == 'external-id' for val in claim['values']):
+            ex_list.append(claim)
+        else:
+            claim_list.append(claim)
+    return ex_list, claim_list
 
 
 def get_item_property_counts(qid):
@@ -411,66 +732,237 @@ def get_claims_from_json(item_json):
     return item_json.get(WDEntityField.CLAIMS, {})
 
 
-# pylint: disable=R0912
-def parse_snak(pid, snak):
-    """Extract UI-friendly Information from Wikidata Snak."""
+def is_url(value):
+    """
+    Check whether a string value is a url.
+
+    Notes:
+        - validators.url is only called on strings starting with a scheme,
+        it is slow to reject the identifiers most string values are.
+
+    Args:
+        value (str):
+
+    Returns (bool):
+
+    """
+    return bool(URL_SCHEME_PREFIX.match(value) and validators.url(value))
+
+
+# Value parsers by datavalue type, each returns the value and its parse type
+def _parse_string_value(data_value, parse_type):
+    # Values of url properties are parsed as urls whether valid or not
+    if parse_type != 'url' and is_url(data_value):
+        parse_type = 'url'
+    return data_value, parse_type
+
+
+def _parse_entity_value(data_value, parse_type):
+    # pylint: disable=W0613
+    entity_type = data_value.get('entity-type')
+    if entity_type == 'property':
+        return 'P{}'.format(data_value.get('numeric-id')), entity_type
+    return data_value.get('id'), entity_type
+
+
+def _parse_time_value(data_value, parse_type):
+    # pylint: disable=W0613
+    return time_formatter(data_value.get('time')), 'time'
+
+
+def _parse_quantity_value(data_value, parse_type):
+    if 'amount' not in data_value:
+        return "Unable To Parse Value quantity", parse_type
+    num = data_value.get('amount')
+    try:
+        return int(num), parse_type
+    except ValueError:
+        return float(num), parse_type
+
+
+def _parse_monolingual_value(data_value, parse_type):
+    return '"{}" (language: {})'.format(
+        data_value.get('text', ''),
+        data_value.get('language', 'unknown')
+    ), parse_type
+
+
+SNAK_VALUE_PARSERS = {
+    'monolingualtext': _parse_monolingual_value,
+    'quantity': _parse_quantity_value,
+    'string': _parse_string_value,
+    'time': _parse_time_value,
+    'wikibase-entityid': _parse_entity_value,
+}
+
+
+def _parse_snak(pid, snak, properties=None):
     try:
         if snak['snaktype'] == 'novalue' or 'datavalue' not in snak:
             return None
-        #  Parsing the statements & values by data type
         parse_type = snak.get('datatype')
-        data_type = snak['datavalue'].get('type')
-        data_value = snak['datavalue'].get('value')
-
+        datavalue = snak['datavalue']
+        data_type = datavalue.get('type')
+        data_value = datavalue.get('value')
         #  In the event the value is an image file name,
         #  convert the title to the image's url
-        if pid in ["P18", "P154"]:
+        if pid in WIKIMEDIA_IMAGE_PIDS:
             val = get_wikimedia_image_url_from_title(data_value)
             parse_type = 'image'
         elif parse_type == 'external-id':
-            val = {'url': format_url_from_property(pid, data_value),
+            val = {'url': format_url_from_property(pid, data_value,
+                                                   properties),
                    'label': data_value}
-        elif data_type == 'string':
-            val = data_value
-            if validators.url(val):
-                parse_type = 'url'
-        elif data_type == 'wikibase-entityid':
-            parse_type = data_value.get('entity-type')
-            if parse_type == 'property':
-                val = 'P{}'.format(data_value.get('numeric-id'))
-            else:
-                val = data_value.get('id')
-        elif data_type == 'time':
-            val = time_formatter(data_value.get('time'))
-            parse_type = 'time'
-        elif data_type == 'quantity' and 'amount' in data_value:
-            num = data_value.get('amount')
-            try:
-                val = int(num)
-            except ValueError:
-                val = float(num)
-        elif data_type == 'monolingualtext':
-            val = '"{}" (language: {})'.format(
-                data_value.get('text', ''),
-                data_value.get('language', 'unknown')
-            )
         else:
-            val = "Unable To Parse Value {}".format(data_type)
+            value_parser = SNAK_VALUE_PARSERS.get(data_type)
+            if value_parser is None:
+                val = "Unable To Parse Value {}".format(data_type)
+            else:
+                val, parse_type = value_parser(data_value, parse_type)
         return {'value': val, 'parse_type': parse_type, 'type': data_type}
     except KeyError:
         logging.exception("Unexpected exception parsing claims.")
         return None
 
 
-def format_url_from_property(pid, value):
+class SnakParser:
+    """
+    Parser of every snak of an item, in a single pass.
+
+    Notes:
+        - Parsed snaks are memoized by property and snak hash, in the
+        request memo used by parse_snak when one is passed in. The memo is
+        looked up once per item instead of once per snak.
+        - Parsed values are shared, callers adding to a value copy it first.
+    """
+
+    __slots__ = ('properties', 'memo', 'hits', 'misses')
+
+    def __init__(self, properties=None, memo=None):
+        """
+        Constructor for a SnakParser instance.
+
+        Args:
+            properties (Optional[BatchLoader]): property details loader, see
+                build_property_loader
+            memo (Optional[Dict]): parsed snaks by (pid, hash), ex.
+                get_request_memo('snak')
+        """
+        self.properties = properties
+        self.memo = {} if memo is None else memo
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, pid, snak):
+        """
+        Parse a snak, see parse_snak.
+
+        Args:
+            pid (str):
+            snak (dict):
+
+        Returns (Optional[Dict]): not to be modified
+
+        """
+        snak_hash = snak.get('hash') if snak else None
+        if not snak_hash:
+            return _parse_snak(pid, snak, self.properties)
+        key = (pid, snak_hash)
+        value = self.memo.get(key, self)
+        if value is self:
+            self.misses += 1
+            value = self.memo[key] = _parse_snak(pid, snak, self.properties)
+        else:
+            self.hits += 1
+        return value
+
+    def parse_set(self, snak_set):
+        """
+        Parse a set of qualifier or reference snaks.
+
+        Args:
+            snak_set (Optional[Dict[str, List[dict]]]): snaks by property id
+
+        Returns (List[Dict]): pid and parsed values of properties with values
+
+        """
+        parsed_snaks = []
+        if snak_set:
+            parse = self.parse
+            for pid, snak_list in snak_set.items():
+                values = [val for val in (parse(pid, snak) for snak in snak_list)
+                          if val]
+                if values:
+                    parsed_snaks.append({'pid': pid, 'values': values})
+        return parsed_snaks
+
+    def record_stats(self):
+        """Add the memo counters to the request's "snak" stats."""
+        record_memo_stats('snak', hits=self.hits, misses=self.misses)
+        self.hits = self.misses = 0
+
+
+def parse_snaks(snaks, properties=None):
+    """
+    Parse many snaks sharing a single memo and property loader.
+
+    Args:
+        snaks (Iterable[Tuple[str, dict]]): property id and snak, ex.
+            iter_item_snaks(item)
+        properties (Optional[BatchLoader]):
+
+    Returns (List[Optional[Dict]]): in snak order, not to be modified
+
+    """
+    parser = SnakParser(properties, memo=get_request_memo('snak'))
+    output = [parser.parse(pid, snak) for pid, snak in snaks]
+    parser.record_stats()
+    return output
+
+
+def _snak_memo_key(pid, snak, properties=None):
+    # pylint: disable=W0613
+    snak_hash = snak.get('hash') if snak else None
+    return (pid, snak_hash) if snak_hash else None
+
+
+def _copy_parsed_snak(value):
+    # Callers attach qualifiers and references to the parsed snak
+    return dict(value) if value else value
+
+
+@request_memo('snak', key=_snak_memo_key, copy=_copy_parsed_snak)
+def parse_snak(pid, snak, properties=None):
+    """
+    Extract UI-friendly Information from Wikidata Snak.
+
+    Args:
+        pid (str):
+        snak (dict):
+        properties (Optional[BatchLoader]): property details loader shared
+            by all snaks of an item, see build_property_loader
+
+    Returns (Optional[Dict]):
+
+    """
+    return _parse_snak(pid, snak, properties)
+
+
+def format_url_from_property(pid, value, properties=None):
     """
     Input property identifier (P###) for a given url type.
 
     Looks up that wikidata property id's url format (P1630) and creates a url
-    with the value using the format.
+    with the value using the format. The formatter url index is used once it
+    has been built, until then a property loader passed in resolves the
+    details from its batched results instead of a query per value.
     """
     value = value.strip()
-    prop = get_property(pid)
+    formatter_urls = FORMATTER_URL_INDEX.value
+    if formatter_urls is not None:
+        urls = formatter_urls.get(pid)
+        return urls[0].replace("$1", value) if urls else None
+    prop = properties.load(pid) if properties else get_property(pid)
     if prop and 'formatter_url' in prop:
         return prop.get("formatter_url").replace("$1", value)
     return None
@@ -485,3 +977,8 @@ def _create_query_template(_string):
 PROPERTY_QUERY_TEMPLATE = _create_query_template(PROPERTY_QUERY)
 PROPERTY_ALLOWED_QUALIFIERS_TEMPLATE = _create_query_template(
     PROPERTY_ALLOWED_QUALIFIERS)
+
+# External identifier property id to formatter urls, see format_url_from_property
+FORMATTER_URL_INDEX = PeriodicRefresh(
+    'formatter urls', get_external_id_formatter_urls,
+    interval=APP.config[ConfKey.FORMATTER_URL_REFRESH_INTERVAL])
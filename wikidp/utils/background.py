@@ -0,0 +1,148 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Values built once and refreshed periodically on a background thread."""
+import logging
+import threading
+import time
+
+# Every PeriodicRefresh instance, started together by start_all
+REFRESHERS = []
+# Seconds before retrying a failed build, doubled per consecutive failure
+# up to the refresh interval
+RETRY_DELAY = 10
+
+
+class PeriodicRefresh:
+    """
+    Hold a value built by a loader and rebuild it on a schedule.
+
+    Notes:
+        - Until the first build completes value is None, so callers must
+        keep a slower fallback path or build it once with get.
+        - A failed rebuild is logged and the previous value kept, the
+        background thread retries it after retry_delay seconds, backing off
+        to interval.
+    """
+
+    def __init__(self, name, loader, interval, retry_delay=RETRY_DELAY):
+        """
+        Constructor for a PeriodicRefresh instance.
+
+        Args:
+            name (str): used in log messages and thread names
+            loader (Callable[[], Any]): builds the value
+            interval (int): seconds between rebuilds
+            retry_delay (float): seconds before the first retry of a failed
+                build
+        """
+        self.name = name
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self._loader = loader
+        self._value = None
+        self._built_at = None
+        # Builds completed, so callers waiting on one can tell it happened
+        self._attempts = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        REFRESHERS.append(self)
+
+    @property
+    def value(self):
+        """The most recently built value, None if not built yet."""
+        return self._value
+
+    @property
+    def built_at(self):
+        """Epoch time of the last successful build, None if not built yet."""
+        return self._built_at
+
+    @property
+    def age(self):
+        """Seconds since the last successful build, None if not built yet."""
+        if self._built_at is None:
+            return None
+        return time.time() - self._built_at
+
+    def refresh(self):
+        """
+        Build the value now on the calling thread.
+
+        Returns (bool): True if the value was rebuilt
+
+        """
+        with self._lock:
+            return self._build()
+
+    def get(self):
+        """
+        Get the value, building it on the calling thread if not built yet.
+
+        Notes:
+            - Callers arriving during a build wait for it and share its
+            value, or its failure, instead of building again in turn.
+
+        Returns (Any): None if no build has succeeded
+
+        """
+        if self._value is not None:
+            return self._value
+        attempts = self._attempts
+        with self._lock:
+            if self._value is None and self._attempts == attempts:
+                self._build()
+        return self._value
+
+    def _build(self):
+        try:
+            value = self._loader()
+        except Exception:  # pylint: disable=W0703
+            logging.exception("Unable to refresh %s", self.name)
+            return False
+        finally:
+            self._attempts += 1
+        self._value = value
+        self._built_at = time.time()
+        logging.debug("Refreshed %s", self.name)
+        return True
+
+    def start(self):
+        """Build the value and keep rebuilding it on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name=f"refresh-{self.name}",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread after its current build."""
+        self._stop.set()
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            if self.refresh():
+                failures = 0
+                delay = self.interval
+            else:
+                delay = min(self.retry_delay * 2 ** failures, self.interval)
+                failures += 1
+            self._stop.wait(delay)
+
+
+def start_all():
+    """Start the background thread of every registered refresher."""
+    for refresher in REFRESHERS:
+        refresher.start()
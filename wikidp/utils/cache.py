@@ -0,0 +1,458 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Caches for upstream data: size-bounded query results and entity JSON."""
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from wikidp.utils.errors import WikibaseReadError
+
+# Share of max_disk_bytes left after pruning, so pruning is not rerun on
+# every write once the budget is reached
+DISK_PRUNE_TARGET = 0.8
+
+
+def make_cache_key(*parts):
+    """
+    Build a stable cache key from whitespace normalized string parts.
+
+    Args:
+        *parts (str): ex. a SPARQL query and the endpoint it is sent to
+
+    Returns (str): hex digest safe to use as a file name
+
+    """
+    normalized = "\n".join(" ".join(str(part).split()) for part in parts)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache of JSON serializable values with per entry expiry.
+
+    Notes:
+        - Values are stored serialized so callers always receive their own
+        copy and the memory budget is measured in real bytes.
+        - When a directory is given every entry is also written to disk, so
+        the cache survives restarts and is shared by workers on one host.
+        Beyond max_disk_bytes expired files, then the least recently written
+        ones, are removed until the directory is back under
+        DISK_PRUNE_TARGET of the budget.
+        - With a SingleFlight concurrent misses on the same key share one
+        loader call, see get_or_set.
+    """
+
+    # pylint: disable=R0913
+    def __init__(self, max_bytes, default_ttl, directory=None,
+                 single_flight=None, max_disk_bytes=None):
+        """Constructor for a ResultCache instance."""
+        self._entries = OrderedDict()
+        # Bytes in directory, None until first scanned by prune_disk
+        self._disk_size = None
+        self.max_disk_bytes = max_disk_bytes
+        self.single_flight = single_flight
+        self._lock = threading.RLock()
+        self._size = 0
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        """Total bytes held by the in-memory tier."""
+        return self._size
+
+    def __len__(self):
+        """Return the number of entries in the in-memory tier."""
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Get a value by key from memory, falling back to the disk tier.
+
+        Args:
+            key (str):
+            default (Optional[Any]): returned when key is missing or expired
+
+        Returns (Any):
+
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry[1])
+            if entry:
+                self._evict(key)
+        payload = self._read_disk(key, now)
+        if payload is None:
+            self.misses += 1
+            return default
+        expires, data = payload
+        with self._lock:
+            self._store(key, expires, data)
+            self.hits += 1
+        return json.loads(data)
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value by key.
+
+        Args:
+            key (str):
+            value (Any): JSON serializable value
+            ttl (Optional[int]): seconds to keep the value, default_ttl if None
+
+        Returns:
+
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        expires = time.time() + ttl
+        data = json.dumps(value, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._store(key, expires, data)
+        self._write_disk(key, expires, data)
+
+    def get_or_set(self, key, loader, ttl=None):
+        """
+        Get a value by key, calling loader and storing its result on a miss.
+
+        Args:
+            key (str):
+            loader (Callable[[], Any]):
+            ttl (Optional[int]):
+
+        Returns (Any):
+
+        """
+        missing = object()
+        value = self.get(key, default=missing)
+        if value is not missing:
+            return value
+        if self.single_flight is None:
+            value = loader()
+            self.set(key, value, ttl=ttl)
+            return value
+
+        def load():
+            result = loader()
+            self.set(key, result, ttl=ttl)
+            return result
+
+        def recheck():
+            result = self.get(key, default=missing)
+            return result is not missing, result
+        shared = self.single_flight.do(key, load, recheck=recheck)
+        # Hand every caller its own copy rather than the shared result
+        value = self.get(key, default=missing)
+        return shared if value is missing else value
+
+    def delete(self, key):
+        """Remove an entry from both tiers."""
+        with self._lock:
+            self._evict(key)
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                logging.warning("Unable to remove cache file %s", path)
+
+    def clear(self):
+        """Empty the in-memory tier, the disk tier is left to expire."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def prune_disk(self):
+        """
+        Remove expired files, then the oldest ones, beyond max_disk_bytes.
+
+        Notes:
+            - Other processes sharing the directory write to it as well,
+            the size tracked between scans is an estimate.
+
+        Returns (int): number of files removed
+
+        """
+        if not self.directory or not os.path.isdir(self.directory):
+            self._disk_size = 0
+            return 0
+        now = time.time()
+        files = []
+        removed = 0
+        for directory, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                    with open(path, 'rb') as cache_file:
+                        expires = float(cache_file.readline())
+                except (OSError, ValueError):
+                    continue
+                if expires <= now and self._remove_file(path):
+                    removed += 1
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+        size = sum(file_size for _, file_size, _ in files)
+        if self.max_disk_bytes is not None and size > self.max_disk_bytes:
+            target = self.max_disk_bytes * DISK_PRUNE_TARGET
+            for _, file_size, path in sorted(files):
+                if size <= target:
+                    break
+                if self._remove_file(path):
+                    size -= file_size
+                    removed += 1
+        self._disk_size = size
+        return removed
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            logging.warning("Unable to remove cache file %s", path)
+            return False
+
+    def _store(self, key, expires, data):
+        if len(data) > self.max_bytes:
+            return
+        self._evict(key)
+        self._entries[key] = (expires, data)
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._evict(oldest)
+
+    def _evict(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= len(entry[1])
+
+    def _path(self, key):
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _read_disk(self, key, now):
+        path = self._path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as cache_file:
+                header = cache_file.readline()
+                data = cache_file.read()
+            expires = float(header)
+        except (OSError, ValueError):
+            logging.warning("Unreadable cache file %s", path)
+            return None
+        if expires <= now:
+            return None
+        return expires, data
+
+    def _write_disk(self, key, expires, data):
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(handle, 'wb') as cache_file:
+                cache_file.write(f"{expires}\n".encode('ascii'))
+                cache_file.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            logging.warning("Unable to write cache file %s", path)
+            return
+        if self.max_disk_bytes is None:
+            return
+        if self._disk_size is not None:
+            self._disk_size += len(data)
+        if self._disk_size is None or self._disk_size > self.max_disk_bytes:
+            self.prune_disk()
+
+
+class EntityCache:
+    """
+    Cache of raw entity JSON revalidated by revision id.
+
+    Notes:
+        - Entities checked within fresh_for seconds are served directly.
+        - Older entries are revalidated together with one cheap info request
+        for their lastrevid, only entities whose revision moved are fetched
+        again in full.
+        - Entity dictionaries are shared between callers, treat them as
+        read only.
+        - With an EntityStore, entities evicted from memory or cached by an
+        earlier process are read back from disk and revalidated the same
+        way, and everything fetched is written through to it.
+        - When Wikidata cannot be read stale entries are served as they
+        are. Entries are only dropped, from memory and the store, once
+        wbgetentities reports their entity missing.
+    """
+
+    def __init__(self, client, fresh_for, max_entries, store=None):
+        """
+        Constructor for an EntityCache instance.
+
+        Args:
+            client (WikibaseReadClient): used to fetch and revalidate
+            fresh_for (int): seconds an entry is served without revalidation
+            max_entries (int): least recently used entities are dropped beyond
+            store (Optional[EntityStore]): persistent tier behind memory
+        """
+        self._client = client
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.fresh_for = fresh_for
+        self.max_entries = max_entries
+        self.store = store
+
+    def __len__(self):
+        """Return the number of cached entities."""
+        return len(self._entries)
+
+    def get(self, entity_id):
+        """
+        Get the JSON of a single entity.
+
+        Args:
+            entity_id (str): ex. "Q1234"
+
+        Returns (Optional[Dict]): None if the entity does not exist
+
+        """
+        return self.get_many([entity_id]).get(entity_id)
+
+    def get_many(self, entity_ids):
+        """
+        Get the JSON of several entities, fetching only what is not current.
+
+        Args:
+            entity_ids (Iterable[str]):
+
+        Returns (Dict[str, Dict]): keys are the ids found
+
+        Raises:
+            WikibaseReadError: if Wikidata could not be read and some of the
+                ids have no cached entity to fall back on
+
+        """
+        now = time.time()
+        output = {}
+        stale = {}
+        missing = []
+        with self._lock:
+            for entity_id in dict.fromkeys(entity_ids):
+                entry = self._entries.get(entity_id)
+                if entry is None:
+                    missing.append(entity_id)
+                elif now - entry[2] < self.fresh_for:
+                    self._entries.move_to_end(entity_id)
+                    output[entity_id] = entry[0]
+                else:
+                    stale[entity_id] = entry
+        if missing and self.store is not None:
+            stored = self.store.get_many(missing)
+            missing = [entity_id for entity_id in missing
+                       if entity_id not in stored]
+            for entity_id, entry in stored.items():
+                if now - entry[2] < self.fresh_for:
+                    self._store(entity_id, *entry)
+                    output[entity_id] = entry[0]
+                else:
+                    stale[entity_id] = entry
+        # Stale entities to serve if they cannot be fetched again
+        fallback = {}
+        # Entities wbgetentities reported missing, deleted or never created
+        deleted = []
+        if stale:
+            try:
+                revisions, gone = self._client.read_entities(stale, props='info')
+            except WikibaseReadError:
+                logging.warning("Unable to revalidate %s, serving cached "
+                                "entities", list(stale), exc_info=True)
+                revisions, gone = None, set()
+            current = []
+            for entity_id, entry in stale.items():
+                if revisions is None:
+                    output[entity_id] = entry[0]
+                    continue
+                revision = revisions.get(entity_id, {}).get('lastrevid')
+                if revision is not None and revision == entry[1]:
+                    self._store(entity_id, entry[0], revision, now)
+                    output[entity_id] = entry[0]
+                    current.append(entity_id)
+                elif entity_id in gone:
+                    deleted.append(entity_id)
+                else:
+                    missing.append(entity_id)
+                    fallback[entity_id] = entry[0]
+            if current and self.store is not None:
+                self.store.touch(current, now)
+        if missing:
+            try:
+                fetched, gone = self._client.read_entities(missing)
+            except WikibaseReadError:
+                if len(fallback) < len(missing):
+                    raise
+                logging.warning("Unable to fetch %s, serving cached entities",
+                                missing, exc_info=True)
+                fetched, gone = {}, set()
+            found = {}
+            for entity_id in missing:
+                entity = fetched.get(entity_id)
+                if entity is not None:
+                    self._store(entity_id, entity, entity.get('lastrevid'), now)
+                    output[entity_id] = found[entity_id] = entity
+                elif entity_id in gone:
+                    deleted.append(entity_id)
+                elif entity_id in fallback:
+                    output[entity_id] = fallback[entity_id]
+            if self.store is not None:
+                self.store.put_many(found, now)
+        if deleted:
+            self._evict(deleted)
+        return output
+
+    def clear(self):
+        """Empty the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, entity_ids):
+        with self._lock:
+            for entity_id in entity_ids:
+                self._entries.pop(entity_id, None)
+        if self.store is not None:
+            self.store.delete(entity_ids)
+
+    def _store(self, entity_id, entity, revision, checked_at):
+        with self._lock:
+            self._entries[entity_id] = (entity, revision, checked_at)
+            self._entries.move_to_end(entity_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
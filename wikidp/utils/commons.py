@@ -0,0 +1,114 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Batched and cached resolution of Wikimedia Commons file urls."""
+import logging
+
+import requests
+
+from wikidp.config import APP
+from wikidp.const import (
+    ConfKey,
+    WIKIMEDIA_COMMONS_API_URL,
+    WIKIMEDIA_COMMONS_BASE_URL,
+)
+from wikidp.utils import http
+from wikidp.utils.cache import ResultCache
+
+# Most titles the MediaWiki API accepts in a single query
+COMMONS_TITLE_BATCH_SIZE = 50
+IMAGE_URL_CACHE = ResultCache(
+    max_bytes=APP.config[ConfKey.COMMONS_IMAGE_CACHE_MAX_BYTES],
+    default_ttl=APP.config[ConfKey.COMMONS_IMAGE_CACHE_TTL],
+)
+MISSING_IMAGE_CACHE_TTL = APP.config[ConfKey.COMMONS_MISSING_IMAGE_CACHE_TTL]
+
+
+def _normalize_title(title):
+    return title.replace("_", " ").strip()
+
+
+def format_file_page_url(title):
+    """
+    Format the Commons description page url of a file.
+
+    Args:
+        title (str): ex. "Debian-OpenLogo.svg"
+
+    Returns (str):
+
+    """
+    return f"{WIKIMEDIA_COMMONS_BASE_URL}/wiki/File:{title.replace(' ', '_')}"
+
+
+def resolve_image_urls(titles):
+    """
+    Resolve Commons file titles to the urls of the files they describe.
+
+    Notes:
+        - Cached titles are answered locally, the rest are resolved
+        COMMONS_TITLE_BATCH_SIZE at a time in one imageinfo query each.
+        - Missing files are cached too, for a shorter time, and fall back to
+        the file description page url like unresolvable titles do.
+
+    Args:
+        titles (Iterable[str]): ex. ["Скриншот sublime text 2.png"]
+
+    Returns (Dict[str, str]): keys are the titles as passed in
+
+    """
+    titles = list(dict.fromkeys(titles))
+    urls = {}
+    pending = []
+    for title in titles:
+        url = IMAGE_URL_CACHE.get(_normalize_title(title))
+        if url is None:
+            pending.append(title)
+        else:
+            urls[title] = url or format_file_page_url(title)
+    for start in range(0, len(pending), COMMONS_TITLE_BATCH_SIZE):
+        chunk = pending[start:start + COMMONS_TITLE_BATCH_SIZE]
+        urls.update(_query_image_urls(chunk))
+    return urls
+
+
+def _query_image_urls(titles):
+    by_file_title = {f"File:{_normalize_title(title)}": title
+                     for title in titles}
+    params = {
+        'action': 'query',
+        'prop': 'imageinfo',
+        'iiprop': 'url',
+        'titles': "|".join(by_file_title),
+        'format': 'json',
+    }
+    urls = {title: format_file_page_url(title) for title in titles}
+    try:
+        query = http.get_json(WIKIMEDIA_COMMONS_API_URL, params=params)['query']
+    except (requests.RequestException, ValueError, KeyError):
+        logging.warning("Unable to process Wikimedia images %s", titles)
+        return urls
+    # The API answers with canonical titles, map them back to the requested
+    for normalized in query.get('normalized', []):
+        if normalized.get('from') in by_file_title:
+            by_file_title[normalized['to']] = by_file_title[normalized['from']]
+    for page in query.get('pages', {}).values():
+        title = by_file_title.get(page.get('title'))
+        if title is None:
+            continue
+        image_info = page.get('imageinfo')
+        if image_info:
+            urls[title] = image_info[0]['url']
+            IMAGE_URL_CACHE.set(_normalize_title(title), urls[title])
+        else:
+            IMAGE_URL_CACHE.set(_normalize_title(title), '',
+                                ttl=MISSING_IMAGE_CACHE_TTL)
+    return urls
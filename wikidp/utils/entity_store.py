@@ -0,0 +1,211 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Persistent local store of raw entity JSON backed by SQLite."""
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+# Property whose values an entity is indexed under, "instance of"
+CLASS_PID = 'P31'
+# Most ids bound in a single IN (...) clause, below SQLite's variable limit
+QUERY_BATCH_SIZE = 500
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entities ("
+    " id TEXT PRIMARY KEY, revision INTEGER, checked_at REAL, data BLOB"
+    ") WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS entity_classes ("
+    " class TEXT, id TEXT, PRIMARY KEY (class, id)"
+    ") WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS entity_classes_id ON entity_classes (id)",
+)
+
+
+def get_entity_classes(entity):
+    """
+    Get the classes an entity is an instance of.
+
+    Args:
+        entity (Dict): raw entity JSON
+
+    Returns (List[str]): ex. ["Q235557"]
+
+    """
+    output = []
+    for claim in entity.get('claims', {}).get(CLASS_PID, []):
+        value = claim.get('mainsnak', {}).get('datavalue', {}).get('value')
+        if isinstance(value, dict) and value.get('id'):
+            output.append(value['id'])
+    return output
+
+
+class EntityStore:
+    """
+    Entity JSON, revision and last check time keyed by entity id.
+
+    Notes:
+        - Lookups are primary key reads and only SQLite's page cache is held
+        in memory, so the store grows to millions of entities on disk.
+        - Entities are indexed by their P31 classes, see ids_by_class.
+        - Each thread uses its own connection, the database runs in WAL mode
+        so readers do not wait for writers, across processes as well.
+    """
+
+    def __init__(self, path):
+        """
+        Constructor for an EntityStore instance.
+
+        Args:
+            path (str): database file, created with its directory if missing
+        """
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    def __len__(self):
+        """Return the number of stored entities."""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    def get(self, entity_id):
+        """
+        Get a stored entity.
+
+        Args:
+            entity_id (str): ex. "Q1234"
+
+        Returns (Optional[Tuple[Dict, int, float]]): entity, revision and
+            the time it was last known current
+
+        """
+        return self.get_many([entity_id]).get(entity_id)
+
+    def get_many(self, entity_ids):
+        """
+        Get several stored entities.
+
+        Args:
+            entity_ids (Iterable[str]):
+
+        Returns (Dict[str, Tuple[Dict, int, float]]): keys are the ids found
+
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        output = {}
+        connection = self._connection()
+        for start in range(0, len(entity_ids), QUERY_BATCH_SIZE):
+            chunk = entity_ids[start:start + QUERY_BATCH_SIZE]
+            rows = connection.execute(
+                "SELECT id, data, revision, checked_at FROM entities "
+                f"WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            for entity_id, data, revision, checked_at in rows:
+                output[entity_id] = (_decode(data), revision, checked_at)
+        return output
+
+    def put_many(self, entities, checked_at):
+        """
+        Store entities and replace their class index entries.
+
+        Args:
+            entities (Dict[str, Dict]): entity JSON keyed by the requested id
+            checked_at (float): time the entities were fetched
+
+        """
+        with self._connection() as connection:
+            for entity_id, entity in entities.items():
+                connection.execute(
+                    "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?)",
+                    (entity_id, entity.get('lastrevid'), checked_at,
+                     _encode(entity)))
+                connection.execute(
+                    "DELETE FROM entity_classes WHERE id = ?", (entity_id,))
+                connection.executemany(
+                    "INSERT OR IGNORE INTO entity_classes VALUES (?, ?)",
+                    [(class_id, entity_id)
+                     for class_id in get_entity_classes(entity)])
+
+    def touch(self, entity_ids, checked_at):
+        """
+        Record that stored entities were found to be current.
+
+        Args:
+            entity_ids (Iterable[str]):
+            checked_at (float):
+
+        """
+        with self._connection() as connection:
+            connection.executemany(
+                "UPDATE entities SET checked_at = ? WHERE id = ?",
+                [(checked_at, entity_id) for entity_id in entity_ids])
+
+    def delete(self, entity_ids):
+        """
+        Remove entities, ex. deleted upstream.
+
+        Args:
+            entity_ids (Iterable[str]):
+
+        """
+        entity_ids = [(entity_id,) for entity_id in entity_ids]
+        with self._connection() as connection:
+            connection.executemany("DELETE FROM entities WHERE id = ?",
+                                   entity_ids)
+            connection.executemany("DELETE FROM entity_classes WHERE id = ?",
+                                   entity_ids)
+
+    def ids_by_class(self, class_id, limit=None, offset=0):
+        """
+        Get the stored entities that are an instance of a class.
+
+        Args:
+            class_id (str): ex. "Q235557" for file format
+            limit (Optional[int]):
+            offset (int):
+
+        Returns (List[str]): entity ids in id order
+
+        """
+        rows = self._connection().execute(
+            "SELECT id FROM entity_classes WHERE class = ? ORDER BY id "
+            "LIMIT ? OFFSET ?",
+            (class_id, -1 if limit is None else limit, offset))
+        return [row[0] for row in rows]
+
+    def count_by_class(self, class_id):
+        """Return the number of stored entities that are an instance of a class."""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM entity_classes WHERE class = ?",
+            (class_id,)).fetchone()[0]
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+def _encode(entity):
+    return zlib.compress(json.dumps(entity, separators=(',', ':')).encode('utf-8'))
+
+
+def _decode(data):
+    return json.loads(zlib.decompress(data))
@@ -0,0 +1,16 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Errors raised by the upstream clients, free of imports for the caches."""
+
+
+class WikibaseReadError(Exception):
+    """An API request failed, the entities requested may still exist."""
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Shared, connection pooling HTTP session for outbound requests."""
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from wikidp.config import APP
+from wikidp.const import ConfKey
+from wikidp.utils import replay
+from wikidp.utils.cache import make_cache_key
+from wikidp.utils.singleflight import SingleFlight
+
+HTTP_POOL_SIZE = APP.config[ConfKey.HTTP_POOL_SIZE]
+HTTP_RETRIES = APP.config[ConfKey.HTTP_RETRIES]
+HTTP_RETRY_AFTER_MAX = APP.config[ConfKey.HTTP_RETRY_AFTER_MAX]
+# Statuses the Wikimedia APIs and the query service answer when overloaded
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# SPARQL queries are POSTed but only read, so they are safe to send again
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'POST'})
+HTTP_TIMEOUT = APP.config[ConfKey.HTTP_TIMEOUT]
+USER_AGENT = APP.config[ConfKey.USER_AGENT]
+
+
+class CappedRetry(Retry):
+    """Retry honouring Retry-After, but never waiting longer than a cap."""
+
+    def __init__(self, *args, retry_after_max=HTTP_RETRY_AFTER_MAX, **kwargs):
+        """
+        Constructor for a CappedRetry instance.
+
+        Args:
+            retry_after_max (float): most seconds slept for a Retry-After
+        """
+        super().__init__(*args, **kwargs)
+        self.retry_after_max = retry_after_max
+
+    def new(self, **kwargs):
+        """Copy the retry state, keeping the cap."""
+        retry = super().new(**kwargs)
+        retry.retry_after_max = self.retry_after_max
+        return retry
+
+    def get_retry_after(self, response):
+        """Get the Retry-After of a response in seconds, capped."""
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.retry_after_max)
+
+
+def build_retry(retries=HTTP_RETRIES):
+    """
+    Create the retry policy of the shared session.
+
+    Notes:
+        - Connection errors, timeouts and overload statuses are retried with
+        exponential backoff, or after the Retry-After the server sent, up
+        to HTTP_RETRY_AFTER_MAX seconds.
+        - Once retries run out the last response is returned, so
+        raise_for_status reports its status.
+
+    Args:
+        retries (int): most retries per request
+
+    Returns (Retry):
+
+    """
+    return CappedRetry(total=retries, backoff_factor=0.5,
+                       status_forcelist=RETRY_STATUSES,
+                       allowed_methods=RETRY_METHODS,
+                       respect_retry_after_header=True,
+                       raise_on_status=False)
+
+
+def build_session(pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES):
+    """
+    Create a keep-alive session identifying the portal to the Wikimedia APIs.
+
+    Args:
+        pool_size (int): connections kept open per host
+        retries (int): see build_retry
+
+    Returns (requests.Session):
+
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=build_retry(retries))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': USER_AGENT,
+    })
+    return session
+
+
+SESSION = build_session()
+IN_FLIGHT = SingleFlight()
+# Epoch time by which the requests of a thread must be answered, see deadline
+_DEADLINE = threading.local()
+if APP.config[ConfKey.HTTP_REPLAY_MODE]:
+    logging.info("HTTP %s mode, fixtures in %s",
+                 APP.config[ConfKey.HTTP_REPLAY_MODE],
+                 APP.config[ConfKey.HTTP_FIXTURE_DIR])
+    replay.install(SESSION, APP.config[ConfKey.HTTP_REPLAY_MODE],
+                   APP.config[ConfKey.HTTP_FIXTURE_DIR],
+                   latency=APP.config[ConfKey.HTTP_REPLAY_LATENCY])
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Cap the timeouts of the requests made by this thread in the block.
+
+    Notes:
+        - Only calls that pass request_timeout() as their timeout are
+        bounded, requests made on other threads are not.
+
+    Args:
+        seconds (float): from now
+
+    """
+    previous = getattr(_DEADLINE, 'value', None)
+    _DEADLINE.value = time.time() + seconds
+    try:
+        yield
+    finally:
+        _DEADLINE.value = previous
+
+
+def request_timeout(timeout=HTTP_TIMEOUT):
+    """
+    Get a request timeout, capped by the deadline of the calling thread.
+
+    Args:
+        timeout (Union[float, Tuple[float, float]]): connect and read timeout
+
+    Returns (Union[float, Tuple[float, float]]):
+
+    Raises:
+        requests.Timeout: if the deadline has already passed
+
+    """
+    expires = getattr(_DEADLINE, 'value', None)
+    if expires is None:
+        return timeout
+    remaining = expires - time.time()
+    if remaining <= 0:
+        raise requests.Timeout("Deadline passed before the request was sent")
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) for part in timeout)
+    return min(timeout, remaining)
+
+
+def request_key(url, params=None):
+    """
+    Build a key identifying a GET request, independent of parameter order.
+
+    Args:
+        url (str):
+        params (Optional[Dict]):
+
+    Returns (str):
+
+    """
+    return make_cache_key(url, *sorted(
+        f"{name}={value}" for name, value in (params or {}).items()))
+
+
+def get_json(url, params=None, timeout=HTTP_TIMEOUT):
+    """
+    Perform a GET request with the shared session and decode the JSON body.
+
+    Notes:
+        - Identical concurrent requests share one call and its decoded body.
+
+    Args:
+        url (str):
+        params (Optional[Dict]): query string parameters
+        timeout (Union[float, Tuple[float, float]]): connect and read timeout
+
+    Returns (Any):
+
+    Raises:
+        requests.RequestException: on connection errors and error statuses
+
+    """
+    def fetch():
+        response = SESSION.get(url, params=params,
+                               timeout=request_timeout(timeout))
+        response.raise_for_status()
+        return response.json()
+    return IN_FLIGHT.do(request_key(url, params), fetch)
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Batch loaders that collect keys and resolve them in as few calls as possible."""
+
+
+class BatchLoader:
+    """
+    Collect keys up front and resolve them together in chunked batches.
+
+    Notes:
+        - Keys are primed while walking a structure, the first load then
+        resolves everything pending in calls of at most max_batch_size keys.
+        - Keys the batch function does not return are remembered as None so
+        they are never requested twice.
+
+    Examples:
+        >>> loader = BatchLoader(lambda keys: {key: key.lower() for key in keys})
+        >>> loader.prime(['P31', 'P279'])
+        >>> loader.load('P31')
+        'p31'
+    """
+
+    def __init__(self, batch_fn, max_batch_size=100):
+        """
+        Constructor for a BatchLoader instance.
+
+        Args:
+            batch_fn (Callable[[List[str]], Dict[str, Any]]):
+            max_batch_size (int): most keys passed to a single batch_fn call
+        """
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._pending = {}
+        self._results = {}
+        self.batch_count = 0
+
+    def prime(self, keys):
+        """Queue keys to be resolved by the next dispatch."""
+        for key in keys:
+            if key not in self._results:
+                self._pending[key] = None
+
+    def dispatch(self):
+        """Resolve all queued keys."""
+        pending = list(self._pending)
+        self._pending.clear()
+        for start in range(0, len(pending), self._max_batch_size):
+            chunk = pending[start:start + self._max_batch_size]
+            self.batch_count += 1
+            values = self._batch_fn(chunk) or {}
+            for key in chunk:
+                self._results[key] = values.get(key)
+
+    def load(self, key):
+        """Get the value of one key, dispatching anything queued if needed."""
+        if key not in self._results:
+            self.prime([key])
+            self.dispatch()
+        return self._results.get(key)
+
+    def load_many(self, keys):
+        """Get a dictionary of values for several keys."""
+        keys = list(keys)
+        self.prime(keys)
+        if self._pending:
+            self.dispatch()
+        return {key: self._results.get(key) for key in keys}
@@ -0,0 +1,94 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Request scoped memoization bound to Flask's g."""
+from collections import defaultdict
+import functools
+
+from flask import (
+    g,
+    has_request_context,
+)
+
+
+def get_request_memo(namespace):
+    """
+    Get the memo dictionary of a namespace for the current request.
+
+    Args:
+        namespace (str): ex. "item_json"
+
+    Returns (Optional[Dict]): None outside of a request
+
+    """
+    if not has_request_context():
+        return None
+    if 'wikidp_memo' not in g:
+        g.wikidp_memo = defaultdict(dict)
+        g.wikidp_memo_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+    return g.wikidp_memo[namespace]
+
+
+def record_memo_stats(namespace, hits=0, misses=0):
+    """Add to the hit and miss counters of a namespace for this request."""
+    if has_request_context() and 'wikidp_memo_stats' in g:
+        stats = g.wikidp_memo_stats[namespace]
+        stats['hits'] += hits
+        stats['misses'] += misses
+
+
+def get_memo_stats():
+    """
+    Get the memo counters of the current request.
+
+    Returns (Dict[str, Dict[str, int]]): hits and misses by namespace
+
+    """
+    if not has_request_context() or 'wikidp_memo_stats' not in g:
+        return {}
+    return {namespace: dict(stats)
+            for namespace, stats in g.wikidp_memo_stats.items()}
+
+
+def request_memo(namespace, key=None, copy=None):
+    """
+    Memoize a function's results for the duration of a request.
+
+    Notes:
+        - Outside of a request the function is always called.
+
+    Args:
+        namespace (str): memo and counter name
+        key (Optional[Callable]): builds the memo key from the call
+            arguments, a None key skips the memo, defaults to the arguments
+        copy (Optional[Callable]): applied to memoized values before they are
+            returned, for callers that modify the result
+
+    Returns (Callable): decorator
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            memo = get_request_memo(namespace)
+            memo_key = key(*args, **kwargs) if key \
+                else (args, tuple(sorted(kwargs.items())))
+            if memo is None or memo_key is None:
+                return func(*args, **kwargs)
+            if memo_key in memo:
+                record_memo_stats(namespace, hits=1)
+                value = memo[memo_key]
+            else:
+                record_memo_stats(namespace, misses=1)
+                value = memo[memo_key] = func(*args, **kwargs)
+            return copy(value) if copy else value
+        return wrapper
+    return decorator
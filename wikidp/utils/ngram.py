@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""N-gram index for substring and prefix search over short strings."""
+
+# Match ranks, lower is better
+EXACT, PREFIX, SUBSTRING = range(3)
+
+
+class NgramIndex:
+    """
+    Inverted index from character n-grams to the keys containing them.
+
+    Notes:
+        - Every gram of 1 to n characters is indexed, so queries no longer
+        than n are a single dictionary lookup. Longer queries intersect the
+        postings of their n-grams, smallest first, and check the few
+        remaining candidates with a plain substring test.
+        - Meant for short keys such as file extensions, a key of length k
+        adds about n * k postings.
+    """
+
+    __slots__ = ('n', '_keys', '_postings')
+
+    def __init__(self, n=3, keys=()):
+        """
+        Constructor for a NgramIndex instance.
+
+        Args:
+            n (int): longest gram indexed
+            keys (Iterable[str]): initial keys
+        """
+        self.n = n
+        self._keys = set()
+        self._postings = {}
+        for key in keys:
+            self.add(key)
+
+    def __len__(self):
+        """Return the number of keys."""
+        return len(self._keys)
+
+    def __contains__(self, key):
+        """Return True if the key is indexed."""
+        return key in self._keys
+
+    def add(self, key):
+        """
+        Index a key, case sensitive.
+
+        Args:
+            key (str):
+
+        """
+        if key in self._keys:
+            return
+        self._keys.add(key)
+        for gram in self._grams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def search(self, query, prefix=False, limit=None):
+        """
+        Find the keys containing a string, best matches first.
+
+        Notes:
+            - Exact matches rank first, then prefixes, then other substrings.
+            Ties go to the shorter key, then alphabetically.
+
+        Args:
+            query (str):
+            prefix (bool): only return keys starting with the query
+            limit (Optional[int]): most keys returned
+
+        Returns (List[str]):
+
+        """
+        candidates = self._candidates(query)
+        matches = []
+        for key in candidates:
+            position = key.find(query)
+            if position < 0 or (prefix and position):
+                continue
+            if key == query:
+                rank = EXACT
+            else:
+                rank = SUBSTRING if position else PREFIX
+            matches.append((rank, len(key), key))
+        matches.sort()
+        return [key for _, _, key in matches[:limit]]
+
+    def _candidates(self, query):
+        if not query:
+            return self._keys
+        if len(query) <= self.n:
+            return self._postings.get(query, ())
+        postings = []
+        for start in range(len(query) - self.n + 1):
+            posting = self._postings.get(query[start:start + self.n])
+            if not posting:
+                return ()
+            postings.append(posting)
+        postings.sort(key=len)
+        return set.intersection(*postings)
+
+    def _grams(self, key):
+        return {key[start:start + size]
+                for size in range(1, self.n + 1)
+                for start in range(len(key) - size + 1)}
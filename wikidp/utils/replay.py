@@ -0,0 +1,164 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Record and replay HTTP transport for offline, reproducible runs."""
+import base64
+import json
+import os
+import tempfile
+import time
+
+import requests
+from requests.adapters import (
+    BaseAdapter,
+    HTTPAdapter,
+)
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from wikidp.utils.cache import make_cache_key
+
+RECORD = 'record'
+REPLAY = 'replay'
+# Headers describing the wire format, fixtures store the decoded body
+WIRE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+class RecordReplayAdapter(BaseAdapter):
+    """
+    Transport adapter saving responses to fixture files and serving them back.
+
+    Notes:
+        - A request is identified by its method, url and body, so the same
+        SPARQL query or API call always maps to the same fixture file.
+        - In replay mode nothing goes to the network, a request without a
+        fixture fails with a ConnectionError like an unreachable host.
+    """
+
+    def __init__(self, mode, fixture_dir, latency=0.0, transport=None):
+        """
+        Constructor for a RecordReplayAdapter instance.
+
+        Args:
+            mode (str): RECORD or REPLAY
+            fixture_dir (str): where fixture files are written and read
+            latency (float): seconds added to every replayed response
+            transport (Optional[BaseAdapter]): sends recorded requests,
+                defaults to a plain HTTPAdapter
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        super().__init__()
+        self.mode = mode
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.transport = transport or HTTPAdapter()
+        self.recorded = 0
+        self.replayed = 0
+
+    # pylint: disable=R0913
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        """Record or replay a prepared request."""
+        path = self.fixture_path(request)
+        if self.mode == RECORD:
+            response = self.transport.send(request, stream=stream,
+                                           timeout=timeout, verify=verify,
+                                           cert=cert, proxies=proxies)
+            self._write_fixture(path, request, response)
+            self.recorded += 1
+            return response
+        if not os.path.exists(path):
+            raise requests.ConnectionError(
+                f"No recorded response for {request.method} {request.url}",
+                request=request)
+        if self.latency:
+            time.sleep(self.latency)
+        self.replayed += 1
+        return self._read_fixture(path, request)
+
+    def close(self):
+        """Close the underlying transport."""
+        self.transport.close()
+
+    def fixture_path(self, request):
+        """
+        Get the fixture file of a request.
+
+        Args:
+            request (requests.PreparedRequest):
+
+        Returns (str):
+
+        """
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key = make_cache_key(request.method, request.url,
+                             base64.b64encode(body).decode('ascii'))
+        return os.path.join(self.fixture_dir, f"{key}.json")
+
+    def _write_fixture(self, path, request, response):
+        fixture = {
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in WIRE_HEADERS},
+            # Reading content here keeps it available to streaming callers
+            'body': base64.b64encode(response.content).decode('ascii'),
+        }
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=self.fixture_dir)
+        with os.fdopen(handle, 'w') as temp_file:
+            json.dump(fixture, temp_file, indent=1)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _read_fixture(path, request):
+        with open(path) as fixture_file:
+            fixture = json.load(fixture_file)
+        response = requests.Response()
+        response.status_code = fixture['status']
+        response.reason = fixture.get('reason')
+        response.headers = CaseInsensitiveDict(fixture['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        # pylint: disable=W0212
+        response._content = base64.b64decode(fixture['body'])
+        response._content_consumed = True
+        return response
+
+
+def install(session, mode, fixture_dir, latency=0.0):
+    """
+    Route every request of a session through a RecordReplayAdapter.
+
+    Notes:
+        - Recorded requests go through the adapter the session had for
+        https, so they keep its connection pool and retries.
+
+    Args:
+        session (requests.Session):
+        mode (str): RECORD or REPLAY
+        fixture_dir (str):
+        latency (float): seconds added to every replayed response
+
+    Returns (RecordReplayAdapter):
+
+    """
+    adapter = RecordReplayAdapter(mode, fixture_dir, latency=latency,
+                                  transport=session.get_adapter('https://'))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return adapter
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Registry of compiled ShEx JSON schemas, reloaded when their files change."""
+from collections import namedtuple
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+CompiledSchema = namedtuple("CompiledSchema",
+                            ['name', 'prop_map', 'prop_ids', 'mtime'])
+CompiledSchema.__doc__ = """
+A schema compiled for lookups.
+
+Attributes:
+    name (str): path relative to the schema directory, ex.
+        "file_format/file_format_minimal.json"
+    prop_map (Mapping[str, FrozenSet[str]]): qualifiers by property id,
+        in schema order
+    prop_ids (FrozenSet[str]): every property and qualifier id
+    mtime (int): modification time of the file compiled, in nanoseconds
+"""
+
+
+class SchemaRegistry:
+    """
+    Every schema of a directory tree, compiled once.
+
+    Notes:
+        - Lookups check modification times at most once per
+        check_interval and only recompile the files that changed. Added
+        files are picked up and removed ones dropped.
+        - A file that fails to load or compile keeps its last compiled
+        version, a new one is left out until it is fixed.
+        - Compiled schemas are immutable and shared by every caller.
+    """
+
+    def __init__(self, directory, compile_schema, check_interval=2):
+        """
+        Constructor for a SchemaRegistry instance, compiles every schema.
+
+        Args:
+            directory (str): absolute path of the schema directory
+            compile_schema (Callable[[Dict], Mapping[str, Iterable[str]]]):
+                schema JSON to qualifiers by property id
+            check_interval (float): seconds between modification checks,
+                None to only reload explicitly
+        """
+        self.directory = directory
+        self.check_interval = check_interval
+        self._compile = compile_schema
+        self._schemas = MappingProxyType({})
+        self._checked_at = 0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def get(self, name):
+        """
+        Get a compiled schema.
+
+        Args:
+            name (str): ex. "file_format/file_format_minimal.json"
+
+        Returns (Optional[CompiledSchema]):
+
+        """
+        self._check()
+        return self._schemas.get(name)
+
+    def names(self):
+        """
+        Get the names of every schema.
+
+        Returns (List[str]): sorted
+
+        """
+        self._check()
+        return sorted(self._schemas)
+
+    def reload(self):
+        """
+        Recompile the schemas whose files changed since the last reload.
+
+        Returns (List[str]): names of the schemas compiled
+
+        """
+        with self._lock:
+            return self._reload()
+
+    def _check(self):
+        if self.check_interval is None or \
+                time.time() - self._checked_at < self.check_interval:
+            return
+        # Another thread already reloading, keep serving the current schemas
+        if self._lock.acquire(blocking=False):
+            try:
+                self._reload()
+            finally:
+                self._lock.release()
+
+    def _reload(self):
+        schemas = {}
+        compiled = []
+        try:
+            for directory, _, filenames in os.walk(self.directory):
+                for filename in filenames:
+                    if filename.endswith('.json'):
+                        self._reload_file(os.path.join(directory, filename),
+                                          schemas, compiled)
+            self._schemas = MappingProxyType(schemas)
+        finally:
+            # Checked even if the walk failed, a broken tree is not
+            # walked again on every lookup
+            self._checked_at = time.time()
+        if compiled:
+            logging.debug("Compiled schemas %s", compiled)
+        return compiled
+
+    def _reload_file(self, path, schemas, compiled):
+        name = os.path.relpath(path, self.directory).replace(os.sep, '/')
+        current = self._schemas.get(name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if current and current.mtime == mtime:
+                schemas[name] = current
+                return
+            schemas[name] = self._load(name, path, mtime)
+            compiled.append(name)
+        # Any schema content can break the compile function, ex. a list
+        # pylint: disable=W0703
+        except Exception:
+            logging.exception("Unable to compile schema %s", name)
+            if current:
+                schemas[name] = current
+
+    def _load(self, name, path, mtime):
+        with open(path) as schema_file:
+            data = json.load(schema_file)
+        prop_map = MappingProxyType({
+            pid: frozenset(qualifiers)
+            for pid, qualifiers in self._compile(data).items()
+        })
+        prop_ids = frozenset(prop_map).union(*prop_map.values())
+        return CompiledSchema(name, prop_map, prop_ids, mtime)
@@ -0,0 +1,131 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Coalesce identical concurrent calls into a single in-flight call."""
+import hashlib
+import logging
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, not a POSIX platform
+    fcntl = None
+
+# Lock files shared by all keys, a key always maps to the same one
+LOCK_STRIPES = 64
+
+
+class _Call:
+    """An in-flight call that other threads can wait on."""
+
+    def __init__(self):
+        """Constructor for a _Call instance."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Share one execution of a call between concurrent callers with the same key.
+
+    Notes:
+        - Within a process the first caller runs the function and the rest
+        wait for and receive its result, or its exception.
+        - With a lock directory the caller also holds a lock file for the key,
+        so one process fetches while the others on the host wait and then
+        check the shared storage the result was written to.
+        - Keys are hashed onto lock_stripes lock files, so the directory
+        does not grow with the keys. Different keys on one stripe wait for
+        each other across processes, then recheck and run as usual.
+    """
+
+    def __init__(self, lock_dir=None, lock_stripes=LOCK_STRIPES):
+        """
+        Constructor for a SingleFlight instance.
+
+        Args:
+            lock_dir (Optional[str]): directory for cross process lock files
+            lock_stripes (int): number of lock files
+        """
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.lock_dir = lock_dir if fcntl else None
+        self.lock_stripes = lock_stripes
+        self.shared = 0
+
+    def do(self, key, func, recheck=None):
+        """
+        Call func, or wait for the identical call already in flight.
+
+        Args:
+            key (str): identifies identical calls
+            func (Callable[[], Any]):
+            recheck (Optional[Callable[[], Tuple[bool, Any]]]): called after
+                waiting on another process, returns (found, value) from the
+                storage that process wrote to
+
+        Returns (Any): result of func
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = self._run(key, func, recheck)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _run(self, key, func, recheck):
+        if not self.lock_dir:
+            return func()
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            lock_file = open(self._lock_path(key), 'a')
+        except OSError:
+            logging.warning("Unable to open lock file for %s", key)
+            return func()
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                waited = False
+            except BlockingIOError:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                waited = True
+            try:
+                if waited and recheck:
+                    found, value = recheck()
+                    if found:
+                        return value
+                return func()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _lock_path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        stripe = int.from_bytes(digest[:4], 'big') % self.lock_stripes
+        return os.path.join(self.lock_dir, f"{stripe:03d}.lock")
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Pre-serialized, pre-compressed JSON documents served as is."""
+import gzip
+import hashlib
+import json
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class JsonSnapshot:
+    """
+    A JSON document serialized once with its compressed variants.
+
+    Notes:
+        - The brotli variant is only built when the optional brotli package
+        is installed.
+        - A list document can also be served as newline delimited JSON, one
+        element per line, see as_ndjson.
+    """
+
+    __slots__ = ('body', 'encoded', 'etag', 'built_at', 'count', 'ndjson',
+                 '_ndjson_snapshot')
+
+    def __init__(self, value, ndjson=False):
+        """
+        Constructor for a JsonSnapshot instance.
+
+        Args:
+            value (Any): JSON serializable document
+            ndjson (bool): serialize the elements of a list one per line
+        """
+        if ndjson:
+            self.body = b''.join(
+                json.dumps(element, separators=(',', ':')).encode('utf-8') + b'\n'
+                for element in value)
+        else:
+            self.body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+        self.ndjson = ndjson
+        self._ndjson_snapshot = None
+        self.encoded = {'gzip': gzip.compress(self.body)}
+        if brotli:
+            self.encoded['br'] = brotli.compress(self.body)
+        self.etag = hashlib.sha256(self.body).hexdigest()
+        self.built_at = time.time()
+        self.count = len(value) if isinstance(value, (list, dict)) else None
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was built."""
+        return time.time() - self.built_at
+
+    def as_ndjson(self):
+        """
+        Get this list document as newline delimited JSON.
+
+        Notes:
+            - Built on first use and kept, built_at is carried over so both
+            variants age together.
+
+        Returns (JsonSnapshot):
+
+        """
+        if self.ndjson:
+            return self
+        if self._ndjson_snapshot is None:
+            snapshot = JsonSnapshot(json.loads(self.body), ndjson=True)
+            snapshot.built_at = self.built_at
+            self._ndjson_snapshot = snapshot
+        return self._ndjson_snapshot
+
+    def get_body(self, accept_encodings):
+        """
+        Pick the smallest variant the client accepts.
+
+        Args:
+            accept_encodings (Callable[[str], float]): quality of an
+                encoding, ex. werkzeug's request.accept_encodings.quality
+
+        Returns (Tuple[bytes, Optional[str]]): body and its content encoding
+
+        """
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encoded and accept_encodings(encoding) > 0:
+                return self.encoded[encoding], encoding
+        return self.body, None
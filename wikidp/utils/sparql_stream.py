@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Incremental reader for SPARQL JSON results."""
+import codecs
+import json
+import re
+
+BINDINGS_START = re.compile(r'"bindings"\s*:\s*\[')
+# Parsed text is dropped from the buffer once this many characters are behind
+COMPACT_AFTER = 64 * 1024
+SEPARATORS = ' \t\r\n,'
+
+
+def iter_sparql_bindings(chunks):
+    """
+    Yield the bindings of a SPARQL JSON result as its bytes arrive.
+
+    Notes:
+        - Only one binding plus the unread part of the current chunk is held
+        in memory, rows are yielded as soon as they are complete.
+
+    Args:
+        chunks (Iterable[bytes]): ex. requests' Response.iter_content()
+
+    Yields (Dict): raw binding, ex. {"code": {"type": "literal", "value": "en"}}
+
+    Raises:
+        ValueError: if the result ends before the bindings are complete
+
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    position = None
+    exhausted = False
+    while True:
+        needs_data = False
+        if position is None:
+            match = BINDINGS_START.search(buffer)
+            if match:
+                position = match.end()
+            else:
+                needs_data = True
+        else:
+            while position < len(buffer) and buffer[position] in SEPARATORS:
+                position += 1
+            if position >= len(buffer):
+                needs_data = True
+            elif buffer[position] == ']':
+                return
+            else:
+                try:
+                    binding, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                    needs_data = True
+                else:
+                    yield binding
+                    if position > COMPACT_AFTER:
+                        buffer = buffer[position:]
+                        position = 0
+        if needs_data:
+            if exhausted:
+                raise ValueError("SPARQL result ended before its bindings")
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                buffer += text_decoder.decode(b'', final=True)
+            else:
+                buffer += text_decoder.decode(chunk)
@@ -0,0 +1,169 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Search cache for as-you-type queries."""
+from collections import OrderedDict
+import threading
+import time
+
+from wikidp.const import WDEntityField
+
+
+def normalize_query(query):
+    """
+    Normalize a search string for use as a cache key.
+
+    Args:
+        query (str): ex. "  Portable  Network "
+
+    Returns (str): ex. "portable network"
+
+    """
+    return " ".join(query.split()).casefold()
+
+
+class TypeaheadCache:
+    """
+    Cache of search results for queries typed one keystroke at a time.
+
+    Notes:
+        - Query results (ids) and item summaries are cached apart, so the
+        summaries of items found by several queries are kept once. Summaries
+        come with the search results, `summarize` only rebuilds the ones
+        that expired before the query did.
+        - When a shorter prefix of a query returned fewer than `limit`
+        results, that list held every match, and the query is answered by
+        filtering it locally on labels, aliases, the term the search matched
+        and qids instead of searching upstream again. Hits whose matched
+        term is not known, ex. summaries rebuilt by `summarize`, cannot be
+        filtered, and the query is searched upstream.
+        - Errors raised by `search` or `summarize` reach the caller and
+        nothing is cached for the query, so an upstream failure is never
+        served as an empty result.
+    """
+
+    # pylint: disable=R0913
+    def __init__(self, search, summarize, ttl, max_entries=1000, limit=10):
+        """
+        Constructor for a TypeaheadCache instance.
+
+        Args:
+            search (Callable[[str, int], List[Dict]]): query and limit to
+                summaries with a qid, best match first
+            summarize (Callable[[List[str]], List[Union[Dict, bool]]]): ids
+                to summaries with label and aliases, False for missing ids
+            ttl (float): seconds results and summaries are kept
+            max_entries (int): most queries and most summaries kept
+            limit (int): results requested per search
+        """
+        self._search = search
+        self._summarize = summarize
+        self._queries = OrderedDict()
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.limit = limit
+        self.hits = 0
+        self.local_hits = 0
+        self.misses = 0
+
+    def search(self, query):
+        """
+        Get the summaries of the items matching a query.
+
+        Args:
+            query (str):
+
+        Returns (List[Dict]): best match first
+
+        Raises:
+            Exception: whatever `search` or `summarize` raised
+
+        """
+        key = normalize_query(query)
+        qids = self._cached_qids(key)
+        if qids is None:
+            self.misses += 1
+            summaries = self._search(query, self.limit)
+            qids = [summary[WDEntityField.QID] for summary in summaries]
+            for summary in summaries:
+                self._put(self._summaries, summary[WDEntityField.QID], summary)
+            self._put(self._queries, key, (qids, len(qids) < self.limit))
+        return [dict(summary) for summary in self._get_summaries(qids)
+                if summary]
+
+    def clear(self):
+        """Drop every cached query and summary."""
+        with self._lock:
+            self._queries.clear()
+            self._summaries.clear()
+
+    def _cached_qids(self, key):
+        entry = self._get(self._queries, key)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+        for end in range(len(key) - 1, 0, -1):
+            entry = self._get(self._queries, key[:end])
+            if entry is None or not entry[1]:
+                continue
+            summaries = [summary for summary in self._get_summaries(entry[0])
+                         if summary]
+            matches = [_matches(summary, key) for summary in summaries]
+            if None in matches:
+                return None
+            qids = [summary[WDEntityField.QID]
+                    for summary, match in zip(summaries, matches) if match]
+            self.local_hits += 1
+            self._put(self._queries, key, (qids, True))
+            return qids
+        return None
+
+    def _get_summaries(self, qids):
+        summaries = {qid: self._get(self._summaries, qid) for qid in qids}
+        missing = [qid for qid, summary in summaries.items() if summary is None]
+        if missing:
+            for qid, summary in zip(missing, self._summarize(missing)):
+                summaries[qid] = summary
+                self._put(self._summaries, qid, summary)
+        return [summaries[qid] for qid in qids]
+
+    def _get(self, entries, key):
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def _put(self, entries, key, value):
+        with self._lock:
+            entries[key] = (time.time() + self.ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+
+def _matches(summary, key):
+    # Whether the search would still find the hit, None if it cannot be told
+    names = [summary.get(WDEntityField.LABEL) or '', summary[WDEntityField.QID]]
+    names.extend(summary.get(WDEntityField.ALIASES) or [])
+    match = summary.get(WDEntityField.MATCH)
+    if match:
+        names.append(match.get('text') or '')
+    if any(normalize_query(name).startswith(key) for name in names):
+        return True
+    return False if match else None
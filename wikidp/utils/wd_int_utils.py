@@ -12,32 +12,154 @@
 # This is a python __init__ script to create the app and import the
 # main package contents
 """Module to hold all WikiDataIntegrator routines for dependency management."""
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime
-import logging
-from wikidataintegrator.wdi_core import WDItemEngine
 
 from wikidp.config import APP
 from wikidp.const import (
     ConfKey,
     WIKIDATA_DATETIME_FORMAT,
 )
+from wikidp.utils import http
+from wikidp.utils.cache import (
+    EntityCache,
+    make_cache_key,
+    ResultCache,
+)
+from wikidp.utils.entity_store import EntityStore
+from wikidp.utils.singleflight import SingleFlight
+from wikidp.utils.sparql_stream import iter_sparql_bindings
+from wikidp.utils.memo import (
+    get_request_memo,
+    record_memo_stats,
+    request_memo,
+)
+from wikidp.utils.wikibase import (
+    ENTITY_BATCH_SIZE,
+    WikibaseReadClient,
+)
 
 MEDIAWIKI_API_URL = APP.config[ConfKey.MEDIAWIKI_API_URL]
+# Bytes read from the socket at a time when streaming SPARQL results
+STREAM_CHUNK_SIZE = 64 * 1024
 SPARQL_ENDPOINT_URL = APP.config[ConfKey.SPARQL_ENDPOINT_URL]
+SPARQL_CACHE_TTLS = APP.config[ConfKey.SPARQL_CACHE_TTLS]
+SPARQL_CACHE = ResultCache(
+    max_bytes=APP.config[ConfKey.SPARQL_CACHE_MAX_BYTES],
+    default_ttl=APP.config[ConfKey.SPARQL_CACHE_TTL],
+    directory=APP.config[ConfKey.SPARQL_CACHE_DIR],
+    max_disk_bytes=APP.config[ConfKey.SPARQL_CACHE_MAX_DISK_BYTES],
+    single_flight=SingleFlight(
+        lock_dir=APP.config[ConfKey.SINGLE_FLIGHT_LOCK_DIR]),
+)
+WIKIBASE_CLIENT = WikibaseReadClient(
+    MEDIAWIKI_API_URL, workers=APP.config[ConfKey.ENTITY_FETCH_WORKERS],
+    single_flight=SingleFlight())
+ENTITY_STORE = (EntityStore(APP.config[ConfKey.ENTITY_STORE_PATH])
+                if APP.config[ConfKey.ENTITY_STORE_PATH] else None)
+ENTITY_CACHE = EntityCache(
+    WIKIBASE_CLIENT,
+    fresh_for=APP.config[ConfKey.ENTITY_CACHE_FRESH_FOR],
+    max_entries=APP.config[ConfKey.ENTITY_CACHE_MAX_ENTRIES],
+    store=ENTITY_STORE,
+)
+
+
+def execute_sparql_query(query, endpoint=SPARQL_ENDPOINT_URL, template=None):
+    """
+    Execute a SPARQL Query, serving repeated queries from the result cache.
+
+    Args:
+        query (str):
+        endpoint (str): SPARQL endpoint url
+        template (Optional[str]): name of the query template, used to pick
+            the cache lifetime from the SPARQL_CACHE_TTLS config
 
+    Returns (Dict): raw SPARQL JSON result
 
-def process_query_string(query):
-    """Use WikiDataIntegrator Engine to process a SPARQL Query."""
-    result = WDItemEngine.execute_sparql_query(query,
-                                               endpoint=SPARQL_ENDPOINT_URL)
-    bindings = result['results'].get('bindings')
-    return _format_wikidata_bindings(bindings)
+    """
+    key = make_cache_key(endpoint, query)
+    ttl = SPARQL_CACHE_TTLS.get(template)
+    return SPARQL_CACHE.get_or_set(
+        key, lambda: _post_sparql_query(query, endpoint).json(), ttl=ttl)
+
+
+def _post_sparql_query(query, endpoint, stream=False):
+    """
+    Send a SPARQL Query with the shared session.
+
+    Args:
+        query (str):
+        endpoint (str): SPARQL endpoint url
+        stream (bool): leave the body unread, for iter_content
+
+    Returns (requests.Response):
+
+    Raises:
+        requests.RequestException: on connection errors and error statuses
+
+    """
+    response = http.SESSION.post(
+        endpoint, data={'query': query},
+        headers={'Accept': 'application/sparql-results+json'},
+        stream=stream, timeout=http.request_timeout())
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    return response
+
+
+def process_query_string(query, template=None):
+    """
+    Process a SPARQL Query into a list of variable to value dictionaries.
+
+    Args:
+        query (str):
+        template (Optional[str]): see execute_sparql_query
+
+    Returns (List[Dict[str, str]]):
+
+    """
+    result = execute_sparql_query(query, template=template)
+    return _format_wikidata_bindings(result['results'].get('bindings'))
+
+
+def iter_query_string(query, endpoint=SPARQL_ENDPOINT_URL):
+    """
+    Stream the rows of a SPARQL Query as they arrive.
+
+    Notes:
+        - Rows have the same shape as the output of process_query_string,
+        but the result is never held in memory as a whole, nor cached.
+
+    Args:
+        query (str):
+        endpoint (str): SPARQL endpoint url
+
+    Yields (Dict[str, str]): variable name to value
+
+    """
+    with _post_sparql_query(query, endpoint, stream=True) as response:
+        bindings = iter_sparql_bindings(response.iter_content(STREAM_CHUNK_SIZE))
+        for res in bindings:
+            yield _format_wikidata_binding(res)
 
 
 def _format_wikidata_bindings(bindings):
-    return [{k: v.get('value') for k, v in res.items()} for res in bindings]
+    return [_format_wikidata_binding(res) for res in bindings]
+
+
+def _format_wikidata_binding(binding):
+    return {k: v.get('value') for k, v in binding.items()}
 
 
+@request_memo('item_json', key=lambda qid: qid)
 def get_item_json(qid):
     """
     Get item json dictionary from qid.
@@ -46,16 +168,126 @@ def get_item_json(qid):
         qid (str): Wikidata Identifier, ex: "Q1234"
 
     Returns:
-        Dict: Returned value of WDItemEngine().wd_json_representation
+        Dict: raw entity JSON, the same shape as
+            WDItemEngine().wd_json_representation
     """
-    try:
-        item = WDItemEngine(wd_item_id=qid,
-                            mediawiki_api_url=MEDIAWIKI_API_URL,
-                            sparql_endpoint_url=SPARQL_ENDPOINT_URL)
-        return item.wd_json_representation
-    except (ValueError, ConnectionAbortedError, KeyError):
-        logging.exception("Exception reading QID: %s", qid)
-        return None
+    return ENTITY_CACHE.get(qid)
+
+
+def get_items_json(qids):
+    """
+    Get item json dictionaries for several qids with wbgetentities.
+
+    Notes:
+        - Ids are fetched ENTITY_BATCH_SIZE at a time, batches run
+        concurrently on up to ENTITY_FETCH_WORKERS threads.
+        - Items already in ENTITY_CACHE are only fetched again when their
+        revision has changed, items already read in this request are reused.
+
+    Args:
+        qids (Iterable[str]): Wikidata Identifiers, ex: ["Q1234", "Q5678"]
+
+    Returns (Dict[str, Dict]): keys are the qids found, missing ones are left out
+
+    """
+    qids = list(qids)
+    memo = get_request_memo('item_json')
+    if memo is None:
+        return ENTITY_CACHE.get_many(qids)
+    missing = [qid for qid in dict.fromkeys(qids) if qid not in memo]
+    record_memo_stats('item_json', hits=len(set(qids)) - len(missing),
+                      misses=len(missing))
+    if missing:
+        items = ENTITY_CACHE.get_many(missing)
+        memo.update({qid: items.get(qid) for qid in missing})
+    return {qid: memo[qid] for qid in qids if memo[qid]}
+
+
+def iter_items_json(qids):
+    """
+    Get item json dictionaries batch by batch, as each batch is fetched.
+
+    Notes:
+        - Batches of ENTITY_BATCH_SIZE ids run concurrently on up to
+        ENTITY_FETCH_WORKERS threads and are yielded in completion order.
+        At most that many batches are fetched ahead of the consumer.
+        - Items go through ENTITY_CACHE but not the request memo, so a long
+        stream does not keep every item it yielded.
+
+    Args:
+        qids (Iterable[str]): Wikidata Identifiers, ex: ["Q1234", "Q5678"]
+
+    Yields (Tuple[List[str], Dict[str, Dict]]): ids of a batch and the items
+        found for them
+
+    """
+    qids = list(dict.fromkeys(qids))
+    chunks = [qids[start:start + ENTITY_BATCH_SIZE]
+              for start in range(0, len(qids), ENTITY_BATCH_SIZE)]
+    workers = max(min(len(chunks), APP.config[ConfKey.ENTITY_FETCH_WORKERS]), 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for chunk in chunks:
+            if len(pending) >= workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+            pending[pool.submit(ENTITY_CACHE.get_many, chunk)] = chunk
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def get_items_terms(qids, props='labels|descriptions|aliases'):
+    """
+    Get some terms of several items, without their claims.
+
+    Notes:
+        - Read in batched wbgetentities calls, neither cached nor kept in
+        ENTITY_CACHE, which only holds whole items.
+
+    Args:
+        qids (Iterable[str]): Wikidata Identifiers, ex: ["Q1234", "Q5678"]
+        props (str): wbgetentities props, ex. "aliases"
+
+    Returns (Dict[str, Dict]): partial entity JSON by qid, missing ones are
+        left out
+
+    """
+    return WIKIBASE_CLIENT.get_entities(qids, props=props)
+
+
+def get_stored_item_ids_by_class(class_qid, limit=None, offset=0):
+    """
+    Get the ids of items read before that are an instance of a class.
+
+    Args:
+        class_qid (str): ex. "Q235557" for file format
+        limit (Optional[int]):
+        offset (int):
+
+    Returns (List[str]): empty without an entity store
+
+    """
+    if ENTITY_STORE is None:
+        return []
+    return ENTITY_STORE.ids_by_class(class_qid, limit=limit, offset=offset)
+
+
+def search_items(search_string, language, limit=10):
+    """
+    Search items by label and alias.
+
+    Args:
+        search_string (str):
+        language (str):
+        limit (int):
+
+    Returns (List[Dict]): wbsearchentities hits, best match first
+
+    """
+    return WIKIBASE_CLIENT.search_entities(search_string, language, limit=limit)
 
 
 def format_date(date_string):
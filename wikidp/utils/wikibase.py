@@ -0,0 +1,218 @@
+#!/usr/bin/python
+# coding=UTF-8
+#
+# WikiDP Wikidata Portal
+# Copyright (C) 2021
+# All rights reserved.
+#
+# This code is distributed under the terms of the GNU General Public
+# License, Version 3. See the text file "COPYING" for further details
+# about the terms of this license.
+#
+"""Read only Wikibase API client returning raw entity JSON."""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+import requests
+
+from wikidp.utils import http
+from wikidp.utils.errors import WikibaseReadError
+
+# Most entity ids the MediaWiki API accepts in a single wbgetentities call
+ENTITY_BATCH_SIZE = 50
+# wbgetentities error codes about the ids requested rather than the API
+ENTITY_ERROR_CODES = frozenset({'no-such-entity', 'invalid-entity-id'})
+
+
+class WikibaseReadClient:
+    """
+    Thin client for the read actions of a Wikibase API.
+
+    Notes:
+        - Unlike WDItemEngine nothing is parsed into datatype objects, the
+        entity JSON is returned as the API sends it.
+        - Requests share one keep-alive session, see wikidp.utils.http.
+        Writes stay with WikidataIntegrator.
+        - With a SingleFlight identical concurrent requests share one call
+        and its decoded response.
+        - Connection errors, error statuses and API errors raise
+        WikibaseReadError, so callers can tell an outage from an entity
+        that does not exist.
+    """
+
+    # pylint: disable=R0913
+    def __init__(self, api_url, session=None, timeout=http.HTTP_TIMEOUT,
+                 workers=1, single_flight=None):
+        """
+        Constructor for a WikibaseReadClient instance.
+
+        Args:
+            api_url (str): ex. "https://www.wikidata.org/w/api.php"
+            session (Optional[requests.Session]): defaults to the shared one
+            timeout (Union[float, Tuple[float, float]]):
+            workers (int): threads used to fetch more than one batch
+            single_flight (Optional[SingleFlight]):
+        """
+        self.api_url = api_url
+        self.single_flight = single_flight
+        self.session = session or http.SESSION
+        self.timeout = timeout
+        self.workers = workers
+
+    def request(self, params):
+        """
+        Perform an API GET request.
+
+        Args:
+            params (Dict): action parameters, format is always json
+
+        Returns (Dict): decoded response
+
+        Raises:
+            WikibaseReadError: on connection errors, error statuses and
+                responses that are not JSON
+
+        """
+        if self.single_flight is None:
+            return self._request(params)
+        return self.single_flight.do(http.request_key(self.api_url, params),
+                                     lambda: self._request(params))
+
+    def _request(self, params):
+        try:
+            response = self.session.get(self.api_url,
+                                        params={**params, 'format': 'json'},
+                                        timeout=http.request_timeout(self.timeout))
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as excep:
+            raise WikibaseReadError(
+                f"Exception requesting {params}: {excep}") from excep
+
+    def get_entity(self, entity_id):
+        """
+        Get the JSON of a single entity.
+
+        Args:
+            entity_id (str): ex. "Q1234"
+
+        Returns (Optional[Dict]): None if the entity does not exist
+
+        Raises:
+            WikibaseReadError: if the API could not be read
+
+        """
+        return self.get_entities([entity_id]).get(entity_id)
+
+    def get_entities(self, entity_ids, props=None):
+        """
+        Get the JSON of several entities with wbgetentities.
+
+        Args:
+            entity_ids (Iterable[str]):
+            props (Optional[str]): wbgetentities props, ex. "info|labels"
+
+        Returns (Dict[str, Dict]): keys are the ids found, missing ones are
+            left out
+
+        Raises:
+            WikibaseReadError: if the API could not be read
+
+        """
+        return self.read_entities(entity_ids, props)[0]
+
+    def read_entities(self, entity_ids, props=None):
+        """
+        Get the JSON of several entities and the ids reported missing.
+
+        Notes:
+            - Ids are fetched ENTITY_BATCH_SIZE at a time, batches run
+            concurrently when the client has more than one worker.
+            - Only ids the API answered for as missing or invalid are
+            reported, an id left out of both outputs is unknown.
+
+        Args:
+            entity_ids (Iterable[str]):
+            props (Optional[str]): wbgetentities props, ex. "info|labels"
+
+        Returns (Tuple[Dict[str, Dict], Set[str]]): entities by id and the ids
+            that do not exist
+
+        Raises:
+            WikibaseReadError: if the API could not be read
+
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        chunks = [entity_ids[start:start + ENTITY_BATCH_SIZE]
+                  for start in range(0, len(entity_ids), ENTITY_BATCH_SIZE)]
+        if len(chunks) > 1 and self.workers > 1:
+            workers = min(len(chunks), self.workers)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(
+                    lambda chunk: self._get_entity_batch(chunk, props), chunks))
+        else:
+            results = [self._get_entity_batch(chunk, props) for chunk in chunks]
+        output = {}
+        missing = set()
+        for found, chunk_missing in results:
+            output.update(found)
+            missing.update(chunk_missing)
+        return output, missing
+
+    def search_entities(self, search_string, language, limit=10):
+        """
+        Search entities by label and alias with wbsearchentities.
+
+        Args:
+            search_string (str):
+            language (str):
+            limit (int): most results returned, the API caps it at 50
+
+        Returns (List[Dict]): raw search hits, best match first
+
+        Raises:
+            WikibaseReadError: if the API could not be read
+
+        """
+        data = self.request({
+            'action': 'wbsearchentities',
+            'search': search_string,
+            'language': language,
+            'limit': limit,
+            'type': 'item',
+        })
+        if 'error' in data:
+            raise WikibaseReadError(f"Error searching {search_string!r}: "
+                                    f"{data['error']}")
+        return data.get('search', [])
+
+    def _get_entity_batch(self, entity_ids, props=None):
+        params = {'action': 'wbgetentities', 'ids': '|'.join(entity_ids)}
+        if props:
+            params['props'] = props
+        data = self.request(params)
+        if 'error' in data:
+            if data['error'].get('code') not in ENTITY_ERROR_CODES:
+                raise WikibaseReadError(f"Error reading entities {entity_ids}: "
+                                        f"{data['error']}")
+            # One bad id fails the whole call, retry the rest one by one
+            logging.warning("Error reading entities %s: %s",
+                            entity_ids, data['error'])
+            if len(entity_ids) == 1:
+                return {}, set(entity_ids)
+            output = {}
+            missing = set()
+            for entity_id in entity_ids:
+                found, entity_missing = self._get_entity_batch([entity_id], props)
+                output.update(found)
+                missing.update(entity_missing)
+            return output, missing
+        output = {}
+        missing = set()
+        for entity_id, entity in data.get('entities', {}).items():
+            if 'missing' in entity:
+                missing.add(entity_id)
+                continue
+            requested_id = entity.get('redirects', {}).get('from', entity_id)
+            output[requested_id] = entity
+        return output, missing